@@ -1,14 +1,18 @@
-import json
 import logging
 from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+from backend.data_sources import connector_registry
+from backend.http_cache import SHORT_LIVED, http_cache
+from backend.json_response import FastJSONRoute
+from backend.connector_index import get_connector_index, latest_event
+from backend.bot_routing import first_known, parse_message, search_products
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-bot_router = APIRouter()
+bot_router = APIRouter(route_class=FastJSONRoute)
 
 # In-memory storage for bot configuration (in production, use database)
 bot_config = {
@@ -37,19 +41,6 @@ Response length: 2-3 sentences for simple queries, more for complex ones
 """
 }
 
-# Load connector data
-def load_products():
-    with open('product.json', 'r') as f:
-        return json.load(f)
-
-def load_shopify_orders():
-    with open('shopify_demo.json', 'r') as f:
-        return json.load(f)
-
-def load_dhl_tracking():
-    with open('dhl_demo.json', 'r') as f:
-        return json.load(f)
-
 # Pydantic models
 class KnowledgeBaseUpdate(BaseModel):
     content: str
@@ -61,6 +52,12 @@ class ChatMessage(BaseModel):
     message: str
     conversation_history: Optional[List[Dict[str, str]]] = []
 
+class OrderBatchLookup(BaseModel):
+    order_numbers: List[str] = Field(..., min_length=1, max_length=1000)
+
+class TrackingBatchLookup(BaseModel):
+    tracking_numbers: List[str] = Field(..., min_length=1, max_length=1000)
+
 # Bot configuration endpoints
 @bot_router.get("/bot/knowledge-base")
 async def get_knowledge_base():
@@ -82,16 +79,17 @@ async def update_bot_instructions(data: BotInstructionsUpdate):
 
 # Connector endpoints
 @bot_router.get("/bot/connectors/products")
+@http_cache(connector_registry.version, SHORT_LIVED)
 async def get_products(
     product_id: Optional[str] = None,
     search: Optional[str] = None
 ):
     """Get product information"""
-    products_data = load_products()
-    products = products_data["products"]
+    snapshot = await connector_registry.snapshot()
+    products = snapshot.get('products', {}).get('products', [])
     
     if product_id:
-        product = next((p for p in products if p["id"] == product_id), None)
+        product = get_connector_index(snapshot).products_by_id.get(product_id.upper())
         if not product:
             raise HTTPException(status_code=404, detail="Product not found")
         return {"product": product}
@@ -107,10 +105,11 @@ async def get_products(
     return {"products": products, "count": len(products)}
 
 @bot_router.get("/bot/connectors/shopify/order/{order_number}")
+@http_cache(connector_registry.version, SHORT_LIVED)
 async def get_shopify_order(order_number: str):
     """Get Shopify order details by order number"""
-    orders_data = load_shopify_orders()
-    order = next((o for o in orders_data["orders"] if o["order_number"] == order_number), None)
+    index = get_connector_index(await connector_registry.snapshot())
+    order = index.orders_by_number.get(order_number.upper())
     
     if not order:
         raise HTTPException(status_code=404, detail=f"Order {order_number} not found")
@@ -118,39 +117,65 @@ async def get_shopify_order(order_number: str):
     return {"order": order}
 
 @bot_router.get("/bot/connectors/dhl/tracking/{tracking_number}")
+@http_cache(connector_registry.version, SHORT_LIVED)
 async def get_dhl_tracking(tracking_number: str):
     """Get DHL tracking information"""
-    tracking_data = load_dhl_tracking()
-    shipment = next((s for s in tracking_data["shipments"] if s["tracking_number"] == tracking_number), None)
+    index = get_connector_index(await connector_registry.snapshot())
+    shipment = index.shipments_by_tracking.get(tracking_number.upper())
     
     if not shipment:
         raise HTTPException(status_code=404, detail=f"Tracking number {tracking_number} not found")
     
     return {"shipment": shipment}
 
+def shipment_lookup(found: bool, order: Optional[Dict[str, Any]], shipment: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """One batch lookup result: the order, its shipment and the shipment's latest event"""
+    return {
+        "found": found,
+        "order": order,
+        "shipment": shipment,
+        "latest_event": latest_event(shipment) if shipment else None
+    }
+
+@bot_router.post("/bot/connectors/shopify/orders/batch")
+async def get_shopify_orders_batch(lookup: OrderBatchLookup):
+    """Orders with their DHL shipment and latest tracking event, for many order numbers at once"""
+    index = get_connector_index(await connector_registry.snapshot())
+    results = []
+    for order_number in lookup.order_numbers:
+        key = order_number.strip().upper()
+        order = index.orders_by_number.get(key)
+        shipment = index.shipments_by_order.get(key) if order else None
+        results.append({"order_number": order_number, **shipment_lookup(order is not None, order, shipment)})
+    return {"results": results, "found": sum(result["found"] for result in results)}
+
+@bot_router.post("/bot/connectors/dhl/tracking/batch")
+async def get_dhl_tracking_batch(lookup: TrackingBatchLookup):
+    """Shipments with their latest event and Shopify order, for many tracking numbers at once"""
+    index = get_connector_index(await connector_registry.snapshot())
+    results = []
+    for tracking_number in lookup.tracking_numbers:
+        key = tracking_number.strip().upper()
+        shipment = index.shipments_by_tracking.get(key)
+        order = index.orders_by_tracking.get(key) if shipment else None
+        results.append({"tracking_number": tracking_number, **shipment_lookup(shipment is not None, order, shipment)})
+    return {"results": results, "found": sum(result["found"] for result in results)}
+
 # AI Chatbot endpoint
 @bot_router.post("/bot/chat")
 async def chat_with_bot(chat: ChatMessage):
     """AI chatbot that uses connectors to answer questions"""
-    message = chat.message.lower()
-    
     try:
-        # Simple AI logic to route queries (in production, use actual AI/LLM)
+        # Single pass over the message, then hash lookups on the indexed connector data
+        parsed = parse_message(chat.message)
+        snapshot = await connector_registry.snapshot()
+        index = get_connector_index(snapshot)
         
         # Check for order number pattern
-        if "ord-" in message or "order" in message:
-            # Extract order number
-            words = chat.message.split()
-            order_num = next((w for w in words if w.upper().startswith("ORD-")), None)
-            
-            if order_num:
-                try:
-                    orders_data = load_shopify_orders()
-                    order = next((o for o in orders_data["orders"] if o["order_number"].upper() == order_num.upper()), None)
-                    
-                    if order:
-                        items_str = ", ".join([f"{item['product_name']} (x{item['quantity']})" for item in order['items']])
-                        response = f"""Hello! I found your order {order['order_number']} 📦
+        order = first_known(parsed.order_ids, index.orders_by_number)
+        if order:
+            items_str = ", ".join([f"{item['product_name']} (x{item['quantity']})" for item in order['items']])
+            response = f"""Hello! I found your order {order['order_number']} 📦
 
 **Status:** {order['status'].replace('_', ' ').title()}
 **Order Date:** {order['order_date'][:10]}
@@ -158,37 +183,27 @@ async def chat_with_bot(chat: ChatMessage):
 **Total:** ${order['total']} {order['currency']}
 
 """
-                        if order['tracking_number']:
-                            response += f"**Tracking:** {order['tracking_number']}\n"
-                            # Get tracking info
-                            tracking_data = load_dhl_tracking()
-                            shipment = next((s for s in tracking_data["shipments"] if s["tracking_number"] == order['tracking_number']), None)
-                            if shipment:
-                                response += f"**Shipping Status:** {shipment['status'].replace('_', ' ').title()}\n"
-                                if shipment['estimated_delivery']:
-                                    response += f"**Estimated Delivery:** {shipment['estimated_delivery'][:10]}\n"
-                        
-                        response += "\nIs there anything else I can help you with?"
-                        return {
-                            "response": response,
-                            "data_source": "shopify_connector",
-                            "order_number": order_num
-                        }
-                except Exception as e:
-                    logger.error(f"Error fetching order: {e}")
+            if order['tracking_number']:
+                response += f"**Tracking:** {order['tracking_number']}\n"
+                # Get tracking info
+                shipment = index.shipments_by_order.get(order['order_number'].upper())
+                if shipment:
+                    response += f"**Shipping Status:** {shipment['status'].replace('_', ' ').title()}\n"
+                    if shipment['estimated_delivery']:
+                        response += f"**Estimated Delivery:** {shipment['estimated_delivery'][:10]}\n"
+            
+            response += "\nIs there anything else I can help you with?"
+            return {
+                "response": response,
+                "data_source": "shopify_connector",
+                "order_number": order['order_number']
+            }
         
         # Check for tracking number
-        if "dhl-" in message or "track" in message:
-            words = chat.message.split()
-            tracking_num = next((w for w in words if w.upper().startswith("DHL-")), None)
-            
-            if tracking_num:
-                try:
-                    tracking_data = load_dhl_tracking()
-                    shipment = next((s for s in tracking_data["shipments"] if s["tracking_number"].upper() == tracking_num.upper()), None)
-                    
-                    if shipment:
-                        response = f"""📦 Tracking Information for {tracking_num}
+        shipment = first_known(parsed.tracking_ids, index.shipments_by_tracking)
+        if shipment:
+            tracking_num = shipment['tracking_number']
+            response = f"""📦 Tracking Information for {tracking_num}
 
 **Status:** {shipment['status'].replace('_', ' ').title()}
 **Service:** {shipment['service_type']}
@@ -199,48 +214,34 @@ async def chat_with_bot(chat: ChatMessage):
 
 **Latest Update:**
 """
-                        if shipment['events']:
-                            latest = shipment['events'][-1]
-                            response += f"{latest['timestamp'][:10]} - {latest['description']} ({latest['location']})\n"
-                        
-                        response += "\nWould you like more details about this shipment?"
-                        return {
-                            "response": response,
-                            "data_source": "dhl_connector",
-                            "tracking_number": tracking_num
-                        }
-                except Exception as e:
-                    logger.error(f"Error fetching tracking: {e}")
+            latest = latest_event(shipment)
+            if latest:
+                response += f"{latest['timestamp'][:10]} - {latest['description']} ({latest['location']})\n"
+            
+            response += "\nWould you like more details about this shipment?"
+            return {
+                "response": response,
+                "data_source": "dhl_connector",
+                "tracking_number": tracking_num
+            }
         
         # Check for product queries
-        if any(word in message for word in ["product", "headphone", "watch", "chair", "webcam", "tea", "charger", "price", "buy"]):
-            try:
-                products_data = load_products()
-                
-                # Simple keyword matching
-                search_terms = message.split()
-                matching_products = []
-                
-                for product in products_data["products"]:
-                    product_text = f"{product['name']} {product['description']} {product['category']}".lower()
-                    if any(term in product_text for term in search_terms if len(term) > 3):
-                        matching_products.append(product)
+        if parsed.product_query:
+            matching_products = search_products(parsed, snapshot)
+            
+            if matching_products:
+                response = "I found these products that might interest you:\n\n"
+                for p in matching_products[:3]:  # Show top 3
+                    response += f"**{p['name']}** - ${p['price']}\n"
+                    response += f"{p['description'][:100]}...\n"
+                    response += f"Stock: {p['stock']} units | Rating: {p['rating']}⭐\n\n"
                 
-                if matching_products:
-                    response = "I found these products that might interest you:\n\n"
-                    for p in matching_products[:3]:  # Show top 3
-                        response += f"**{p['name']}** - ${p['price']}\n"
-                        response += f"{p['description'][:100]}...\n"
-                        response += f"Stock: {p['stock']} units | Rating: {p['rating']}⭐\n\n"
-                    
-                    response += "Would you like more information about any of these products?"
-                    return {
-                        "response": response,
-                        "data_source": "product_connector",
-                        "products_found": len(matching_products)
-                    }
-            except Exception as e:
-                logger.error(f"Error searching products: {e}")
+                response += "Would you like more information about any of these products?"
+                return {
+                    "response": response,
+                    "data_source": "product_connector",
+                    "products_found": len(matching_products)
+                }
         
         # Default response using knowledge base
         response = f"""Thank you for contacting Saturnin! 👋
@@ -267,12 +268,14 @@ How can I assist you today?"""
         }
 
 @bot_router.get("/bot/connectors/status")
+@http_cache(connector_registry.version, SHORT_LIVED)
 async def get_connectors_status():
     """Check status of all connectors"""
     try:
-        products = load_products()
-        orders = load_shopify_orders()
-        tracking = load_dhl_tracking()
+        snapshot = await connector_registry.snapshot()
+        products = snapshot.get('products', {})
+        orders = snapshot.get('shopify', {})
+        tracking = snapshot.get('dhl', {})
         
         return {
             "connectors": [
@@ -0,0 +1,73 @@
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from backend.data_sources import DataSnapshot
+
+# One pass over the message yields identifiers and lowercase words
+MESSAGE_PATTERN = re.compile(
+    r"(?P<order>\bORD-[A-Z0-9]+(?:-[A-Z0-9]+)*)"
+    r"|(?P<tracking>\bDHL-[A-Z0-9]+(?:-[A-Z0-9]+)*)"
+    r"|(?P<word>[a-z0-9]+)",
+    re.IGNORECASE
+)
+
+# Words (matched by prefix, so "headphones" hits "headphone") that route to the product search
+PRODUCT_KEYWORDS = {"product", "headphone", "watch", "chair", "webcam", "tea", "charger", "price", "buy"}
+PRODUCT_KEYWORD_LENGTHS = sorted({len(keyword) for keyword in PRODUCT_KEYWORDS})
+
+# Product search ignores short words, as the original keyword matcher did
+MIN_TERM_LENGTH = 4
+
+
+@dataclass
+class ParsedMessage:
+    order_ids: List[str] = field(default_factory=list)
+    tracking_ids: List[str] = field(default_factory=list)
+    terms: List[str] = field(default_factory=list)
+    product_query: bool = False
+
+
+def parse_message(message: str) -> ParsedMessage:
+    """Extract ORD-/DHL- identifiers, routing keywords and search terms in a single scan"""
+    parsed = ParsedMessage()
+    for match in MESSAGE_PATTERN.finditer(message):
+        kind = match.lastgroup
+        if kind == "order":
+            parsed.order_ids.append(match.group().upper())
+        elif kind == "tracking":
+            parsed.tracking_ids.append(match.group().upper())
+        else:
+            word = match.group().lower()
+            if len(word) >= MIN_TERM_LENGTH:
+                parsed.terms.append(word)
+            if not parsed.product_query:
+                parsed.product_query = any(word[:length] in PRODUCT_KEYWORDS for length in PRODUCT_KEYWORD_LENGTHS)
+    return parsed
+
+
+def build_product_term_index(snapshot: DataSnapshot) -> Dict[str, Set[int]]:
+    """Map every word prefix (4+ chars) of name, description and category to catalog positions"""
+    index = defaultdict(set)
+    products = snapshot.get('products', {}).get('products', [])
+    for position, product in enumerate(products):
+        text = f"{product.get('name', '')} {product.get('description', '')} {product.get('category', '')}".lower()
+        for word in re.findall(r"[a-z0-9]+", text):
+            for end in range(MIN_TERM_LENGTH, len(word) + 1):
+                index[word[:end]].add(position)
+    return dict(index)
+
+
+def search_products(parsed: ParsedMessage, snapshot: DataSnapshot) -> List[dict]:
+    """Products matching any search term, in catalog order"""
+    term_index = snapshot.derive("bot_product_terms", build_product_term_index)
+    positions: Set[int] = set()
+    for term in parsed.terms:
+        positions |= term_index.get(term, set())
+    products = snapshot.get('products', {}).get('products', [])
+    return [products[position] for position in sorted(positions)]
+
+
+def first_known(identifiers: List[str], lookup: Dict[str, dict]) -> Optional[dict]:
+    return next((lookup[identifier] for identifier in identifiers if identifier in lookup), None)
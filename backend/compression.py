@@ -0,0 +1,126 @@
+import gzip
+import os
+from typing import List, Optional
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it only gzip is offered
+    brotli = None
+
+# Bodies smaller than this are sent as they are
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def supported_encodings() -> List[str]:
+    """Encodings in server preference order"""
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Best supported coding by the client's q-values, ties broken by server preference"""
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[coding.strip().lower()] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in supported_encodings():
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware negotiating brotli/gzip for JSON and text bodies above COMPRESSION_MIN_BYTES.
+    Strong ETags get an encoding suffix so each representation keeps a distinct tag.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+        encoding = choose_encoding(accept) if accept else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        chunks: List[bytes] = []
+
+        async def compressing_send(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or start_message is None:
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            await send_buffered(b"".join(chunks))
+
+        async def send_buffered(body: bytes):
+            headers = [(name, value) for name, value in start_message.get("headers", [])]
+            names = {name.lower() for name, _ in headers}
+            content_type = next((value.decode("latin-1") for name, value in headers if name.lower() == b"content-type"), "")
+            compressible = (
+                len(body) >= self.minimum_size
+                and b"content-encoding" not in names
+                and content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            if compressible:
+                body = compress(body, encoding)
+                headers = [
+                    (name, retag(value, encoding) if name.lower() == b"etag" else value)
+                    for name, value in headers if name.lower() != b"content-length"
+                ]
+                headers += [
+                    (b"content-encoding", encoding.encode()),
+                    (b"content-length", str(len(body)).encode()),
+                ]
+            if content_type.startswith(COMPRESSIBLE_TYPES) or start_message["status"] == 304:
+                headers.append((b"vary", b"Accept-Encoding"))
+            await send({**start_message, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, compressing_send)
+        # Responses without a body message (e.g. 304) still need their start message
+        if start_message is not None and not chunks:
+            await send(start_message)
+
+
+def retag(etag: bytes, encoding: str) -> bytes:
+    tag = etag.decode("latin-1")
+    if tag.endswith('"') and not tag.startswith("W/"):
+        tag = f'{tag[:-1]}-{encoding}"'
+    return tag.encode("latin-1")
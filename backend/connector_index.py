@@ -0,0 +1,108 @@
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from backend.data_sources import DataSnapshot
+
+# Ad platforms exposed by the ecom agent, keyed by data source name
+AD_PLATFORMS = {
+    "meta_ads": "Meta Ads",
+    "google_ads": "Google Ads",
+}
+
+
+class RecordIndex(Mapping):
+    """Key -> position in a record sequence; shared snapshot records are decoded only when looked up"""
+
+    def __init__(self, records: Sequence[Any], key: Callable[[Any], Any]):
+        self._records = records
+        self._rows: Dict[str, int] = {}
+        for row, record in enumerate(records):
+            value = key(record)
+            if value:
+                self._rows[value.upper()] = row
+
+    def __getitem__(self, key: str) -> Any:
+        return self._records[self._rows[key]]
+
+    def __contains__(self, key) -> bool:
+        return key in self._rows
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+class JoinIndex(Mapping):
+    """Key -> record of another index, through precomputed key -> key links"""
+
+    def __init__(self, links: Dict[str, str], target: RecordIndex):
+        self._links = {key: linked for key, linked in links.items() if linked in target}
+        self._target = target
+
+    def __getitem__(self, key: str) -> Any:
+        return self._target[self._links[key]]
+
+    def __contains__(self, key) -> bool:
+        return key in self._links
+
+    def __iter__(self):
+        return iter(self._links)
+
+    def __len__(self) -> int:
+        return len(self._links)
+
+
+def latest_event(shipment: Any) -> Optional[Any]:
+    """Most recent tracking event of a shipment"""
+    events = shipment.get('events') or ()
+    return max(events, key=lambda event: event.get('timestamp') or '', default=None)
+
+
+@dataclass(frozen=True)
+class ConnectorIndex:
+    """Hash lookups over one connector snapshot; identifiers are upper-cased"""
+    orders_by_number: RecordIndex
+    shipments_by_tracking: RecordIndex
+    products_by_id: RecordIndex
+    ad_performance: Dict[str, Any]
+    # Shopify order <-> DHL shipment, joined on the order's tracking number
+    shipments_by_order: JoinIndex
+    orders_by_tracking: JoinIndex
+
+
+def build_connector_index(snapshot: DataSnapshot) -> ConnectorIndex:
+    orders = snapshot.get('shopify', {}).get('orders', [])
+    shipments = snapshot.get('dhl', {}).get('shipments', [])
+    products = snapshot.get('products', {}).get('products', [])
+
+    # Collected while the order index decodes each order, so orders are read once
+    tracking_by_order: Dict[str, str] = {}
+
+    def order_key(order: Any) -> Optional[str]:
+        number, tracking = order.get('order_number'), order.get('tracking_number')
+        if number and tracking:
+            tracking_by_order[number.upper()] = tracking.upper()
+        return number
+
+    orders_by_number = RecordIndex(orders, order_key)
+    shipments_by_tracking = RecordIndex(shipments, lambda s: s.get('tracking_number'))
+
+    return ConnectorIndex(
+        orders_by_number=orders_by_number,
+        shipments_by_tracking=shipments_by_tracking,
+        products_by_id=RecordIndex(products, lambda p: p.get('id')),
+        shipments_by_order=JoinIndex(tracking_by_order, shipments_by_tracking),
+        orders_by_tracking=JoinIndex({tracking: number for number, tracking in tracking_by_order.items()}, orders_by_number),
+        ad_performance={
+            source: snapshot.get(source, {}).get('overall_performance', {})
+            for source in AD_PLATFORMS
+        },
+    )
+
+
+def get_connector_index(snapshot: DataSnapshot) -> ConnectorIndex:
+    """Index built once per snapshot version"""
+    return snapshot.derive("connector_index", build_connector_index)
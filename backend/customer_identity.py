@@ -0,0 +1,203 @@
+import hashlib
+import math
+import os
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from backend.data_sources import DataSnapshot
+
+CUSTOMER_EXACT_LIMIT = int(os.getenv("CUSTOMER_EXACT_LIMIT", "50000"))
+# 2 ** precision registers; standard error about 1.04 / sqrt(2 ** precision), 1.6% at 12
+CUSTOMER_HLL_PRECISION = int(os.getenv("CUSTOMER_HLL_PRECISION", "12"))
+# Prepended to 10-digit national numbers so "+1 555 010 1234" and "(555) 010-1234" agree
+DEFAULT_COUNTRY_CODE = os.getenv("DEFAULT_COUNTRY_CODE", "1")
+
+ALL_CHANNELS = "all"
+
+# Domains whose mailboxes ignore dots in the local part
+DOTLESS_EMAIL_DOMAINS = {"gmail.com", "googlemail.com"}
+
+
+def normalize_email(email: Any) -> Optional[str]:
+    if not isinstance(email, str) or "@" not in email:
+        return None
+    local, _, domain = email.strip().lower().rpartition("@")
+    local = local.split("+", 1)[0]
+    if domain in DOTLESS_EMAIL_DOMAINS:
+        local = local.replace(".", "")
+    return f"{local}@{domain}" if local and domain else None
+
+
+def normalize_phone(phone: Any) -> Optional[str]:
+    if not isinstance(phone, (str, int)):
+        return None
+    digits = re.sub(r"\D", "", str(phone))
+    if digits.startswith("00"):
+        digits = digits[2:]
+    if len(digits) == 10:
+        digits = DEFAULT_COUNTRY_CODE + digits
+    return digits if len(digits) >= 7 else None
+
+
+def identity_hash(key: str) -> int:
+    """Stable 64-bit hash, so sketches from different processes or snapshots merge"""
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little')
+
+
+class HyperLogLog:
+    """HyperLogLog distinct counter (Flajolet et al.) with linear counting for small counts"""
+
+    # 2 ** -rank for every possible register value
+    _INVERSE_POWERS = [2.0 ** -rank for rank in range(66)]
+
+    def __init__(self, precision: int = CUSTOMER_HLL_PRECISION, registers: Optional[bytearray] = None):
+        self.precision = precision
+        self.registers = registers if registers is not None else bytearray(1 << precision)
+
+    def add(self, key: str) -> None:
+        self.add_hash(identity_hash(key))
+
+    def add_hash(self, value: int) -> None:
+        index = value >> (64 - self.precision)
+        rest = value & ((1 << (64 - self.precision)) - 1)
+        rank = 64 - self.precision - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, other: "HyperLogLog") -> None:
+        """Merge another sketch of the same precision into this one"""
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def copy(self) -> "HyperLogLog":
+        return HyperLogLog(self.precision, bytearray(self.registers))
+
+    def __len__(self) -> int:
+        size = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(map(self._INVERSE_POWERS.__getitem__, self.registers))
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+        return round(estimate)
+
+
+class CustomerIdentityIndex:
+    """
+    One customer per normalised email across the store connectors. A record without an email
+    joins the email its phone was seen with, unless several emails share that phone (households,
+    shop numbers), in which case the phone is its own customer. Distinct customers per (channel,
+    day) and (channel, month) are exact sets up to CUSTOMER_EXACT_LIMIT customers and HyperLogLog
+    sketches beyond; both merge, so a date range is a union of whole months and loose days.
+    """
+
+    def __init__(self, activity: Iterable[Tuple[str, Optional[str], Optional[str], Optional[str]]],
+                 exact_limit: int = CUSTOMER_EXACT_LIMIT):
+        """activity: (channel, ISO date or None, email, phone) per order or customer record"""
+        rows = []
+        phone_emails: Dict[str, set] = defaultdict(set)
+        for channel, day, email, phone in activity:
+            email, phone = normalize_email(email), normalize_phone(phone)
+            if not email and not phone:
+                continue
+            if email and phone and len(phone_emails[phone]) < 2:
+                phone_emails[phone].add(email)
+            rows.append((channel, day[:10] if day else None, email, phone))
+
+        self._identity: Dict[str, str] = {}
+        channels: Dict[str, set] = defaultdict(set)
+        resolved = []
+        for channel, day, email, phone in rows:
+            customer = self._resolve(email, phone, phone_emails)
+            channels[channel].add(customer)
+            resolved.append((channel, day, customer))
+
+        customers = set().union(*channels.values())
+        self.customers = len(customers)
+        self.by_channel = {channel: len(members) for channel, members in sorted(channels.items())}
+        self.shared_customers = sum(1 for customer in customers if sum(customer in members for members in channels.values()) > 1)
+        self.exact = self.customers <= exact_limit
+
+        if self.exact:
+            new_sketch, add = set, set.add
+        else:
+            # Hash each customer once rather than once per sketch it lands in
+            hashes = {customer: identity_hash(customer) for customer in customers}
+            resolved = [(channel, day, hashes[customer]) for channel, day, customer in resolved]
+            new_sketch, add = HyperLogLog, HyperLogLog.add_hash
+        self._days: Dict[str, Dict[str, Any]] = defaultdict(dict)
+        self._months: Dict[str, Dict[str, Any]] = defaultdict(dict)
+        for channel, day, customer in resolved:
+            if not day:
+                continue
+            for name in (channel, ALL_CHANNELS):
+                for buckets, key in ((self._days[name], day), (self._months[name], day[:7])):
+                    sketch = buckets.get(key)
+                    if sketch is None:
+                        sketch = buckets[key] = new_sketch()
+                    add(sketch, customer)
+
+    def _resolve(self, email: Optional[str], phone: Optional[str], phone_emails: Dict[str, set]) -> str:
+        if email:
+            customer = f"email:{email}"
+        elif phone and len(phone_emails.get(phone, ())) == 1:
+            customer = f"email:{next(iter(phone_emails[phone]))}"
+        else:
+            customer = f"phone:{phone}"
+        for key in (email and f"email:{email}", phone and f"phone:{phone}"):
+            if key:
+                self._identity.setdefault(key, customer)
+        return customer
+
+    def lookup(self, email: Optional[str] = None, phone: Optional[str] = None) -> Optional[str]:
+        """Customer id for an email or phone number seen in the connectors"""
+        email, phone = normalize_email(email), normalize_phone(phone)
+        return (email and self._identity.get(f"email:{email}")) or (phone and self._identity.get(f"phone:{phone}")) or None
+
+    def _window(self, channel: str, start: Optional[str], end: Optional[str]) -> Iterator[Any]:
+        """Sketches covering [start, end] (ISO dates, inclusive): whole months, then loose days"""
+        days, months = self._days.get(channel, {}), self._months.get(channel, {})
+        for month, sketch in months.items():
+            if (not start or start <= f"{month}-01") and (not end or f"{month}-31" <= end):
+                yield sketch
+            else:
+                yield from (
+                    sketch for day, sketch in days.items()
+                    if day[:7] == month and (not start or start <= day) and (not end or day <= end)
+                )
+
+    def distinct(self, channel: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None) -> int:
+        """Distinct customers with activity between start and end; all dated activity without bounds"""
+        merged = None
+        for sketch in self._window(channel or ALL_CHANNELS, start and start[:10], end and end[:10]):
+            if merged is None:
+                merged = sketch.copy()
+            else:
+                merged.update(sketch)
+        return len(merged) if merged is not None else 0
+
+    def daily(self, channel: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+        days = self._days.get(channel or ALL_CHANNELS, {})
+        return [
+            {"date": day, "customers": len(days[day])}
+            for day in sorted(days)
+            if (not start or start[:10] <= day) and (not end or day <= end[:10])
+        ]
+
+
+def store_activity(snapshot: DataSnapshot) -> Iterator[Tuple[str, Optional[str], Optional[str], Optional[str]]]:
+    for order in snapshot.get('shopify', {}).get('orders', []):
+        customer = order.get('customer') or {}
+        yield "shopify", order.get('order_date'), customer.get('email'), customer.get('phone')
+    woocommerce = snapshot.get('woocommerce', {})
+    for order in woocommerce.get('orders', []):
+        customer = order.get('customer') or {}
+        yield "woocommerce", order.get('order_date'), customer.get('email'), customer.get('phone')
+    # Registered customers count even without orders, but registration is not activity
+    for customer in woocommerce.get('customers', []):
+        yield "woocommerce", None, customer.get('email'), customer.get('phone')
+
+
+def get_customer_index(snapshot: DataSnapshot) -> CustomerIdentityIndex:
+    """Index built once per snapshot version"""
+    return snapshot.derive("customer_identity", lambda s: CustomerIdentityIndex(store_activity(s)))
@@ -0,0 +1,76 @@
+from array import array
+from typing import Sequence
+
+DAY_MICROS = 86_400 * 1_000_000
+
+
+def day_of(micros: int) -> int:
+    """Days since the epoch (UTC) for a timestamp in microseconds"""
+    return micros // DAY_MICROS
+
+
+class FenwickTree:
+    """
+    Binary indexed tree over per-slot counts: O(log n) point updates, prefix sums and
+    searches. Backed by any int sequence of length n + 1 (index 0 unused), such as an
+    array or a read-only memoryview into a data snapshot.
+    """
+    __slots__ = ("tree", "size")
+
+    def __init__(self, tree: Sequence[int]):
+        self.tree = tree
+        self.size = len(tree) - 1
+
+    @staticmethod
+    def build(counts: Sequence[int], typecode: str = 'I') -> array:
+        """Tree array for the given per-slot counts, in O(n)"""
+        tree = array(typecode, [0])
+        tree.extend(counts)
+        size = len(counts)
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        return tree
+
+    def add(self, slot: int, delta: int = 1) -> None:
+        tree, size = self.tree, self.size
+        i = slot + 1
+        while i <= size:
+            tree[i] += delta
+            i += i & -i
+
+    def prefix(self, stop: int) -> int:
+        """Sum of slots [0, stop)"""
+        tree = self.tree
+        total = 0
+        i = min(stop, self.size)
+        while i > 0:
+            total += tree[i]
+            i &= i - 1
+        return total
+
+    def range_sum(self, start: int, stop: int) -> int:
+        """Sum of slots [start, stop), clamped to the tree"""
+        start = max(start, 0)
+        if stop <= start:
+            return 0
+        return self.prefix(stop) - self.prefix(start)
+
+    def find(self, k: int) -> int:
+        """Smallest slot whose running total reaches k (1 <= k <= total)"""
+        tree, size = self.tree, self.size
+        position = 0
+        step = 1 << (size.bit_length() - 1) if size else 0
+        while step:
+            candidate = position + step
+            if candidate <= size and tree[candidate] < k:
+                position = candidate
+                k -= tree[candidate]
+            step >>= 1
+        return position
+
+    def last_nonempty(self, stop: int) -> int:
+        """Last slot before stop with a non-zero count, or -1"""
+        total = self.prefix(stop)
+        return self.find(total) if total else -1
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from backend.metrics import span
+from backend.shared_snapshot import SharedSnapshot, SharedSnapshotFile, SnapshotWriter, shared_snapshots
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Connector files served by the shared registry, keyed by source name
+CONNECTOR_FILES = {
+    "products": "product.json",
+    "shopify": "shopify_demo.json",
+    "dhl": "dhl_demo.json",
+    "strategies": "strategies.json",
+    "meta_ads": "meta_ads.json",
+    "google_ads": "google_ads.json",
+    "pinterest_ads": "pinterest_ads.json",
+    "google_analytics": "google_analytics.json",
+    "woocommerce": "woocommerce.json",
+}
+
+# Record lists that stay in the shared snapshot and are decoded per access, by source name
+SHARED_COLLECTIONS = {
+    "products": ("products",),
+    "shopify": ("orders",),
+    "dhl": ("shipments",),
+    "woocommerce": ("orders", "products", "customers"),
+}
+
+# How often the background task checks the files for changes (0 disables it)
+POLL_INTERVAL_SECONDS = float(os.getenv("DATA_SOURCE_POLL_SECONDS", "5"))
+
+
+class FrozenDict(dict):
+    """Read-only dict used for snapshot payloads"""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Data source snapshots are read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    """Recursively convert parsed JSON into read-only dicts and tuples"""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    """Immutable view of every connector file at one point in time"""
+    version: int
+    sources: FrozenDict
+    mtimes: Dict[str, Optional[int]]
+    _derived: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+
+    def get(self, name: str, default: Any = None) -> Any:
+        return self.sources.get(name, default)
+
+    def derive(self, key: str, builder: Callable[["DataSnapshot"], Any]) -> Any:
+        """Build a value from this snapshot once and reuse it until the next reload"""
+        if key not in self._derived:
+            self._derived[key] = builder(self)
+        return self._derived[key]
+
+
+class DataSourceRegistry:
+    """Loads connector files once and swaps in a new snapshot when they change"""
+
+    def __init__(self, files: Dict[str, str], poll_interval: float = POLL_INTERVAL_SECONDS):
+        self._files = dict(files)
+        self._poll_interval = poll_interval
+        self._snapshot: Optional[DataSnapshot] = None
+        self._lock = asyncio.Lock()
+        self._watcher: Optional[asyncio.Task] = None
+
+    def _stat(self) -> Dict[str, Optional[int]]:
+        mtimes = {}
+        for name, filename in self._files.items():
+            try:
+                mtimes[name] = os.stat(filename).st_mtime_ns
+            except OSError:
+                mtimes[name] = None
+        return mtimes
+
+    def _load(self, previous: Optional[DataSnapshot]) -> DataSnapshot:
+        with span("data_load"):
+            return self._load_sources(previous)
+
+    def _load_sources(self, previous: Optional[DataSnapshot]) -> DataSnapshot:
+        mtimes = self._stat()
+        sources = {}
+        for name, filename in self._files.items():
+            # Files that did not change keep their already-frozen payload
+            if previous is not None and name in previous.sources and previous.mtimes.get(name) == mtimes[name]:
+                sources[name] = previous.sources[name]
+                continue
+            try:
+                with open(filename, 'r', encoding='utf-8') as f:
+                    sources[name] = freeze(json.load(f))
+            except Exception as e:
+                logger.error(f"Error loading data source {filename}: {e}")
+                if previous is not None and name in previous.sources:
+                    sources[name] = previous.sources[name]
+        version = previous.version + 1 if previous is not None else 1
+        return DataSnapshot(version=version, sources=FrozenDict(sources), mtimes=mtimes)
+
+    async def snapshot(self) -> DataSnapshot:
+        """Return the current snapshot, loading it on first use"""
+        if self._snapshot is None:
+            async with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = await asyncio.to_thread(self._load, None)
+        self._ensure_watcher()
+        return self._snapshot
+
+    async def version(self) -> int:
+        """Version of the current snapshot (used in ETags)"""
+        return (await self.snapshot()).version
+
+    async def reload(self) -> DataSnapshot:
+        """Re-read changed files off the event loop and publish a new snapshot"""
+        async with self._lock:
+            self._snapshot = await asyncio.to_thread(self._load, self._snapshot)
+            logger.info(f"Data sources reloaded (version {self._snapshot.version})")
+        return self._snapshot
+
+    def _ensure_watcher(self):
+        if self._poll_interval <= 0:
+            return
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.get_running_loop().create_task(self._watch())
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self._poll_interval)
+            try:
+                mtimes = await asyncio.to_thread(self._stat)
+                if self._snapshot is not None and mtimes != self._snapshot.mtimes:
+                    await self.reload()
+            except Exception as e:
+                logger.error(f"Data source watcher error: {e}")
+
+    async def stop(self):
+        """Cancel the background watcher"""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            self._watcher = None
+
+
+def write_connector_sources(writer: SnapshotWriter, files: Dict[str, str] = CONNECTOR_FILES) -> None:
+    """Add every connector file to a snapshot, large record lists as record tables"""
+    for name, filename in files.items():
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                source = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading data source {filename}: {e}")
+            continue
+        collections = [key for key in SHARED_COLLECTIONS.get(name, ()) if isinstance(source.get(key), list)]
+        for key in collections:
+            writer.add_records(f"{name}.{key}", source[key])
+        writer.add_document(f"source:{name}", {k: v for k, v in source.items() if k not in collections})
+    writer.meta["connectors"] = list(files)
+
+
+def shared_connector_sources(snapshot: SharedSnapshot) -> FrozenDict:
+    sources = {}
+    for name in snapshot.meta.get("connectors", []):
+        if not snapshot.has(f"document:source:{name}"):
+            continue
+        source = dict(freeze(snapshot.document(f"source:{name}")))
+        for key in SHARED_COLLECTIONS.get(name, ()):
+            if snapshot.has(f"records:{name}.{key}"):
+                source[key] = snapshot.records(f"{name}.{key}", freeze)
+        sources[name] = FrozenDict(source)
+    return FrozenDict(sources)
+
+
+class SharedDataSourceRegistry(DataSourceRegistry):
+    """
+    Serves connector data from the production launcher's shared snapshot instead of the files;
+    the launcher rebuilds the snapshot, so there is nothing to watch or reload here
+    """
+
+    def __init__(self, snapshots: SharedSnapshotFile):
+        super().__init__({}, poll_interval=0)
+        self._snapshots = snapshots
+
+    async def snapshot(self) -> DataSnapshot:
+        shared = self._snapshots.current()
+        if self._snapshot is None or self._snapshot.version != shared.generation:
+            self._snapshot = DataSnapshot(version=shared.generation, sources=shared_connector_sources(shared), mtimes={})
+        return self._snapshot
+
+    async def reload(self) -> DataSnapshot:
+        return await self.snapshot()
+
+
+connector_registry = SharedDataSourceRegistry(shared_snapshots) if shared_snapshots else DataSourceRegistry(CONNECTOR_FILES)
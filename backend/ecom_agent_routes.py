@@ -1,54 +1,23 @@
 import json
 import logging
-import os
+import re
+import time
+from collections import defaultdict
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
-from emergentintegrations.llm.chat import LlmChat, UserMessage
-from dotenv import load_dotenv
-
-# Load environment variables
-load_dotenv()
+from backend.data_sources import DataSnapshot, connector_registry
+from backend.connector_index import AD_PLATFORMS, get_connector_index
+from backend.http_cache import SHORT_LIVED, http_cache
+from backend.json_response import FastJSONRoute
+from backend.llm_provider import get_llm_provider
+from backend.metrics import span, span_duration
+from backend.order_store import get_order_store
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-ecom_agent_router = APIRouter()
-
-# Emergent LLM API key (required)
-EMERGENT_LLM_KEY = os.getenv("EMERGENT_LLM_KEY")
-if not EMERGENT_LLM_KEY:
-    logger.error("EMERGENT_LLM_KEY environment variable is required")
-    raise ValueError("EMERGENT_LLM_KEY must be set in environment variables")
-
-# Load all data sources
-def load_all_data_sources():
-    """Load all JSON data sources for the e-commerce agent"""
-    data_sources = {}
-    
-    try:
-        with open('product.json', 'r') as f:
-            data_sources['products'] = json.load(f)
-        
-        with open('shopify_demo.json', 'r') as f:
-            data_sources['shopify'] = json.load(f)
-        
-        with open('dhl_demo.json', 'r') as f:
-            data_sources['dhl'] = json.load(f)
-        
-        with open('strategies.json', 'r') as f:
-            data_sources['strategies'] = json.load(f)
-        
-        with open('meta_ads.json', 'r') as f:
-            data_sources['meta_ads'] = json.load(f)
-        
-        with open('google_ads.json', 'r') as f:
-            data_sources['google_ads'] = json.load(f)
-        
-        return data_sources
-    except Exception as e:
-        logger.error(f"Error loading data sources: {e}")
-        return {}
+ecom_agent_router = APIRouter(route_class=FastJSONRoute)
 
 # Pydantic models
 class EcomChatMessage(BaseModel):
@@ -74,76 +43,131 @@ I can help you with:
 I have access to real-time data from all your connected systems and can provide actionable insights to grow your business."""
 }
 
-def create_context_from_query(query: str, data_sources: dict) -> tuple[str, List[str]]:
+# Mapping of file names to clean connector names
+source_name_map = {
+    "product.json": "Product Catalog",
+    "shopify_demo.json": "Shopify Orders",
+    "dhl_demo.json": "DHL Tracking",
+    "strategies.json": "Marketing Strategies",
+    "meta_ads.json": "Meta Ads",
+    "google_ads.json": "Google Ads",
+    "knowledge_base": "Knowledge Base"
+}
+
+def compact_json(value) -> str:
+    """Serialize without indentation or spaces to keep prompt tokens down"""
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+def format_order_rows(orders) -> str:
+    """Render orders as one pipe-separated row each"""
+    rows = ["order_number|order_date|status|customer|email|items|subtotal|shipping|tax|total|currency|ship_to|tracking_number|carrier"]
+    for order in orders:
+        customer = order.get('customer', {})
+        address = order.get('shipping_address', {})
+        items = "; ".join(
+            f"{item.get('product_id')} {item.get('product_name')} x{item.get('quantity')} @{item.get('price')}"
+            for item in order.get('items', [])
+        )
+        rows.append("|".join(str(value) for value in [
+            order.get('order_number'), order.get('order_date'), order.get('status'),
+            customer.get('name'), customer.get('email'), items,
+            order.get('subtotal'), order.get('shipping'), order.get('tax'), order.get('total'), order.get('currency'),
+            f"{address.get('city')}, {address.get('state')}, {address.get('country')}",
+            order.get('tracking_number'), order.get('carrier')
+        ]))
+    return "\n".join(rows)
+
+def format_shipment_rows(shipments) -> str:
+    """Render shipments as one pipe-separated row each, events joined inline"""
+    rows = ["tracking_number|status|service|origin|destination|shipped_date|estimated_delivery|actual_delivery|weight|events"]
+    for shipment in shipments:
+        origin = shipment.get('origin', {})
+        destination = shipment.get('destination', {})
+        events = "; ".join(
+            f"{event.get('timestamp')} {event.get('status')} @ {event.get('location')}: {event.get('description')}"
+            for event in shipment.get('events', [])
+        )
+        rows.append("|".join(str(value) for value in [
+            shipment.get('tracking_number'), shipment.get('status'), shipment.get('service_type'),
+            f"{origin.get('city')}, {origin.get('state')}", f"{destination.get('city')}, {destination.get('state')}",
+            shipment.get('shipped_date'), shipment.get('estimated_delivery'), shipment.get('actual_delivery'),
+            shipment.get('package_weight'), events
+        ]))
+    return "\n".join(rows)
+
+def build_context_fragments(snapshot: DataSnapshot) -> Dict[str, str]:
+    """Serialize every data source once per snapshot version"""
+    data_sources = snapshot.sources
+    products = data_sources.get('products', {}).get('products', [])
+    orders = data_sources.get('shopify', {}).get('orders', [])
+    shipments = data_sources.get('dhl', {}).get('shipments', [])
+    strategies = data_sources.get('strategies', {}).get('strategies', [])
+    meta_ads = data_sources.get('meta_ads', {})
+    google_ads = data_sources.get('google_ads', {})
+    meta_campaigns = meta_ads.get('campaigns', [])
+    google_campaigns = google_ads.get('campaigns', [])
+    meta_overall = compact_json(meta_ads.get('overall_performance', {}))
+    google_overall = compact_json(google_ads.get('overall_performance', {}))
+
+    return {
+        "products": f"PRODUCT CATALOG ({len(products)} products):\n{compact_json(products[:5])}",
+        "orders": f"SHOPIFY ORDERS ({len(orders)} orders):\n{format_order_rows(orders)}",
+        "shipments": f"DHL TRACKING ({len(shipments)} shipments):\n{format_shipment_rows(shipments)}",
+        "strategies": f"MARKETING STRATEGIES ({len(strategies)} strategies):\n{compact_json(strategies)}",
+        "meta_ads": f"META ADS CAMPAIGNS ({len(meta_campaigns)} campaigns):\n{compact_json(meta_campaigns)}\n\nOVERALL PERFORMANCE:\n{meta_overall}",
+        "google_ads": f"GOOGLE ADS CAMPAIGNS ({len(google_campaigns)} campaigns):\n{compact_json(google_campaigns)}\n\nOVERALL PERFORMANCE:\n{google_overall}",
+        "meta_performance": f"META ADS PERFORMANCE:\n{meta_overall}",
+        "google_performance": f"GOOGLE ADS PERFORMANCE:\n{google_overall}",
+    }
+
+def create_context_from_query(query: str, snapshot: DataSnapshot) -> tuple[str, List[str]]:
     """
-    Analyze query and fetch relevant data from appropriate sources
+    Analyze query and assemble the relevant precomputed data source fragments
     Returns: (context_string, list_of_sources_used)
     """
     query_lower = query.lower()
+    fragments = snapshot.derive("ecom_context_fragments", build_context_fragments)
     context_parts = []
     sources_used = []
     
-    # Mapping of file names to clean connector names
-    source_name_map = {
-        "product.json": "Product Catalog",
-        "shopify_demo.json": "Shopify Orders",
-        "dhl_demo.json": "DHL Tracking",
-        "strategies.json": "Marketing Strategies",
-        "meta_ads.json": "Meta Ads",
-        "google_ads.json": "Google Ads",
-        "knowledge_base": "Knowledge Base"
-    }
-    
     # Check for product queries
     if any(word in query_lower for word in ['product', 'inventory', 'stock', 'price', 'item', 'catalog']):
-        products = data_sources.get('products', {}).get('products', [])
-        context_parts.append(f"PRODUCT CATALOG ({len(products)} products):\n{json.dumps(products[:5], indent=2)}")
+        context_parts.append(fragments["products"])
         sources_used.append(source_name_map["product.json"])
     
     # Check for order/shopify queries
     if any(word in query_lower for word in ['order', 'purchase', 'shopify', 'customer', 'ord-']):
-        orders = data_sources.get('shopify', {}).get('orders', [])
-        context_parts.append(f"SHOPIFY ORDERS ({len(orders)} orders):\n{json.dumps(orders, indent=2)}")
+        context_parts.append(fragments["orders"])
         sources_used.append(source_name_map["shopify_demo.json"])
     
     # Check for shipping/tracking queries
     if any(word in query_lower for word in ['ship', 'delivery', 'track', 'dhl', 'dhl-']):
-        shipments = data_sources.get('dhl', {}).get('shipments', [])
-        context_parts.append(f"DHL TRACKING ({len(shipments)} shipments):\n{json.dumps(shipments, indent=2)}")
+        context_parts.append(fragments["shipments"])
         sources_used.append(source_name_map["dhl_demo.json"])
     
     # Check for strategy queries
     if any(word in query_lower for word in ['strategy', 'marketing', 'campaign', 'plan', 'tactic', 'goal']):
-        strategies = data_sources.get('strategies', {}).get('strategies', [])
-        context_parts.append(f"MARKETING STRATEGIES ({len(strategies)} strategies):\n{json.dumps(strategies, indent=2)}")
+        context_parts.append(fragments["strategies"])
         sources_used.append(source_name_map["strategies.json"])
     
     # Check for Meta Ads queries
     if any(word in query_lower for word in ['meta', 'facebook', 'instagram', 'social', 'meta-']):
-        meta_ads = data_sources.get('meta_ads', {})
-        campaigns = meta_ads.get('campaigns', [])
-        overall = meta_ads.get('overall_performance', {})
-        context_parts.append(f"META ADS CAMPAIGNS ({len(campaigns)} campaigns):\n{json.dumps(campaigns, indent=2)}\n\nOVERALL PERFORMANCE:\n{json.dumps(overall, indent=2)}")
+        context_parts.append(fragments["meta_ads"])
         sources_used.append(source_name_map["meta_ads.json"])
     
     # Check for Google Ads queries
     if any(word in query_lower for word in ['google', 'search', 'ppc', 'adwords', 'google-']):
-        google_ads = data_sources.get('google_ads', {})
-        campaigns = google_ads.get('campaigns', [])
-        overall = google_ads.get('overall_performance', {})
-        context_parts.append(f"GOOGLE ADS CAMPAIGNS ({len(campaigns)} campaigns):\n{json.dumps(campaigns, indent=2)}\n\nOVERALL PERFORMANCE:\n{json.dumps(overall, indent=2)}")
+        context_parts.append(fragments["google_ads"])
         sources_used.append(source_name_map["google_ads.json"])
     
     # Check for performance/analytics queries
     if any(word in query_lower for word in ['performance', 'roi', 'roas', 'revenue', 'sales', 'conversion', 'analytics']):
         if source_name_map["meta_ads.json"] not in sources_used:
-            meta_overall = data_sources.get('meta_ads', {}).get('overall_performance', {})
-            context_parts.append(f"META ADS PERFORMANCE:\n{json.dumps(meta_overall, indent=2)}")
+            context_parts.append(fragments["meta_performance"])
             sources_used.append(source_name_map["meta_ads.json"])
         
         if source_name_map["google_ads.json"] not in sources_used:
-            google_overall = data_sources.get('google_ads', {}).get('overall_performance', {})
-            context_parts.append(f"GOOGLE ADS PERFORMANCE:\n{json.dumps(google_overall, indent=2)}")
+            context_parts.append(fragments["google_performance"])
             sources_used.append(source_name_map["google_ads.json"])
     
     # If no specific data found, provide knowledge base
@@ -153,6 +177,157 @@ def create_context_from_query(query: str, data_sources: dict) -> tuple[str, List
     
     return "\n\n---\n\n".join(context_parts), sources_used
 
+# Deterministic fast path for direct lookups that need no model call
+ORDER_PATTERN = re.compile(r"\bORD-\d+(?:-\d+)*\b", re.IGNORECASE)
+TRACKING_PATTERN = re.compile(r"\bDHL-\d+-TRK-\d+\b", re.IGNORECASE)
+PRODUCT_PATTERN = re.compile(r"\bPROD-\d+\b", re.IGNORECASE)
+AD_PLATFORM_PATTERN = re.compile(r"\b(meta|facebook|instagram|google|adwords)\b", re.IGNORECASE)
+AD_METRIC_PATTERN = re.compile(r"\b(roas|spend|spent|revenue|conversions?|ctr|clicks|impressions)\b", re.IGNORECASE)
+OPEN_ENDED_PATTERN = re.compile(
+    r"\b(why|how(?!\s+(?:many|much))|should|recommend\w*|suggest\w*|improv\w*|optimi[sz]\w*|compar\w*|"
+    r"analy[sz]\w*|explain|strateg\w*|plan|forecast\w*|predict\w*|ideas?|advice|tips?)\b",
+    re.IGNORECASE
+)
+AD_PLATFORM_ALIASES = {
+    "meta": "meta_ads",
+    "facebook": "meta_ads",
+    "instagram": "meta_ads",
+    "google": "google_ads",
+    "adwords": "google_ads",
+}
+
+# Per-path latency stats for /ecom-agent/chat (fast path intents and llm)
+intent_metrics = defaultdict(lambda: {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+
+def record_latency(path: str, started: float):
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    stats = intent_metrics[path]
+    stats["count"] += 1
+    stats["total_ms"] += elapsed_ms
+    stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+    span_duration.observe(elapsed_ms / 1000, span=f"ecom_chat:{path}")
+
+def classify_intent(message: str) -> Optional[tuple[str, List[str]]]:
+    """
+    Detect a single direct lookup in the message
+    Returns: (intent, entities) or None when the question should go to the model
+    """
+    if OPEN_ENDED_PATTERN.search(message):
+        return None
+
+    candidates = []
+    orders = ORDER_PATTERN.findall(message)
+    if orders:
+        candidates.append(("order_status", orders))
+    tracking = TRACKING_PATTERN.findall(message)
+    if tracking:
+        candidates.append(("shipment_status", tracking))
+    products = PRODUCT_PATTERN.findall(message)
+    if products:
+        candidates.append(("product_lookup", products))
+    platforms = AD_PLATFORM_PATTERN.findall(message)
+    if platforms and AD_METRIC_PATTERN.search(message):
+        candidates.append(("ad_performance", platforms))
+
+    # Mixed questions need the model to combine sources
+    if len(candidates) != 1:
+        return None
+    intent, entities = candidates[0]
+    return intent, list(dict.fromkeys(entity.upper() for entity in entities))
+
+def humanize(value: str) -> str:
+    return value.replace('_', ' ').title()
+
+def ad_performance_chart(platform_sources: List[str], data_sources) -> Dict[str, Any]:
+    """Comparison chart of spend, revenue and ROAS per ad platform"""
+    chart_data = {"type": "comparison", "data": []}
+    for source in platform_sources:
+        perf = data_sources.get(source, {}).get('overall_performance', {})
+        chart_data["data"].append({
+            "platform": AD_PLATFORMS[source],
+            "spend": perf.get('total_spend', 0),
+            "revenue": perf.get('total_revenue', 0),
+            "roas": float(perf.get('overall_roas', 0))
+        })
+    return chart_data
+
+def answer_intent(intent: str, entities: List[str], snapshot: DataSnapshot) -> Dict[str, Any]:
+    """Build a templated answer for a classified lookup"""
+    index = get_connector_index(snapshot)
+    lines = []
+    sources_used = []
+    chart_data = None
+
+    if intent == "order_status":
+        sources_used.append(source_name_map["shopify_demo.json"])
+        for order_number in entities:
+            order = index.orders_by_number.get(order_number)
+            if not order:
+                lines.append(f"I couldn't find order {order_number}.")
+                continue
+            items_str = ", ".join(f"{item['product_name']} (x{item['quantity']})" for item in order.get('items', []))
+            lines.append(f"Order {order['order_number']} is {humanize(order['status'])}.")
+            lines.append(f"Order date: {order['order_date'][:10]}")
+            lines.append(f"Items: {items_str}")
+            lines.append(f"Total: ${order['total']} {order.get('currency', '')}".rstrip())
+            shipment = index.shipments_by_order.get(order_number)
+            if shipment:
+                lines.append(f"Tracking: {shipment['tracking_number']} ({humanize(shipment['status'])})")
+                if source_name_map["dhl_demo.json"] not in sources_used:
+                    sources_used.append(source_name_map["dhl_demo.json"])
+            elif order.get('tracking_number'):
+                lines.append(f"Tracking: {order['tracking_number']}")
+
+    elif intent == "shipment_status":
+        sources_used.append(source_name_map["dhl_demo.json"])
+        for tracking_number in entities:
+            shipment = index.shipments_by_tracking.get(tracking_number)
+            if not shipment:
+                lines.append(f"I couldn't find shipment {tracking_number}.")
+                continue
+            lines.append(f"Shipment {shipment['tracking_number']} is {humanize(shipment['status'])} ({shipment['service_type']}).")
+            lines.append(f"From: {shipment['origin']['city']}, {shipment['origin']['state']}")
+            lines.append(f"To: {shipment['destination']['city']}, {shipment['destination']['state']}")
+            if shipment.get('estimated_delivery'):
+                lines.append(f"Estimated delivery: {shipment['estimated_delivery'][:10]}")
+            if shipment.get('events'):
+                latest = shipment['events'][-1]
+                lines.append(f"Latest update: {latest['timestamp'][:10]} - {latest['description']} ({latest['location']})")
+
+    elif intent == "product_lookup":
+        sources_used.append(source_name_map["product.json"])
+        for product_id in entities:
+            product = index.products_by_id.get(product_id)
+            if not product:
+                lines.append(f"I couldn't find product {product_id}.")
+                continue
+            lines.append(
+                f"{product['name']} ({product['id']}): {product['stock']} units in stock at "
+                f"${product['price']} {product.get('currency', '')}. Rating {product['rating']} from {product['reviews_count']} reviews."
+            )
+
+    elif intent == "ad_performance":
+        platform_sources = list(dict.fromkeys(AD_PLATFORM_ALIASES[entity.lower()] for entity in entities))
+        for source in platform_sources:
+            perf = index.ad_performance.get(source, {})
+            sources_used.append(AD_PLATFORMS[source])
+            lines.append(
+                f"{AD_PLATFORMS[source]}: ROAS {perf.get('overall_roas', 0)}x, spend ${perf.get('total_spend', 0):,}, "
+                f"revenue ${perf.get('total_revenue', 0):,}, {perf.get('total_conversions', 0)} conversions, "
+                f"CTR {perf.get('avg_ctr', 'n/a')}"
+            )
+        chart_data = ad_performance_chart(platform_sources, snapshot.sources)
+
+    citation_text = "\n\nSources Used:\n" + "\n".join([f"- {source}" for source in sources_used])
+    return {
+        "response": "\n".join(lines) + citation_text,
+        "sources": sources_used,
+        "model": "intent-router",
+        "intent": intent,
+        "data_context_size": 0,
+        "chart_data": chart_data
+    }
+
 @ecom_agent_router.get("/ecom-agent/knowledge-base")
 async def get_ecom_knowledge_base():
     """Get e-commerce agent knowledge base"""
@@ -165,10 +340,11 @@ async def update_ecom_knowledge_base(data: KnowledgeBaseUpdate):
     return {"success": True, "message": "Knowledge base updated"}
 
 @ecom_agent_router.get("/ecom-agent/connectors")
+@http_cache(connector_registry.version, SHORT_LIVED)
 async def get_ecom_connectors():
     """Get status of all e-commerce connectors"""
     try:
-        data_sources = load_all_data_sources()
+        data_sources = (await connector_registry.snapshot()).sources
         
         connectors = [
             {
@@ -222,15 +398,26 @@ async def get_ecom_connectors():
 @ecom_agent_router.post("/ecom-agent/chat")
 async def chat_with_ecom_agent(chat: EcomChatMessage):
     """
-    Chat with e-commerce AI agent powered by GPT-4o-mini via Emergent Integrations
+    Chat with e-commerce AI agent powered by the configured LLM provider
+    (GPT-4o-mini via Emergent Integrations by default)
     Includes citations showing which data sources were used
     """
+    started = time.perf_counter()
     try:
-        # Load all data sources
-        data_sources = load_all_data_sources()
+        # Shared snapshot of all data sources
+        snapshot = await connector_registry.snapshot()
+        data_sources = snapshot.sources
+        
+        # Answer direct lookups from indexed connector data without the model
+        intent = classify_intent(chat.message)
+        if intent:
+            result = answer_intent(intent[0], intent[1], snapshot)
+            record_latency(f"fast_path:{intent[0]}", started)
+            return result
         
         # Create context from query
-        context, sources_used = create_context_from_query(chat.message, data_sources)
+        with span("aggregation"):
+            context, sources_used = create_context_from_query(chat.message, snapshot)
         
         # Extract metrics for visualization
         chart_data = None
@@ -238,30 +425,10 @@ async def chat_with_ecom_agent(chat: EcomChatMessage):
         
         # If asking about ads performance, prepare chart data
         if any(word in query_lower for word in ['performance', 'roas', 'spend', 'revenue', 'ads', 'campaign']):
-            chart_data = {
-                "type": "comparison",
-                "data": []
-            }
-            
-            # Add Meta Ads data
-            if 'Meta Ads' in sources_used:
-                meta_perf = data_sources.get('meta_ads', {}).get('overall_performance', {})
-                chart_data["data"].append({
-                    "platform": "Meta Ads",
-                    "spend": meta_perf.get('total_spend', 0),
-                    "revenue": meta_perf.get('total_revenue', 0),
-                    "roas": float(meta_perf.get('overall_roas', 0))
-                })
-            
-            # Add Google Ads data
-            if 'Google Ads' in sources_used:
-                google_perf = data_sources.get('google_ads', {}).get('overall_performance', {})
-                chart_data["data"].append({
-                    "platform": "Google Ads",
-                    "spend": google_perf.get('total_spend', 0),
-                    "revenue": google_perf.get('total_revenue', 0),
-                    "roas": float(google_perf.get('overall_roas', 0))
-                })
+            chart_data = ad_performance_chart(
+                [source for source, name in AD_PLATFORMS.items() if name in sources_used],
+                data_sources
+            )
         
         # Create system message with context
         system_message = f"""You are an expert E-commerce AI Assistant for Saturnin.
@@ -287,57 +454,72 @@ Context from connected data sources:
 
 Remember: Always base your answers on the actual data provided above."""
 
-        # Initialize chat with Emergent Integrations
-        llm_chat = LlmChat(
-            api_key=EMERGENT_LLM_KEY,
-            session_id=f"ecom-agent-{hash(chat.message)}",
-            system_message=system_message
-        ).with_model("openai", "gpt-4o-mini")
-        
-        # Create user message
-        user_message = UserMessage(text=chat.message)
-        
-        # Get response from LLM
-        response = await llm_chat.send_message(user_message)
+        # Get response from the configured LLM provider
+        llm = get_llm_provider()
+        with span("llm"):
+            response = await llm.send_message(
+                system_message,
+                chat.message,
+                session_id=f"ecom-agent-{hash(chat.message)}"
+            )
         
         # Add citation information (clean, no emoji, no bold)
         citation_text = "\n\nSources Used:\n" + "\n".join([f"- {source}" for source in sources_used])
+        record_latency("llm", started)
         
         return {
             "response": response + citation_text,
             "sources": sources_used,
-            "model": "gpt-4o-mini",
+            "model": llm.model,
             "data_context_size": len(context),
             "chart_data": chart_data
         }
         
     except Exception as e:
         logger.error(f"E-commerce agent error: {e}")
+        record_latency("error", started)
         return {
             "response": f"I apologize, but I encountered an error processing your request: {str(e)}. Please try again or rephrase your question.",
             "sources": [],
             "error": str(e)
         }
 
+@ecom_agent_router.get("/ecom-agent/metrics")
+async def get_ecom_agent_metrics():
+    """Latency per chat path (fast path intents vs model calls)"""
+    return {
+        "paths": {
+            path: {
+                "count": stats["count"],
+                "avg_ms": round(stats["total_ms"] / stats["count"], 3) if stats["count"] else 0,
+                "max_ms": round(stats["max_ms"], 3)
+            }
+            for path, stats in intent_metrics.items()
+        }
+    }
+
 @ecom_agent_router.get("/ecom-agent/analytics")
+@http_cache(connector_registry.version, SHORT_LIVED)
 async def get_ecom_analytics():
     """Get comprehensive e-commerce analytics"""
     try:
-        data_sources = load_all_data_sources()
+        snapshot = await connector_registry.snapshot()
+        data_sources = snapshot.sources
         
         # Calculate analytics
-        products = data_sources.get('products', {}).get('products', [])
-        orders = data_sources.get('shopify', {}).get('orders', [])
-        meta_perf = data_sources.get('meta_ads', {}).get('overall_performance', {})
-        google_perf = data_sources.get('google_ads', {}).get('overall_performance', {})
-        
-        total_revenue = sum(order.get('total', 0) for order in orders)
-        total_orders = len(orders)
-        avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
-        
-        total_ad_spend = meta_perf.get('total_spend', 0) + google_perf.get('total_spend', 0)
-        total_ad_revenue = meta_perf.get('total_revenue', 0) + google_perf.get('total_revenue', 0)
-        overall_roas = total_ad_revenue / total_ad_spend if total_ad_spend > 0 else 0
+        with span("aggregation"):
+            products = data_sources.get('products', {}).get('products', [])
+            orders = get_order_store(snapshot).summary()
+            meta_perf = data_sources.get('meta_ads', {}).get('overall_performance', {})
+            google_perf = data_sources.get('google_ads', {}).get('overall_performance', {})
+            
+            total_revenue = orders["revenue"]
+            total_orders = orders["orders"]
+            avg_order_value = orders["avg_order_value"]
+            
+            total_ad_spend = meta_perf.get('total_spend', 0) + google_perf.get('total_spend', 0)
+            total_ad_revenue = meta_perf.get('total_revenue', 0) + google_perf.get('total_revenue', 0)
+            overall_roas = total_ad_revenue / total_ad_spend if total_ad_spend > 0 else 0
         
         return {
             "summary": {
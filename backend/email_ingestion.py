@@ -0,0 +1,253 @@
+import asyncio
+import itertools
+import logging
+import os
+import re
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from backend.email_store import EmailStore
+from backend.llm_provider import get_llm_provider
+from backend.metrics import span
+from backend.text_classifier import CLASSIFIER_TRAINING_ROWS, LinearTextClassifier
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REPLY_WORKERS = int(os.getenv("EMAIL_REPLY_WORKERS", "4"))
+REPLY_BATCH_SIZE = int(os.getenv("EMAIL_REPLY_BATCH_SIZE", "8"))
+REPLY_QUEUE_SIZE = int(os.getenv("EMAIL_REPLY_QUEUE_SIZE", "10000"))
+# Fewest labelled emails the fallback model is trained on; with fewer there is no model
+EMAIL_MODEL_MIN_TRAINING = int(os.getenv("EMAIL_MODEL_MIN_TRAINING", "500"))
+# Score lead, per n-gram of the email, the model's label needs over the runner-up to replace "normal"
+EMAIL_MODEL_MIN_MARGIN = float(os.getenv("EMAIL_MODEL_MIN_MARGIN", "0.5"))
+
+# Keyword rules checked in order; the first match wins, otherwise the email is normal
+SENTIMENT_RULES = [
+    ("spam", re.compile(
+        r"\b(you won|winner|lottery|prize|congratulations|click (here|this link)|bitcoin|crypto|"
+        r"verify your (account|identity)|limited time offer|act fast|make \$[\d,]+)", re.IGNORECASE)),
+    ("handover", re.compile(
+        r"\b(bulk order|procurement|enterprise|partnership|distribut\w*|wholesale|api integration|"
+        r"connect me with|lawyer|attorney|legal action|speak (to|with) (a )?(human|manager|person))", re.IGNORECASE)),
+    ("angry", re.compile(
+        r"(\b(terrible|ridiculous|unacceptable|worst|furious|scam|disgusting|outrageous|awful|horrible)\b|!{3,})",
+        re.IGNORECASE)),
+    ("urgent", re.compile(
+        r"\b(urgent\w*|asap|immediately|emergency|missing|failed|suspended|overcharged|discrepancy|"
+        r"by tomorrow|never arrived|not received|wrong item)\b", re.IGNORECASE)),
+]
+
+# Lower value is answered first; spam gets no reply
+REPLY_PRIORITY = {"angry": 0, "urgent": 0, "handover": 1, "normal": 2}
+# Only the keyword rules may mark an email as spam, since spam is never answered
+RULE_ONLY_LABELS = {"spam"}
+
+
+def classify_email_sentiment(subject: str, body: str) -> str:
+    text = f"{subject}\n{body}"
+    for sentiment, pattern in SENTIMENT_RULES:
+        if pattern.search(text):
+            return sentiment
+    return "normal"
+
+
+def email_text(email: dict) -> str:
+    return f"{email.get('subject', '')}\n{email.get('body', '')}"
+
+
+def fallback_label(model: LinearTextClassifier, text: str) -> Optional[str]:
+    """The model's label for an email no rule matched, if it clearly beats the runner-up and is not rule-only"""
+    scores = model.scores(text)
+    if len(scores) < 2:
+        return None
+    (best, label), (runner_up, _) = sorted(zip(scores, model.labels), reverse=True)[:2]
+    if label in RULE_ONLY_LABELS or best - runner_up < EMAIL_MODEL_MIN_MARGIN * len(model.features(text)):
+        return None
+    return label
+
+
+def classify_emails(emails: List[dict], model: Optional[LinearTextClassifier] = None) -> List[str]:
+    """
+    Keyword rules first, since they define the priority lanes; emails no rule matches go to
+    the model, when there is one, and stay normal unless it is confident (see fallback_label)
+    """
+    labels = [classify_email_sentiment(email.get('subject', ''), email.get('body', '')) for email in emails]
+    if model is not None:
+        for i, label in enumerate(labels):
+            if label == "normal":
+                labels[i] = fallback_label(model, email_text(emails[i])) or "normal"
+    return labels
+
+
+def train_email_classifier(emails: Iterable[dict]) -> Optional[LinearTextClassifier]:
+    """
+    Linear model over subject and body, trained on an even sample of the labelled emails;
+    None when there are fewer than EMAIL_MODEL_MIN_TRAINING of them
+    """
+    labelled = [email for email in emails if email.get('sentiment')]
+    labelled = labelled[::max(1, len(labelled) // CLASSIFIER_TRAINING_ROWS)]
+    if len(labelled) < EMAIL_MODEL_MIN_TRAINING:
+        logger.info(f"Email classifier disabled: {len(labelled)} labelled emails, {EMAIL_MODEL_MIN_TRAINING} needed")
+        return None
+    model = LinearTextClassifier.train(map(email_text, labelled), (email['sentiment'] for email in labelled))
+    logger.info(f"Trained email classifier on {len(labelled)} emails ({', '.join(model.labels)})")
+    return model
+
+
+class StageMetrics:
+    """Item count and busy time of one pipeline stage"""
+
+    def __init__(self):
+        self.items = 0
+        self.batches = 0
+        self.seconds = 0.0
+        self.failures = 0
+
+    def record(self, items: int, seconds: float):
+        self.items += items
+        self.batches += 1
+        self.seconds += seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "items": self.items,
+            "batches": self.batches,
+            "failures": self.failures,
+            "busy_seconds": round(self.seconds, 4),
+            "avg_ms_per_item": round(self.seconds / self.items * 1000, 3) if self.items else None,
+            "items_per_second": round(self.items / self.seconds, 1) if self.seconds > 0 else None
+        }
+
+
+class ReplyPipeline:
+    """
+    Ingests raw emails into the store, classifies them and drafts AI replies
+    through a bounded pool of workers that batch requests to the LLM provider
+    """
+
+    def __init__(
+        self,
+        store: EmailStore,
+        system_message: Callable[[], str],
+        classify: Callable[[List[dict]], List[str]] = classify_emails,
+        workers: int = REPLY_WORKERS,
+        batch_size: int = REPLY_BATCH_SIZE,
+        queue_size: int = REPLY_QUEUE_SIZE
+    ):
+        self.store = store
+        self.system_message = system_message
+        self.classify = classify
+        self.workers = workers
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._sequence = itertools.count()
+        self.lane_depth = Counter()
+        self.stages = {name: StageMetrics() for name in ("classify", "queue_wait", "generate")}
+
+    def _ensure_workers(self):
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue(maxsize=self.queue_size)
+        self._tasks = [task for task in self._tasks if not task.done()]
+        loop = asyncio.get_running_loop()
+        while len(self._tasks) < self.workers:
+            self._tasks.append(loop.create_task(self._worker()))
+
+    async def ingest(self, raw_emails: Iterable[dict]) -> Dict[str, Any]:
+        """Store a batch of emails and queue reply generation by priority lane"""
+        self._ensure_workers()
+        started = time.perf_counter()
+        emails = [dict(raw) for raw in raw_emails]
+        unlabelled = [email for email in emails if not email.get('sentiment')]
+        if unlabelled:
+            for email, sentiment in zip(unlabelled, self.classify(unlabelled)):
+                email['sentiment'] = sentiment
+
+        records = []
+        for email in emails:
+            email['id'] = email.get('id') or f"email_{uuid.uuid4().hex[:12]}"
+            email['timestamp'] = email.get('timestamp') or datetime.now(timezone.utc)
+            email.setdefault('read', False)
+            email['ai_reply'] = ""
+            email['reply_status'] = "queued" if email['sentiment'] in REPLY_PRIORITY else "skipped"
+            records.append(self.store.add(email))
+        self.stages["classify"].record(len(records), time.perf_counter() - started)
+
+        for record in records:
+            if record['reply_status'] == "queued":
+                priority = REPLY_PRIORITY[record['sentiment']]
+                # Waits when the queue is full so producers are throttled by the workers
+                await self._queue.put((priority, next(self._sequence), record['id'], time.perf_counter()))
+                self.lane_depth[priority] += 1
+
+        return {
+            "accepted": len(records),
+            "ids": [record['id'] for record in records],
+            "queued": sum(1 for record in records if record['reply_status'] == "queued"),
+            "sentiment_breakdown": dict(Counter(record['sentiment'] for record in records))
+        }
+
+    async def _next_batch(self) -> List[tuple]:
+        batch = [await self._queue.get()]
+        while len(batch) < self.batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _worker(self):
+        while True:
+            batch = await self._next_batch()
+            dequeued = time.perf_counter()
+            for priority, _, _, enqueued in batch:
+                self.lane_depth[priority] -= 1
+                self.stages["queue_wait"].record(1, dequeued - enqueued)
+
+            emails = [self.store.get(email_id) for _, _, email_id, _ in batch]
+            emails = [email for email in emails if email is not None]
+            try:
+                started = time.perf_counter()
+                with span("llm"):
+                    replies = await get_llm_provider().send_batch(
+                        self.system_message(),
+                        [(f"Subject: {email.get('subject', '')}\n\n{email.get('body', '')}", f"email-{email['id']}") for email in emails]
+                    )
+                self.stages["generate"].record(len(emails), time.perf_counter() - started)
+                for email, reply in zip(emails, replies):
+                    self.store.update(email['id'], ai_reply=reply, reply_status="generated")
+                missing = emails[len(replies):]
+                if missing:
+                    logger.error(f"AI provider returned {len(replies)} replies for {len(emails)} emails")
+                    self.stages["generate"].failures += len(missing)
+                    for email in missing:
+                        self.store.update(email['id'], reply_status="failed")
+            except Exception as e:
+                logger.error(f"AI reply generation failed for {len(emails)} emails: {e}")
+                self.stages["generate"].failures += len(emails)
+                for email in emails:
+                    self.store.update(email['id'], reply_status="failed")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def drain(self):
+        """Wait until every queued email has been processed"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "lane_depth": {f"priority_{lane}": depth for lane, depth in sorted(self.lane_depth.items())},
+            "workers": len(self._tasks),
+            "batch_size": self.batch_size,
+            "stages": {name: stage.as_dict() for name, stage in self.stages.items()}
+        }
@@ -0,0 +1,224 @@
+import base64
+import json
+import re
+from bisect import bisect_right, insort
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+# Sentiment labels used by the inbox
+EMAIL_SENTIMENTS = ("normal", "urgent", "angry", "spam", "handover")
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Sort key: newest first, ties broken by id
+SortKey = Tuple[float, str]
+
+# (counts, response minutes, hour bucket) an email adds to EmailStatistics
+StatisticsDelta = Tuple[Dict[str, int], float, int]
+
+# Time windows reported by EmailStatistics, in hours
+STATISTICS_WINDOWS = {"last_24h": 24, "last_7d": 24 * 7}
+# Hourly buckets older than the largest window are dropped
+STATISTICS_RETENTION_HOURS = max(STATISTICS_WINDOWS.values())
+
+
+def parse_timestamp(value: Any) -> datetime:
+    """Aware UTC datetime; naive values are taken as UTC"""
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def tokenize(text: str) -> Set[str]:
+    return set(TOKEN_PATTERN.findall(text.lower()))
+
+
+def is_replied(email: dict) -> bool:
+    """Explicit replied flag, otherwise whether an AI reply was produced"""
+    return bool(email.get('replied', bool(email.get('ai_reply'))))
+
+
+class EmailStatistics:
+    """
+    Inbox statistics maintained incrementally as emails are added, updated or removed,
+    with hourly buckets (by email timestamp) for the time-windowed variants
+    """
+
+    def __init__(self):
+        self.totals = Counter()
+        self.buckets: Dict[int, Counter] = defaultdict(Counter)
+        self.response_minutes_total = 0.0
+        self._oldest_hour = 0
+
+    @staticmethod
+    def delta(email: dict) -> StatisticsDelta:
+        """What an email contributes, computed without touching the statistics (may raise)"""
+        counts = {"total_emails": 1, f"sentiment:{email.get('sentiment')}": 1}
+        if is_replied(email):
+            counts["total_replied"] = 1
+        if not email.get('read'):
+            counts["unread"] = 1
+        minutes = 0.0
+        replied_at = email.get('replied_at')
+        if replied_at:
+            counts["timed_replies"] = 1
+            minutes = (parse_timestamp(replied_at) - email['timestamp']).total_seconds() / 60
+        return counts, minutes, int(email['timestamp'].timestamp() // 3600)
+
+    def apply(self, delta: StatisticsDelta, sign: int):
+        """Count an email's delta in (sign=1) or out (sign=-1); never raises"""
+        counts, minutes, hour = delta
+        self.response_minutes_total += sign * minutes
+        for name, value in counts.items():
+            self.totals[name] += sign * value
+        self._prune(int(datetime.now(timezone.utc).timestamp() // 3600))
+        if hour >= self._oldest_hour:
+            bucket = self.buckets[hour]
+            for name, value in counts.items():
+                bucket[name] += sign * value
+
+    def _prune(self, current_hour: int):
+        """Drop buckets no window can reach any more; runs at most once per hour"""
+        oldest_hour = current_hour - STATISTICS_RETENTION_HOURS + 1
+        if oldest_hour > self._oldest_hour:
+            self._oldest_hour = oldest_hour
+            for hour in [hour for hour in self.buckets if hour < oldest_hour]:
+                del self.buckets[hour]
+
+    def _summarize(self, counts: Counter) -> Dict[str, Any]:
+        return {
+            "total_emails": counts["total_emails"],
+            "total_replied": counts["total_replied"],
+            "unread": counts["unread"],
+            "sentiment_breakdown": {s: counts[f"sentiment:{s}"] for s in EMAIL_SENTIMENTS}
+        }
+
+    def snapshot(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Totals plus last_24h / last_7d sums over at most 168 hourly buckets"""
+        stats = self._summarize(self.totals)
+        if self.totals["timed_replies"]:
+            stats["avg_response_time_minutes"] = round(self.response_minutes_total / self.totals["timed_replies"], 1)
+
+        current_hour = int((now or datetime.now(timezone.utc)).timestamp() // 3600)
+        for window_name, hours in STATISTICS_WINDOWS.items():
+            window = Counter()
+            for hour in range(current_hour - hours + 1, current_hour + 1):
+                bucket = self.buckets.get(hour)
+                if bucket:
+                    window.update(bucket)
+            stats[window_name] = self._summarize(window)
+        return stats
+
+
+def encode_cursor(key: SortKey) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> SortKey:
+    try:
+        neg_ts, email_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(neg_ts), str(email_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class EmailStore:
+    """
+    In-memory inbox with sorted indexes on sentiment, read flag and timestamp
+    plus a token index over subject and body for search
+    """
+
+    def __init__(self, emails: Iterable[dict] = ()):
+        self._emails: Dict[str, dict] = {}
+        self._keys: Dict[str, SortKey] = {}
+        # Every index is a list of sort keys kept in order, keyed by its filter values
+        self._index: Dict[Tuple[Optional[str], Optional[bool]], List[SortKey]] = defaultdict(list)
+        self._tokens: Dict[str, Set[str]] = defaultdict(set)
+        self.statistics = EmailStatistics()
+        self.version = 0
+        for email in emails:
+            self.add(email)
+
+    def __len__(self) -> int:
+        return len(self._emails)
+
+    def _index_keys(self, email: dict) -> List[Tuple[Optional[str], Optional[bool]]]:
+        sentiment = email.get('sentiment')
+        read = bool(email.get('read'))
+        return [(None, None), (sentiment, None), (None, read), (sentiment, read)]
+
+    def add(self, email: dict) -> dict:
+        """
+        Insert or replace an email; its timestamp is stored as an aware UTC datetime. Everything
+        that can fail runs before the store changes, so a bad email leaves it untouched.
+        """
+        record = dict(email)
+        record['timestamp'] = parse_timestamp(record['timestamp'])
+        key = (-record['timestamp'].timestamp(), record['id'])
+        delta = self.statistics.delta(record)
+        if record['id'] in self._emails:
+            self.remove(record['id'])
+
+        self._emails[record['id']] = record
+        self._keys[record['id']] = key
+        for index_key in self._index_keys(record):
+            insort(self._index[index_key], key)
+        for token in tokenize(f"{record.get('subject', '')} {record.get('body', '')}"):
+            self._tokens[token].add(record['id'])
+        self.statistics.apply(delta, 1)
+        self.version += 1
+        return record
+
+    def remove(self, email_id: str):
+        record = self._emails[email_id]
+        delta = self.statistics.delta(record)
+        del self._emails[email_id]
+        key = self._keys.pop(email_id)
+        for index_key in self._index_keys(record):
+            keys = self._index[index_key]
+            del keys[bisect_right(keys, key) - 1]
+        for token in tokenize(f"{record.get('subject', '')} {record.get('body', '')}"):
+            self._tokens[token].discard(email_id)
+        self.statistics.apply(delta, -1)
+        self.version += 1
+
+    def get(self, email_id: str) -> Optional[dict]:
+        return self._emails.get(email_id)
+
+    def update(self, email_id: str, **changes) -> dict:
+        """Apply field changes, re-indexing the email"""
+        record = dict(self._emails[email_id])
+        record.update(changes)
+        return self.add(record)
+
+    def query(
+        self,
+        sentiment: Optional[str] = None,
+        read: Optional[bool] = None,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: int = 50
+    ) -> Dict[str, Any]:
+        """Newest-first page of emails matching the filters"""
+        if search:
+            terms = tokenize(search)
+            matched = set.intersection(*(self._tokens.get(t, set()) for t in terms)) if terms else set()
+            keys = sorted(
+                self._keys[email_id] for email_id in matched
+                if (sentiment is None or self._emails[email_id].get('sentiment') == sentiment)
+                and (read is None or bool(self._emails[email_id].get('read')) == read)
+            )
+        else:
+            keys = self._index.get((sentiment, read), [])
+
+        start = bisect_right(keys, decode_cursor(cursor)) if cursor else 0
+        page_keys = keys[start:start + limit]
+        has_more = start + limit < len(keys)
+        return {
+            "emails": [self._emails[email_id] for _, email_id in page_keys],
+            "total": len(keys),
+            "next_cursor": encode_cursor(page_keys[-1]) if has_more and page_keys else None
+        }
@@ -0,0 +1,70 @@
+import heapq
+import os
+from typing import Any, Dict, Hashable, List, Tuple
+
+# Items tracked per summary; any item seen more than total / capacity times is among them
+HEAVY_HITTER_CAPACITY = int(os.getenv("HEAVY_HITTER_CAPACITY", "256"))
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy hitters (Metwally et al.) over a stream of items, in O(capacity) memory.
+    A tracked item's count overstates its true count by at most its error, and every error is
+    at most total / capacity. Counts are exact while fewer than capacity distinct items were seen.
+    """
+
+    def __init__(self, capacity: int = HEAVY_HITTER_CAPACITY):
+        self.capacity = capacity
+        self.total = 0
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+        # (count, item) entries, some stale; the live one for an item matches counts[item]
+        self._heap: List[Tuple[int, Any]] = []
+
+    def add(self, item: Hashable, count: int = 1) -> None:
+        counts = self.counts
+        self.total += count
+        if item in counts:
+            counts[item] += count
+        elif len(counts) < self.capacity:
+            counts[item] = count
+            self.errors[item] = 0
+        else:
+            # Replace the least counted item; the newcomer inherits its count as error
+            floor, evicted = self._pop_min()
+            del counts[evicted], self.errors[evicted]
+            counts[item] = floor + count
+            self.errors[item] = floor
+        heapq.heappush(self._heap, (counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, i) for i, c in counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self) -> Tuple[int, Any]:
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return count, item
+
+    def top(self, n: int) -> List[Tuple[Any, int, int]]:
+        """(item, count, error) for the n highest counts; ties by item"""
+        best = heapq.nsmallest(n, self.counts.items(), key=lambda entry: (-entry[1], entry[0]))
+        return [(item, count, self.errors[item]) for item, count in best]
+
+    def max_error(self) -> int:
+        """Bound on the error of any count, including items no longer tracked"""
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def state(self) -> list:
+        return [self.total, [[item, count, self.errors[item]] for item, count in self.counts.items()]]
+
+    @classmethod
+    def restore(cls, state: list, capacity: int = HEAVY_HITTER_CAPACITY) -> "SpaceSaving":
+        summary = cls(max(capacity, len(state[1])))
+        summary.total = state[0]
+        for item, count, error in state[1]:
+            summary.counts[item] = count
+            summary.errors[item] = error
+        summary._heap = [(count, item) for item, count in summary.counts.items()]
+        heapq.heapify(summary._heap)
+        return summary
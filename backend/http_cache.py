@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from urllib.parse import parse_qsl, urlencode
+
+from fastapi.responses import Response
+
+# Versions restart with the process, so the process id is part of every ETag;
+# the production launcher hands its workers one id so their tags agree
+BOOT_ID = os.getenv("HTTP_CACHE_BOOT_ID") or uuid.uuid4().hex
+
+# Encodings CompressionMiddleware appends to a tag ("abc" -> "abc-gzip")
+ENCODING_SUFFIXES = ("-gzip", "-br")
+
+# Cache-Control presets
+REVALIDATE = "private, no-cache"
+SHORT_LIVED = "private, max-age=5, must-revalidate"
+LONG_LIVED = "private, max-age=300, must-revalidate"
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Data version callable (sync or async) and Cache-Control for one GET route"""
+    version: Callable[[], Any]
+    cache_control: str
+
+
+def http_cache(version: Callable[[], Any], cache_control: str = REVALIDATE):
+    """
+    Mark an endpoint as cacheable; FastJSONRoute then answers matching If-None-Match
+    requests with 304 without running it. Apply below the router decorator.
+    """
+    def decorator(endpoint):
+        endpoint.http_cache = CachePolicy(version, cache_control)
+        return endpoint
+    return decorator
+
+
+async def current_version(policy: CachePolicy) -> Any:
+    version = policy.version()
+    if asyncio.iscoroutine(version):
+        version = await version
+    return version
+
+
+def make_etag(path: str, query_string: bytes, version: Any) -> str:
+    """Strong ETag over request path, normalized query and data version"""
+    query = urlencode(sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True)))
+    digest = hashlib.sha1(f"{BOOT_ID}|{path}?{query}|{version}".encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def base_tag(tag: str) -> str:
+    """Strip the weak prefix and any encoding suffix so a tag compares against make_etag"""
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(f'{suffix}"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+def matching_tag(scope, etag: str) -> Optional[str]:
+    """The If-None-Match tag (as the client sent it) that matches etag, if any"""
+    for name, value in scope.get("headers", []):
+        if name == b"if-none-match":
+            for tag in value.decode("latin-1").split(","):
+                if tag.strip() == "*" or base_tag(tag) == etag:
+                    return tag.strip()
+    return None
+
+
+def conditional_app(app, policy: CachePolicy):
+    """Wrap a route's ASGI app with ETag / Cache-Control headers and 304 responses"""
+
+    async def conditional(scope, receive, send):
+        if scope["method"] not in ("GET", "HEAD"):
+            await app(scope, receive, send)
+            return
+
+        etag = make_etag(scope["path"], scope.get("query_string", b""), await current_version(policy))
+        headers = {"etag": etag, "cache-control": policy.cache_control}
+        matched = matching_tag(scope, etag)
+        if matched is not None:
+            # Echo the client's tag so an encoded representation keeps its suffix
+            not_modified = {**headers, "etag": etag if matched == "*" else matched}
+            await Response(status_code=304, headers=not_modified)(scope, receive, send)
+            return
+
+        async def tagged_send(message):
+            if message["type"] == "http.response.start" and 200 <= message["status"] < 300:
+                extra = [(name.encode(), value.encode()) for name, value in headers.items()]
+                message = {**message, "headers": list(message.get("headers", [])) + extra}
+            await send(message)
+
+        await app(scope, receive, tagged_send)
+
+    return conditional
+
+
+def attach_http_cache(route) -> Optional[CachePolicy]:
+    """Apply the endpoint's http_cache policy, if any, to an APIRoute"""
+    policy = getattr(route.endpoint, "http_cache", None)
+    if policy is not None:
+        route.app = conditional_app(route.app, policy)
+    return policy
@@ -0,0 +1,144 @@
+import json
+import logging
+import os
+import time
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from backend.data_sources import DataSnapshot
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Stock below which a product is low; LOW_STOCK_THRESHOLDS overrides it per category (JSON object)
+LOW_STOCK_THRESHOLD = int(os.getenv("LOW_STOCK_THRESHOLD", "50"))
+CATEGORY_STOCK_THRESHOLDS: Dict[str, int] = json.loads(os.getenv("LOW_STOCK_THRESHOLDS", "{}"))
+# Stock alerts kept for /inventory/alerts
+INVENTORY_ALERT_HISTORY = int(os.getenv("INVENTORY_ALERT_HISTORY", "1000"))
+
+# Stock changes received through the API: product id -> (time in ns, stock). They outlive
+# snapshot reloads until product.json itself is newer.
+stock_changes: Dict[str, Tuple[int, int]] = {}
+inventory_alerts: Deque[Dict[str, Any]] = deque(maxlen=INVENTORY_ALERT_HISTORY)
+
+
+def threshold_for(category: Optional[str]) -> int:
+    return CATEGORY_STOCK_THRESHOLDS.get(category, LOW_STOCK_THRESHOLD) if category else LOW_STOCK_THRESHOLD
+
+
+class InventoryIndex:
+    """
+    Products sorted by stock, overall and per category, so low-stock counts are a binary search
+    and low-stock lists a slice. A stock change moves one entry and reports the thresholds the
+    product crossed.
+    """
+
+    def __init__(self, products: List[dict]):
+        self.products: Dict[str, dict] = {}
+        self.stock: Dict[str, int] = {}
+        # Sorted (stock, product id), for every product and per category (None: uncategorised)
+        self._all: List[Tuple[int, str]] = []
+        self._by_category: Dict[Optional[str], List[Tuple[int, str]]] = {}
+        for product in products:
+            product_id = product.get('id')
+            if not product_id or product_id in self.products:
+                continue
+            self.products[product_id] = product
+            self.stock[product_id] = product.get('stock', 0)
+            entry = (self.stock[product_id], product_id)
+            self._all.append(entry)
+            self._by_category.setdefault(product.get('category'), []).append(entry)
+        self._all.sort()
+        for entries in self._by_category.values():
+            entries.sort()
+        self.total_stock = sum(self.stock.values())
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def low_stock_count(self, threshold: Optional[int] = None, category: Optional[str] = None) -> int:
+        """Products with stock below threshold; by default each category's own threshold"""
+        if threshold is not None and category is None:
+            return bisect_left(self._all, (threshold,))
+        if category is None:
+            return sum(
+                bisect_left(entries, (threshold_for(name),))
+                for name, entries in self._by_category.items()
+            )
+        entries = self._by_category.get(category, [])
+        return bisect_left(entries, (threshold if threshold is not None else threshold_for(category),))
+
+    def low_stock(self, threshold: Optional[int] = None, category: Optional[str] = None,
+                  limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Low-stock products, lowest stock first"""
+        if category is not None:
+            entries = self._by_category.get(category, [])
+            entries = entries[:bisect_left(entries, (threshold if threshold is not None else threshold_for(category),))]
+        elif threshold is not None:
+            entries = self._all[:bisect_left(self._all, (threshold,))]
+        else:
+            # Per-category thresholds: filter the products below the highest of them
+            highest = max([LOW_STOCK_THRESHOLD, *CATEGORY_STOCK_THRESHOLDS.values()])
+            entries = [
+                (stock, product_id) for stock, product_id in self._all[:bisect_left(self._all, (highest,))]
+                if stock < threshold_for(self.products[product_id].get('category'))
+            ]
+        return [self.describe(product_id) for _, product_id in entries[:limit]]
+
+    def describe(self, product_id: str) -> Dict[str, Any]:
+        product = self.products[product_id]
+        return {
+            "product_id": product_id,
+            "name": product.get('name'),
+            "category": product.get('category'),
+            "stock": self.stock[product_id],
+            "threshold": threshold_for(product.get('category')),
+        }
+
+    def set_stock(self, product_id: str, stock: int) -> List[Dict[str, Any]]:
+        """Move a product to its new stock level; returns the alerts for thresholds it crossed"""
+        previous = self.stock[product_id]
+        if stock == previous:
+            return []
+        category = self.products[product_id].get('category')
+        for entries in (self._all, self._by_category[category]):
+            del entries[bisect_left(entries, (previous, product_id))]
+            insort(entries, (stock, product_id))
+        self.stock[product_id] = stock
+        self.total_stock += stock - previous
+
+        threshold = threshold_for(category)
+        if stock <= 0 < previous:
+            kind = "out_of_stock"
+        elif stock < threshold <= previous:
+            kind = "low_stock"
+        elif previous < threshold <= stock:
+            kind = "restocked"
+        else:
+            return []
+        alert = {**self.describe(product_id), "alert": kind, "previous_stock": previous, "time": time.time()}
+        logger.info(f"Inventory alert: {product_id} {kind} ({previous} -> {stock}, threshold {threshold})")
+        return [alert]
+
+
+def build_inventory_index(snapshot: DataSnapshot) -> InventoryIndex:
+    index = InventoryIndex(snapshot.get('products', {}).get('products', []))
+    catalog_time = snapshot.mtimes.get('products') or 0
+    for product_id, (changed, stock) in stock_changes.items():
+        if changed > catalog_time and product_id in index.products:
+            index.set_stock(product_id, stock)
+    return index
+
+
+def get_inventory_index(snapshot: DataSnapshot) -> InventoryIndex:
+    """Index built once per snapshot version, with later stock changes applied"""
+    return snapshot.derive("inventory_index", build_inventory_index)
+
+
+def record_stock_change(index: InventoryIndex, product_id: str, stock: int) -> List[Dict[str, Any]]:
+    """Apply a stock change event, keep it across reloads and record any alerts"""
+    alerts = index.set_stock(product_id, stock)
+    stock_changes[product_id] = (time.time_ns(), stock)
+    inventory_alerts.extend(alerts)
+    return alerts
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+from contextvars import ContextVar
+from decimal import Decimal
+from typing import Any, List, Optional
+
+import orjson
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute, request_response
+from pydantic import BaseModel
+
+from backend.http_cache import attach_http_cache
+from backend.metrics import span
+from backend.shared_snapshot import SharedRecords
+
+# Name under which FastJSONRoute asks FastAPI for the per-request sub-response
+SUB_RESPONSE_PARAM = "_fast_json_sub_response"
+
+# Set to a list by middleware that wants to know which threadpool threads run the current
+# request's sync endpoint; FastJSONRoute appends the worker's thread id while the endpoint runs
+endpoint_threads: ContextVar[Optional[List[int]]] = ContextVar("endpoint_threads", default=None)
+
+
+def encode_default(value: Any) -> Any:
+    """Types orjson does not serialize natively (datetime, dict/list subclasses and tuples are native)"""
+    if isinstance(value, BaseModel):
+        # Trusted responses are built with model_construct, so nested values may still be plain dicts
+        return value.model_dump(by_alias=True, warnings=False)
+    if isinstance(value, SharedRecords):
+        return value.fragment()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson; datetimes are written as ISO 8601 strings"""
+    option = orjson.OPT_NON_STR_KEYS
+
+    def render(self, content: Any) -> bytes:
+        with span("serialization"):
+            return orjson.dumps(content, default=encode_default, option=self.option)
+
+
+class ModelJSONResponse(FastJSONResponse):
+    """Used for trusted response_model routes: UTC datetimes end in Z, as pydantic writes them"""
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+def trusted_response(endpoint):
+    """
+    Skip response_model validation and filtering for an endpoint whose return value is built
+    in-process to the model's shape; the model still documents the response in OpenAPI.
+    Apply below the route decorator.
+    """
+    endpoint.trusted_response = True
+    return endpoint
+
+
+class FastJSONRoute(APIRoute):
+    """
+    Route that hands plain return values straight to FastJSONResponse, skipping FastAPI's
+    jsonable_encoder walk. Endpoints with a response_model keep FastAPI's validation path
+    unless marked with trusted_response.
+    Status code and headers set on an injected Response parameter still apply.
+    Endpoints marked with http_cache get ETags and 304 responses.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, endpoint, **kwargs)
+        self.use_fast_path()
+        self.track_endpoint_thread()
+        attach_http_cache(self)
+
+    def use_fast_path(self):
+        response_class = self.response_class
+        if isinstance(response_class, DefaultPlaceholder):
+            response_class = response_class.value
+        if not issubclass(response_class, FastJSONResponse):
+            return
+        if self.response_field is not None:
+            if not getattr(self.endpoint, "trusted_response", False):
+                return
+            response_class = ModelJSONResponse
+
+        dependant = self.dependant
+        call = dependant.call
+        own_param = dependant.response_param_name
+        dependant.response_param_name = own_param or SUB_RESPONSE_PARAM
+        default_status = self.status_code or 200
+
+        def finish(result: Any, sub_response: Response) -> Response:
+            if isinstance(result, Response):
+                return result
+            response = response_class(result, status_code=sub_response.status_code or default_status)
+            response.headers.raw.extend(sub_response.headers.raw)
+            return response
+
+        if asyncio.iscoroutinefunction(call):
+            async def fast_call(**values):
+                sub_response = values[own_param] if own_param else values.pop(SUB_RESPONSE_PARAM)
+                return finish(await call(**values), sub_response)
+        else:
+            def fast_call(**values):
+                sub_response = values[own_param] if own_param else values.pop(SUB_RESPONSE_PARAM)
+                return finish(call(**values), sub_response)
+
+        dependant.call = fast_call
+        self.app = request_response(self.get_route_handler())
+
+    def track_endpoint_thread(self):
+        """Record the worker thread a sync endpoint runs on in endpoint_threads"""
+        dependant = self.dependant
+        call = dependant.call
+        if asyncio.iscoroutinefunction(call):
+            return
+
+        def tracked_call(**values):
+            threads = endpoint_threads.get()
+            if threads is None:
+                return call(**values)
+            thread_id = threading.get_ident()
+            threads.append(thread_id)
+            try:
+                return call(**values)
+            finally:
+                threads.remove(thread_id)
+
+        dependant.call = tracked_call
+        self.app = request_response(self.get_route_handler())
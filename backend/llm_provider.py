@@ -0,0 +1,107 @@
+import abc
+import asyncio
+import logging
+import os
+from typing import List, Optional, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class LLMProvider(abc.ABC):
+    """Interface for the chat model behind the agent endpoints"""
+    model = "unknown"
+
+    @abc.abstractmethod
+    async def send_message(self, system_message: str, text: str, session_id: str) -> str:
+        """Answer one message within the given chat session"""
+
+    async def send_batch(self, system_message: str, requests: List[Tuple[str, str]]) -> List[str]:
+        """Answer several (text, session_id) requests; providers with a batch API override this"""
+        return list(await asyncio.gather(
+            *(self.send_message(system_message, text, session_id) for text, session_id in requests)
+        ))
+
+
+class EmergentLLMProvider(LLMProvider):
+    """GPT-4o-mini via Emergent Integrations"""
+
+    def __init__(self, api_key: Optional[str], provider: str = "openai", model: str = "gpt-4o-mini"):
+        self.api_key = api_key
+        self.provider = provider
+        self.model = model
+
+    async def send_message(self, system_message: str, text: str, session_id: str) -> str:
+        if not self.api_key:
+            raise ValueError("EMERGENT_LLM_KEY must be set in environment variables")
+        from emergentintegrations.llm.chat import LlmChat, UserMessage
+
+        llm_chat = LlmChat(
+            api_key=self.api_key,
+            session_id=session_id,
+            system_message=system_message
+        ).with_model(self.provider, self.model)
+        return await llm_chat.send_message(UserMessage(text=text))
+
+
+class FakeLLMProvider(LLMProvider):
+    """Local stand-in that simulates model latency and token throughput"""
+    model = "fake-llm"
+
+    def __init__(self, latency_ms: float = 50.0, tokens_per_second: float = 200.0, reply_tokens: int = 60):
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.reply_tokens = reply_tokens
+
+    async def send_message(self, system_message: str, text: str, session_id: str) -> str:
+        generation_seconds = self.reply_tokens / self.tokens_per_second if self.tokens_per_second > 0 else 0
+        await asyncio.sleep(self.latency_ms / 1000 + generation_seconds)
+        return self._reply(system_message, text)
+
+    async def send_batch(self, system_message: str, requests: List[Tuple[str, str]]) -> List[str]:
+        # One round trip for the batch; generation time still scales with the replies produced
+        generation_seconds = len(requests) * self.reply_tokens / self.tokens_per_second if self.tokens_per_second > 0 else 0
+        await asyncio.sleep(self.latency_ms / 1000 + generation_seconds)
+        return [self._reply(system_message, text) for text, _ in requests]
+
+    def _reply(self, system_message: str, text: str) -> str:
+        filler = " ".join(["data"] * max(self.reply_tokens - 12, 0))
+        return f"Simulated answer to '{text[:40]}' using {len(system_message)} characters of context. {filler}".strip()
+
+
+_provider: Optional[LLMProvider] = None
+
+
+def create_llm_provider() -> LLMProvider:
+    """Build the provider selected by LLM_PROVIDER (emergent or fake)"""
+    name = os.getenv("LLM_PROVIDER", "emergent").lower()
+    if name == "fake":
+        return FakeLLMProvider(
+            latency_ms=float(os.getenv("FAKE_LLM_LATENCY_MS", "50")),
+            tokens_per_second=float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "200")),
+            reply_tokens=int(os.getenv("FAKE_LLM_REPLY_TOKENS", "60")),
+        )
+    if name != "emergent":
+        raise ValueError(f"Unknown LLM_PROVIDER: {name}")
+
+    api_key = os.getenv("EMERGENT_LLM_KEY")
+    if not api_key:
+        logger.error("EMERGENT_LLM_KEY environment variable is required for the emergent LLM provider")
+    return EmergentLLMProvider(api_key)
+
+
+def get_llm_provider() -> LLMProvider:
+    global _provider
+    if _provider is None:
+        _provider = create_llm_provider()
+    return _provider
+
+
+def set_llm_provider(provider: LLMProvider):
+    """Swap the active provider (benchmarks and local runs)"""
+    global _provider
+    _provider = provider
@@ -0,0 +1,190 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from backend.customer_identity import get_customer_index
+from backend.data_sources import DataSnapshot
+from backend.review_data import LATEST_TIME, MISSING_TIME, parse_timestamp, to_micros
+
+# Store connectors feeding the order store, keyed by data source name; codes follow this order
+ORDER_CHANNELS = ("shopify", "woocommerce")
+
+UNKNOWN_STATUS = "unknown"
+
+
+def order_time(value: Any) -> int:
+    """Order date as microseconds since the epoch; MISSING_TIME when absent or unreadable"""
+    try:
+        moment = parse_timestamp(value)
+    except ValueError:
+        return MISSING_TIME
+    return to_micros(moment) if isinstance(moment, datetime) else MISSING_TIME
+
+
+class OrderStore:
+    """
+    Orders from every store connector in one columnar table, with line-item and customer tables
+    and row indexes by date, channel, status, customer and product. Strings are stored as codes
+    into per-column labels; code 0 of customer and product is "none".
+    """
+
+    def __init__(self, snapshot: DataSnapshot):
+        customer_index = get_customer_index(snapshot)
+        self.labels: Dict[str, List[Any]] = {"channel": list(ORDER_CHANNELS), "status": [], "customer": [None], "product": [None]}
+        self._codes: Dict[str, Dict[Any, int]] = {
+            column: {label: code for code, label in enumerate(labels) if label is not None}
+            for column, labels in self.labels.items()
+        }
+
+        # Order table
+        self.channels = array('B')
+        self.positions = array('I')
+        self.numbers: List[Optional[str]] = []
+        self.times = array('q')
+        self.statuses = array('I')
+        self.customers = array('I')
+        self.subtotals = array('d')
+        self.shipping = array('d')
+        self.taxes = array('d')
+        self.totals = array('d')
+
+        # Line-item table
+        self.item_orders = array('I')
+        self.item_products = array('I')
+        self.item_quantities = array('I')
+        self.item_prices = array('d')
+        self.item_revenue = array('d')
+
+        # Customer table, by customer code
+        self.customer_names: List[Optional[str]] = [None]
+        self.customer_emails: List[Optional[str]] = [None]
+
+        self._records = [snapshot.get(channel, {}).get('orders', []) for channel in ORDER_CHANNELS]
+        for channel, records in enumerate(self._records):
+            for position, order in enumerate(records):
+                self._add(channel, position, order, customer_index)
+
+        rows_by = {column: defaultdict(lambda: array('I')) for column in ("channel", "status", "customer")}
+        for row, codes in enumerate(zip(self.channels, self.statuses, self.customers)):
+            for index, code in zip(rows_by.values(), codes):
+                index[code].append(row)
+        self.rows_by = {column: dict(index) for column, index in rows_by.items()}
+        self.rows_by["customer"].pop(0, None)
+        orders_by_product = defaultdict(lambda: array('I'))
+        for row, product in zip(self.item_orders, self.item_products):
+            rows = orders_by_product[product]
+            if product and (not rows or rows[-1] != row):
+                rows.append(row)
+        self.rows_by["product"] = dict(orders_by_product)
+
+        # Date index: rows by order time, orders without a date first
+        self.time_order = array('I', sorted(range(len(self.times)), key=self.times.__getitem__))
+        self.sorted_times = array('q', map(self.times.__getitem__, self.time_order))
+
+    def _intern(self, column: str, value: Any) -> int:
+        codes = self._codes[column]
+        code = codes.get(value)
+        if code is None:
+            labels = self.labels[column]
+            code = codes[value] = len(labels)
+            labels.append(value)
+        return code
+
+    def _add(self, channel: int, position: int, order: dict, customer_index) -> None:
+        row = len(self.numbers)
+        customer = order.get('customer') or {}
+        customer_id = customer_index.lookup(customer.get('email'), customer.get('phone'))
+        customer_code = self._intern("customer", customer_id) if customer_id else 0
+        if customer_code == len(self.customer_names):
+            self.customer_names.append(customer.get('name'))
+            self.customer_emails.append(customer.get('email'))
+
+        self.channels.append(channel)
+        self.positions.append(position)
+        self.numbers.append(order.get('order_number'))
+        self.times.append(order_time(order.get('order_date')))
+        self.statuses.append(self._intern("status", order.get('status', UNKNOWN_STATUS)))
+        self.customers.append(customer_code)
+        self.subtotals.append(order.get('subtotal') or 0)
+        self.shipping.append(order.get('shipping') or 0)
+        self.taxes.append(order.get('tax') or 0)
+        self.totals.append(order.get('total') or 0)
+
+        for item in order.get('items', []):
+            quantity, price = item.get('quantity') or 0, item.get('price') or 0
+            product = item.get('product_id')
+            self.item_orders.append(row)
+            self.item_products.append(self._intern("product", product) if product else 0)
+            self.item_quantities.append(quantity)
+            self.item_prices.append(price)
+            self.item_revenue.append(item.get('total', quantity * price))
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def code(self, column: str, value: Any) -> Optional[int]:
+        return self._codes[column].get(value)
+
+    def select(self, channel: Optional[str] = None, status: Optional[str] = None, customer: Optional[str] = None,
+               product: Optional[str] = None, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Sequence[int]:
+        """Order rows (ascending) matching every given filter; start and end are inclusive"""
+        candidates = []
+        for column, value in (("channel", channel), ("status", status), ("customer", customer), ("product", product)):
+            if value is not None:
+                code = self.code(column, value)
+                candidates.append(self.rows_by[column].get(code, ()) if code is not None else ())
+        if start is not None or end is not None:
+            low = bisect_left(self.sorted_times, to_micros(start) if start is not None else MISSING_TIME + 1)
+            high = bisect_right(self.sorted_times, to_micros(end) if end is not None else LATEST_TIME)
+            candidates.append(sorted(self.time_order[low:high]))
+        if not candidates:
+            return range(len(self))
+
+        candidates.sort(key=len)
+        rows = candidates[0]
+        for other in candidates[1:]:
+            if not rows:
+                break
+            members = set(other)
+            rows = [row for row in rows if row in members]
+        return rows
+
+    def revenue(self, rows: Optional[Iterable[int]] = None) -> float:
+        if rows is None:
+            return sum(self.totals)
+        return sum(map(self.totals.__getitem__, rows))
+
+    def summary(self, rows: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+        """Order count, revenue and average order value"""
+        orders = len(self) if rows is None else len(rows)
+        revenue = self.revenue(rows)
+        return {"orders": orders, "revenue": revenue, "avg_order_value": revenue / orders if orders > 0 else 0}
+
+    def by_channel(self, rows: Optional[Iterable[int]] = None) -> Dict[str, Dict[str, Any]]:
+        """summary() per channel"""
+        members = set(rows) if rows is not None else None
+        return {
+            channel: self.summary([
+                row for row in self.rows_by["channel"].get(code, ())
+                if members is None or row in members
+            ])
+            for code, channel in enumerate(ORDER_CHANNELS)
+        }
+
+    def status_counts(self, rows: Optional[Iterable[int]] = None) -> Dict[str, int]:
+        """Orders per status, statuses in the order they first appear"""
+        counts = [0] * len(self.labels["status"])
+        for code in (self.statuses if rows is None else map(self.statuses.__getitem__, rows)):
+            counts[code] += 1
+        return {status: count for status, count in zip(self.labels["status"], counts) if count}
+
+    def record(self, row: int) -> dict:
+        """The connector's order record behind a row"""
+        return self._records[self.channels[row]][self.positions[row]]
+
+
+def get_order_store(snapshot: DataSnapshot) -> OrderStore:
+    """Store built once per snapshot version"""
+    return snapshot.derive("order_store", OrderStore)
@@ -0,0 +1,127 @@
+import heapq
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from backend.connector_index import get_connector_index
+from backend.daily_counts import DAY_MICROS
+from backend.data_sources import DataSnapshot
+from backend.order_store import ORDER_CHANNELS, OrderStore, get_order_store
+from backend.review_data import MISSING_TIME, to_micros
+
+SALES_METRICS = ("revenue", "units")
+
+
+class ProductSales:
+    """
+    Units and revenue per product from order line items, all time and per (channel, day), joined
+    to the product catalog. Top-N over any window is a partial sort (heap) of the products sold in
+    that window rather than a sort of the whole catalog. Sales are added one line item at a time,
+    so new orders update the index in place.
+    """
+
+    def __init__(self, products: Any = None):
+        # Catalog lookup by upper-cased product id
+        self.products = products if products is not None else {}
+        # product id -> [revenue, units], per channel
+        self.totals: Dict[str, Dict[str, List[float]]] = {channel: {} for channel in ORDER_CHANNELS}
+        # (channel, day) -> product id -> [revenue, units]
+        self.daily: Dict[Tuple[str, int], Dict[str, List[float]]] = {}
+        self.days: List[int] = []
+        # Line-item name of products missing from the catalog
+        self.names: Dict[str, str] = {}
+
+    @classmethod
+    def from_store(cls, store: OrderStore, products: Any = None) -> "ProductSales":
+        sales = cls(products)
+        labels = store.labels["product"]
+        for order, product, quantity, revenue in zip(store.item_orders, store.item_products, store.item_quantities, store.item_revenue):
+            if product:
+                sales.add(labels[product], ORDER_CHANNELS[store.channels[order]], store.times[order], quantity, revenue)
+        return sales
+
+    def add(self, product_id: str, channel: str, micros: int, quantity: int, revenue: float, name: Optional[str] = None) -> None:
+        buckets = [self.totals[channel]]
+        if micros != MISSING_TIME:
+            day = micros // DAY_MICROS
+            key = (channel, day)
+            if key not in self.daily:
+                self.daily[key] = {}
+                if not self.days or day > self.days[-1]:
+                    self.days.append(day)
+                elif self.days[bisect_left(self.days, day)] != day:
+                    self.days.insert(bisect_left(self.days, day), day)
+            buckets.append(self.daily[key])
+        for bucket in buckets:
+            totals = bucket.get(product_id)
+            if totals is None:
+                bucket[product_id] = [revenue, quantity]
+            else:
+                totals[0] += revenue
+                totals[1] += quantity
+        if name and product_id not in self.names:
+            self.names[product_id] = name
+
+    def window(self, channel: Optional[str] = None, start: Optional[datetime] = None,
+               end: Optional[datetime] = None) -> Dict[str, List[float]]:
+        """product id -> [revenue, units] sold between start and end (inclusive days)"""
+        channels = [channel] if channel else list(ORDER_CHANNELS)
+        if start is None and end is None:
+            if len(channels) == 1:
+                return self.totals[channels[0]]
+            buckets: Iterable[Dict[str, List[float]]] = [self.totals[name] for name in channels]
+        else:
+            low = bisect_left(self.days, to_micros(start) // DAY_MICROS) if start is not None else 0
+            high = bisect_right(self.days, to_micros(end) // DAY_MICROS) if end is not None else len(self.days)
+            buckets = (
+                self.daily[(name, day)]
+                for day in self.days[low:high] for name in channels if (name, day) in self.daily
+            )
+        merged: Dict[str, List[float]] = {}
+        for bucket in buckets:
+            for product_id, (revenue, units) in bucket.items():
+                totals = merged.get(product_id)
+                if totals is None:
+                    merged[product_id] = [revenue, units]
+                else:
+                    totals[0] += revenue
+                    totals[1] += units
+        return merged
+
+    def top(self, n: int = 5, metric: str = "revenue", channel: Optional[str] = None,
+            start: Optional[datetime] = None, end: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """n best-selling products by revenue or units; ties by product id"""
+        column = SALES_METRICS.index(metric)
+        sold = self.window(channel, start, end)
+        best = heapq.nsmallest(n, sold.items(), key=lambda entry: (-entry[1][column], entry[0]))
+        return [self.describe(product_id, revenue, units) for product_id, (revenue, units) in best]
+
+    def describe(self, product_id: str, revenue: float, units: int) -> Dict[str, Any]:
+        product = self.products.get(product_id.upper()) or {}
+        return {
+            "product_id": product_id,
+            "name": product.get('name') or self.names.get(product_id),
+            "category": product.get('category'),
+            "revenue": round(revenue, 2),
+            "units": units,
+            "stock": product.get('stock'),
+        }
+
+
+def build_product_sales(snapshot: DataSnapshot) -> ProductSales:
+    store = get_order_store(snapshot)
+    sales = ProductSales.from_store(store, get_connector_index(snapshot).products_by_id)
+    # Names for products sold but missing from the catalog
+    for order, product in zip(store.item_orders, store.item_products):
+        label = store.labels["product"][product]
+        if product and label.upper() not in sales.products and label not in sales.names:
+            item = next(
+                (item for item in store.record(order).get('items', []) if item.get('product_id') == label), {}
+            )
+            sales.names[label] = item.get('product_name')
+    return sales
+
+
+def get_product_sales(snapshot: DataSnapshot) -> ProductSales:
+    """Index built once per snapshot version"""
+    return snapshot.derive("product_sales", build_product_sales)
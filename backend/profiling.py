@@ -0,0 +1,316 @@
+import asyncio
+import cProfile
+import hmac
+import itertools
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import JSONResponse
+
+from backend.json_response import FastJSONRoute, endpoint_threads
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Per-request profiling is only available when an admin token is configured
+PROFILING_ADMIN_TOKEN = os.getenv("PROFILING_ADMIN_TOKEN", "")
+# Requests still running after this many ms get a sampled profile logged (0 disables)
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "25"))
+PROFILE_HISTORY = int(os.getenv("PROFILE_HISTORY", "50"))
+
+PROFILE_HEADER = "x-profile-token"
+PROFILE_QUERY_PARAM = "profile_token"
+# The profile endpoints take the same token as their credential and are not profiled themselves
+PROFILE_ENDPOINT_PREFIX = "/api/debug/"
+
+# Most recent profiles, newest last
+recent_profiles: deque = deque(maxlen=PROFILE_HISTORY)
+
+# Only one cProfile can be active per process
+_profile_lock = threading.Lock()
+
+profiling_router = APIRouter(route_class=FastJSONRoute)
+
+
+def is_admin(token: Optional[str]) -> bool:
+    return bool(PROFILING_ADMIN_TOKEN) and token is not None and hmac.compare_digest(
+        token.encode("utf-8"), PROFILING_ADMIN_TOKEN.encode("utf-8")
+    )
+
+
+def requested_token(scope) -> Optional[str]:
+    """Profiling token from the X-Profile-Token header or the profile_token query parameter"""
+    for name, value in scope.get("headers", []):
+        if name.decode("latin-1").lower() == PROFILE_HEADER:
+            return value.decode("latin-1")
+    for name, value in parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True):
+        if name == PROFILE_QUERY_PARAM:
+            return value
+    return None
+
+
+def frame_label(code) -> str:
+    return f"{code.co_filename}:{code.co_firstlineno}({code.co_name})"
+
+
+def thread_stack(frame) -> list:
+    """Frames of a thread's stack, outermost first"""
+    stack = []
+    while frame is not None:
+        stack.append(frame)
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def task_stack(task: asyncio.Task) -> list:
+    """Frames of a suspended task down to the await it is waiting on, outermost first"""
+    stack = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            break
+        stack.append(frame)
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    return stack
+
+
+def cprofile_top(profile: cProfile.Profile, limit: int = PROFILE_TOP_N) -> List[Dict[str, Any]]:
+    """Hottest functions of a cProfile run by cumulative time"""
+    stats = pstats.Stats(profile)
+    rows = []
+    for (filename, line, name), (_, calls, own, cumulative, _) in stats.stats.items():
+        rows.append({
+            "function": f"{filename}:{line}({name})",
+            "calls": calls,
+            "own_ms": round(own * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3),
+        })
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:limit]
+
+
+class RequestSamples:
+    """Stack samples collected for one in-flight request"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.loop = task.get_loop()
+        self.loop_thread = threading.get_ident()
+        # Threadpool threads running the request's sync endpoint (see endpoint_threads)
+        self.worker_threads: List[int] = []
+        self.started = time.perf_counter()
+        self.samples = 0
+        self.own = Counter()
+        self.cumulative = Counter()
+
+    def stack(self, frames: Dict[int, Any]) -> list:
+        """
+        Where the request is now: its sync endpoint's worker thread, the loop thread while the
+        request's task is the one running, or else the await the task is suspended at
+        """
+        for thread_id in self.worker_threads[-1:]:
+            if thread_id in frames:
+                return thread_stack(frames[thread_id])
+        if asyncio.current_task(self.loop) is self.task and self.loop_thread in frames:
+            return thread_stack(frames[self.loop_thread])
+        return task_stack(self.task)
+
+    def record(self, stack: list):
+        """Count one sample of a stack given outermost frame first"""
+        self.samples += 1
+        self.own[frame_label(stack[-1].f_code)] += 1
+        for label in {frame_label(frame.f_code) for frame in stack}:
+            self.cumulative[label] += 1
+
+    def top(self, limit: int = PROFILE_TOP_N) -> List[Dict[str, Any]]:
+        """Functions on the sampled stacks, by share of samples they appeared in"""
+        return [
+            {
+                "function": label,
+                "samples": count,
+                "own_samples": self.own[label],
+                "cumulative_pct": round(count / self.samples * 100, 1),
+            }
+            for label, count in self.cumulative.most_common(limit)
+        ]
+
+
+class SlowRequestWatchdog:
+    """
+    One background thread that samples the stack of every request running longer than
+    the threshold: the request's own task, or the worker thread running its sync endpoint,
+    never whatever else the event loop happens to be running. It runs off the event loop,
+    so handlers that block the loop are caught too, and requests that finish in time only
+    pay for a dict insert and delete.
+    """
+
+    def __init__(self, threshold_ms: float, interval_ms: float = SAMPLE_INTERVAL_MS):
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self._active: Dict[int, RequestSamples] = {}
+        self._ids = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+
+    def begin(self) -> int:
+        """Watch the calling task; also watches its sync endpoint's worker thread"""
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="slow-request-watchdog", daemon=True)
+            self._thread.start()
+        request_id = next(self._ids)
+        request = self._active[request_id] = RequestSamples(asyncio.current_task())
+        endpoint_threads.set(request.worker_threads)
+        return request_id
+
+    def end(self, request_id: int) -> RequestSamples:
+        return self._active.pop(request_id)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            deadline = time.perf_counter() - self.threshold
+            frames = None
+            for request in list(self._active.values()):
+                if request.started > deadline:
+                    continue
+                frames = frames or sys._current_frames()
+                stack = request.stack(frames)
+                if stack:
+                    request.record(stack)
+
+
+def store_profile(profile_id: str, kind: str, scope, status: int, duration_ms: float, functions: List[dict]):
+    route = scope.get("route")
+    recent_profiles.append({
+        "id": profile_id,
+        "kind": kind,
+        "method": scope["method"],
+        "path": scope["path"],
+        "route": getattr(route, "path", None),
+        "status": status,
+        "duration_ms": round(duration_ms, 3),
+        "captured_at": datetime.now(timezone.utc).isoformat(),
+        "functions": functions,
+    })
+
+
+class ProfilingMiddleware:
+    """
+    cProfile for requests carrying a valid admin profiling token (the profile id is returned
+    in X-Profile-Id) and a sampled profile for any request slower than SLOW_REQUEST_MS
+    """
+
+    def __init__(self, app, slow_request_ms: float = SLOW_REQUEST_MS):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+        self.watchdog = SlowRequestWatchdog(slow_request_ms)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = requested_token(scope)
+        if token is not None and not scope["path"].startswith(PROFILE_ENDPOINT_PREFIX):
+            if not is_admin(token):
+                await JSONResponse({"detail": "Invalid profiling token"}, status_code=403)(scope, receive, send)
+                return
+            if not _profile_lock.acquire(blocking=False):
+                await JSONResponse({"detail": "Another request is being profiled"}, status_code=409)(scope, receive, send)
+                return
+            try:
+                await self._profiled(scope, receive, send)
+            finally:
+                _profile_lock.release()
+            return
+
+        if self.slow_request_ms <= 0:
+            await self.app(scope, receive, send)
+            return
+        await self._watched(scope, receive, send)
+
+    async def _profiled(self, scope, receive, send):
+        profile_id = uuid.uuid4().hex[:12]
+        status = 500
+
+        async def tagged_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {**message, "headers": list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        # cProfile sees everything the event loop runs meanwhile, so concurrent requests show up too
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, tagged_send)
+        finally:
+            profile.disable()
+            store_profile(profile_id, "cprofile", scope, status, (time.perf_counter() - started) * 1000, cprofile_top(profile))
+
+    async def _watched(self, scope, receive, send):
+        status = 500
+
+        async def status_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        request_id = self.watchdog.begin()
+        try:
+            await self.app(scope, receive, status_send)
+        finally:
+            samples = self.watchdog.end(request_id)
+            if samples.samples:
+                duration_ms = (time.perf_counter() - samples.started) * 1000
+                functions = samples.top()
+                profile_id = uuid.uuid4().hex[:12]
+                store_profile(profile_id, "sampled", scope, status, duration_ms, functions)
+                busiest = sorted(functions, key=lambda f: f["own_samples"], reverse=True)[:5]
+                hottest = ", ".join(f"{f['function']} ({f['own_samples']} own samples)" for f in busiest if f["own_samples"])
+                logger.warning(
+                    f"Slow request {scope['method']} {scope['path']} took {duration_ms:.0f} ms "
+                    f"(profile {profile_id}, {samples.samples} samples): {hottest}"
+                )
+
+
+def require_admin(token: Optional[str]):
+    if not is_admin(token):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+
+@profiling_router.get("/debug/profiles")
+async def list_profiles(x_profile_token: Optional[str] = Header(None)):
+    """Recent request profiles without their function tables, newest first"""
+    require_admin(x_profile_token)
+    return {
+        "profiles": [
+            {key: value for key, value in profile.items() if key != "functions"}
+            for profile in reversed(recent_profiles)
+        ]
+    }
+
+
+@profiling_router.get("/debug/profiles/{profile_id}")
+async def get_profile(profile_id: str, x_profile_token: Optional[str] = Header(None)):
+    require_admin(x_profile_token)
+    for profile in recent_profiles:
+        if profile["id"] == profile_id:
+            return profile
+    raise HTTPException(status_code=404, detail="Profile not found")
@@ -1,13 +1,40 @@
 import json
 import logging
-from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Optional
+from backend.customer_identity import ALL_CHANNELS, get_customer_index
+from backend.data_sources import connector_registry
+from backend.http_cache import SHORT_LIVED, http_cache
+from backend.inventory_index import get_inventory_index, inventory_alerts, record_stock_change
+from backend.json_response import FastJSONRoute
+from backend.metrics import span
+from backend.order_store import get_order_store
+from backend.product_sales import get_product_sales
+from backend.review_data import parse_timestamp
+from backend.shared_snapshot import shared_snapshots
+from backend.time_series import TREND_MAX_POINTS, get_order_trends
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-qualitative_router = APIRouter()
+qualitative_router = APIRouter(route_class=FastJSONRoute)
 
+# Bumped on every stock change, which does not touch the connector snapshot
+data_versions = {"inventory": 1}
+
+async def inventory_data_version() -> tuple:
+    """Connector snapshot version and stock change count"""
+    return await connector_registry.version(), data_versions["inventory"]
+
+class StockUpdate(BaseModel):
+    product_id: str
+    stock: int = Field(..., ge=0)
+
+class StockUpdateBatch(BaseModel):
+    updates: List[StockUpdate] = Field(..., min_length=1, max_length=1000)
+
+@span("data_load")
 def load_json_file(filename: str) -> dict:
     """Load a JSON file"""
     try:
@@ -18,6 +45,7 @@ def load_json_file(filename: str) -> dict:
         return {}
 
 @qualitative_router.get("/qualitative/connectors")
+@http_cache(connector_registry.version, SHORT_LIVED)
 async def get_qualitative_connectors():
     """Get all connectors with their data"""
     try:
@@ -25,8 +53,8 @@ async def get_qualitative_connectors():
         google_ads = load_json_file('google_ads.json')
         google_analytics = load_json_file('google_analytics.json')
         pinterest = load_json_file('pinterest_ads.json')
-        shopify = load_json_file('shopify_demo.json')
         woocommerce = load_json_file('woocommerce.json')
+        orders = get_order_store(await connector_registry.snapshot()).by_channel()
         
         connectors = [
             {
@@ -73,16 +101,16 @@ async def get_qualitative_connectors():
                 "type": "ecommerce",
                 "platform": "Shopify",
                 "status": "connected",
-                "orders": len(shopify.get('orders', [])),
-                "total_revenue": sum(order.get('total', 0) for order in shopify.get('orders', []))
+                "orders": orders["shopify"]["orders"],
+                "total_revenue": orders["shopify"]["revenue"]
             },
             {
                 "name": "WooCommerce",
                 "type": "ecommerce",
                 "platform": "WordPress",
                 "status": "connected",
-                "orders": woocommerce.get('analytics', {}).get('total_orders', 0),
-                "total_revenue": woocommerce.get('analytics', {}).get('total_revenue', 0),
+                "orders": orders["woocommerce"]["orders"],
+                "total_revenue": orders["woocommerce"]["revenue"],
                 "products": woocommerce.get('analytics', {}).get('total_products', 0)
             }
         ]
@@ -92,40 +120,38 @@ async def get_qualitative_connectors():
         raise HTTPException(status_code=500, detail=f"Error fetching connectors: {str(e)}")
 
 @qualitative_router.get("/qualitative/dashboard")
+@http_cache(inventory_data_version, SHORT_LIVED)
 async def get_dashboard_analytics():
     """Get comprehensive dashboard analytics"""
     try:
         # Load all data sources
-        shopify = load_json_file('shopify_demo.json')
-        woocommerce = load_json_file('woocommerce.json')
-        product_catalog = load_json_file('product.json')
+        snapshot = await connector_registry.snapshot()
+        order_store = get_order_store(snapshot)
         meta_ads = load_json_file('meta_ads.json')
         google_ads = load_json_file('google_ads.json')
         pinterest = load_json_file('pinterest_ads.json')
         google_analytics = load_json_file('google_analytics.json')
         
         # Calculate combined metrics
-        shopify_orders = shopify.get('orders', [])
-        woo_orders = woocommerce.get('orders', [])
+        channels = order_store.by_channel()
         
-        total_orders = len(shopify_orders) + len(woo_orders)
+        total_orders = len(order_store)
         
-        shopify_revenue = sum(order.get('total', 0) for order in shopify_orders)
-        woo_revenue = woocommerce.get('analytics', {}).get('total_revenue', 0)
+        shopify_revenue = channels["shopify"]["revenue"]
+        woo_revenue = channels["woocommerce"]["revenue"]
         total_revenue = shopify_revenue + woo_revenue
         
         avg_order_value = total_revenue / total_orders if total_orders > 0 else 0
         
         # Products and inventory
-        products = product_catalog.get('products', [])
-        total_products = len(products)
-        total_stock = sum(p.get('stock', 0) for p in products)
-        low_stock_products = len([p for p in products if p.get('stock', 0) < 50])
+        inventory = get_inventory_index(snapshot)
+        total_products = len(inventory)
+        total_stock = inventory.total_stock
+        low_stock_products = inventory.low_stock_count()
         
-        # Customers (unique from both platforms)
-        shopify_customers = set(order.get('customer', {}).get('email') for order in shopify_orders)
-        woo_customers = woocommerce.get('customers', [])
-        total_customers = len(shopify_customers) + len(woo_customers)
+        # Customers (unique across both platforms, matched on normalised email / phone)
+        customer_index = get_customer_index(snapshot)
+        total_customers = customer_index.customers
         
         # Ad spend and ROAS
         total_ad_spend = (
@@ -143,18 +169,10 @@ async def get_dashboard_analytics():
         overall_roas = total_ad_revenue / total_ad_spend if total_ad_spend > 0 else 0
         
         # Order status breakdown
-        order_statuses = {}
-        for order in shopify_orders + woo_orders:
-            status = order.get('status', 'unknown')
-            order_statuses[status] = order_statuses.get(status, 0) + 1
-        
-        # Top products (from product catalog with sales data)
-        top_products = sorted(
-            [{"name": p.get('name'), "revenue": p.get('price', 0) * p.get('reviews_count', 0) / 10, "stock": p.get('stock', 0)} 
-             for p in products],
-            key=lambda x: x['revenue'],
-            reverse=True
-        )[:5]
+        order_statuses = order_store.status_counts()
+        
+        # Top products by revenue from order line items
+        top_products = get_product_sales(snapshot).top(5)
         
         # Revenue by channel
         revenue_by_channel = [
@@ -168,10 +186,10 @@ async def get_dashboard_analytics():
         # Traffic sources
         traffic_sources = google_analytics.get('traffic_sources', [])
         
-        # Monthly trend (simplified)
+        # Monthly trend from order dates
         monthly_trend = [
-            {"month": "Jan", "revenue": total_revenue * 0.85, "orders": total_orders * 0.9},
-            {"month": "Feb", "revenue": total_revenue, "orders": total_orders}
+            {"month": point["period"], "revenue": point["revenue"], "orders": point["orders"]}
+            for point in get_order_trends(snapshot).points("month")["points"]
         ]
         
         return {
@@ -186,6 +204,10 @@ async def get_dashboard_analytics():
                 "total_ad_spend": round(total_ad_spend, 2),
                 "overall_roas": round(overall_roas, 2)
             },
+            "customers": {
+                "by_channel": customer_index.by_channel,
+                "shared": customer_index.shared_customers
+            },
             "order_statuses": order_statuses,
             "top_products": top_products,
             "revenue_by_channel": revenue_by_channel,
@@ -200,3 +222,105 @@ async def get_dashboard_analytics():
     except Exception as e:
         logger.error(f"Dashboard analytics error: {e}")
         raise HTTPException(status_code=500, detail=f"Error calculating analytics: {str(e)}")
+
+@qualitative_router.get("/qualitative/customers")
+@http_cache(connector_registry.version, SHORT_LIVED)
+async def get_customer_counts(
+    channel: str = Query(ALL_CHANNELS, pattern="^(all|shopify|woocommerce)$"),
+    start_date: Optional[str] = Query(None, description="ISO date, inclusive"),
+    end_date: Optional[str] = Query(None, description="ISO date, inclusive"),
+    daily: bool = Query(False, description="Include distinct customers per day")
+):
+    """Distinct customers with orders in a date range; approximate (HyperLogLog) on large data"""
+    try:
+        start, end = parse_timestamp(start_date), parse_timestamp(end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {str(e)}")
+    # The index is bucketed by ISO day
+    start, end = start and start.date().isoformat(), end and end.date().isoformat()
+    index = get_customer_index(await connector_registry.snapshot())
+    result = {
+        "channel": channel,
+        "start_date": start_date,
+        "end_date": end_date,
+        "active_customers": index.distinct(channel, start, end),
+        "total_customers": index.customers if channel == ALL_CHANNELS else index.by_channel.get(channel, 0),
+        "exact": index.exact
+    }
+    if daily:
+        result["daily"] = index.daily(channel, start, end)
+    return result
+
+@qualitative_router.get("/qualitative/trends")
+@http_cache(connector_registry.version, SHORT_LIVED)
+async def get_order_trend_series(
+    granularity: str = Query("day", pattern="^(hour|day|month)$"),
+    channel: str = Query(ALL_CHANNELS, pattern="^(all|shopify|woocommerce)$"),
+    start_date: Optional[str] = Query(None, description="ISO date or timestamp, inclusive"),
+    end_date: Optional[str] = Query(None, description="ISO date or timestamp, inclusive"),
+    points: int = Query(TREND_MAX_POINTS, ge=3, le=5000, description="Most points to return"),
+    metric: str = Query("revenue", pattern="^(revenue|orders)$", description="Series whose shape downsampling keeps")
+):
+    """Revenue and orders over time, downsampled (LTTB) to at most `points` points"""
+    try:
+        start, end = parse_timestamp(start_date), parse_timestamp(end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {str(e)}")
+    trends = get_order_trends(await connector_registry.snapshot())
+    return trends.points(granularity, channel, start, end, points, metric)
+
+@qualitative_router.get("/qualitative/top_products")
+@http_cache(connector_registry.version, SHORT_LIVED)
+async def get_top_products(
+    metric: str = Query("revenue", pattern="^(revenue|units)$"),
+    limit: int = Query(10, ge=1, le=1000),
+    channel: Optional[str] = Query(None, pattern="^(shopify|woocommerce)$"),
+    start_date: Optional[str] = Query(None, description="ISO date or timestamp, inclusive"),
+    end_date: Optional[str] = Query(None, description="ISO date or timestamp, inclusive")
+):
+    """Best-selling products by revenue or units sold, optionally for one channel and date range"""
+    try:
+        start, end = parse_timestamp(start_date), parse_timestamp(end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid date: {str(e)}")
+    sales = get_product_sales(await connector_registry.snapshot())
+    return {"metric": metric, "products": sales.top(limit, metric, channel, start, end)}
+
+@qualitative_router.get("/qualitative/inventory/low_stock")
+@http_cache(inventory_data_version, SHORT_LIVED)
+async def get_low_stock(
+    category: Optional[str] = Query(None),
+    threshold: Optional[int] = Query(None, ge=0, description="Defaults to the category's low-stock threshold"),
+    limit: int = Query(50, ge=0, le=10000)
+):
+    """Products below their low-stock threshold, lowest stock first"""
+    inventory = get_inventory_index(await connector_registry.snapshot())
+    return {
+        "category": category,
+        "threshold": threshold,
+        "count": inventory.low_stock_count(threshold, category),
+        "products": inventory.low_stock(threshold, category, limit)
+    }
+
+@qualitative_router.post("/qualitative/inventory/stock")
+async def update_stock(batch: StockUpdateBatch):
+    """Apply stock changes; returns the low-stock / out-of-stock / restocked alerts they raise"""
+    if shared_snapshots:
+        raise HTTPException(status_code=409, detail="Product data is a shared snapshot here; update product.json and reload the launcher")
+
+    inventory = get_inventory_index(await connector_registry.snapshot())
+    unknown = [update.product_id for update in batch.updates if update.product_id not in inventory.products]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown products: {', '.join(unknown)}")
+
+    alerts = []
+    for update in batch.updates:
+        alerts.extend(record_stock_change(inventory, update.product_id, update.stock))
+    data_versions["inventory"] += 1
+
+    return {"updated": len(batch.updates), "alerts": alerts}
+
+@qualitative_router.get("/qualitative/inventory/alerts")
+async def get_inventory_alerts(limit: int = Query(50, ge=1, le=1000)):
+    """Most recent stock alerts, newest first"""
+    return {"alerts": list(inventory_alerts)[-limit:][::-1]}
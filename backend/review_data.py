@@ -0,0 +1,550 @@
+"""
+Review data behind the report endpoints, stored column-wise in a data snapshot: one small code
+per review for each filtered or counted field, the timestamp in microseconds, and the full
+records as JSON for the pages /reviews returns.
+
+Date-range counts come from Fenwick trees of daily counts per (company, platform, dimension
+value), with company and platform also summed over, so any range costs O(log D) per value.
+Only the partial days at the two ends of a range are counted row by row, through the reviews
+sorted by time.
+
+overall_summary is free text: near-duplicate summaries of the same sentiment share a cluster
+code (MinHash / LSH, assigned as reviews are written or ingested), and Space-Saving summaries of the most frequent
+clusters per (company, platform, category, sentiment) are kept up to date on ingest.
+"""
+import json
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import chain, compress
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import orjson
+
+from backend.daily_counts import DAY_MICROS, FenwickTree, day_of
+from backend.heavy_hitters import SpaceSaving
+from backend.shared_snapshot import SharedSnapshot, SnapshotWriter, encode_json
+from backend.summary_clusters import SummaryClusters
+
+# Dictionary-encoded review fields; code 0 stands for a missing or empty value
+REVIEW_COLUMNS = (
+    "platform",
+    "company",
+    "overall_sentiment",
+    "overall_sentiment_detail",
+    "overall_sentimental_category",
+    "category",
+)
+
+# Derived columns: "%Y-%m" of time_period and the cluster of overall_summary
+MONTH_COLUMN = "month"
+SUMMARY_CLUSTER_COLUMN = "summary_cluster"
+
+# Dimensions with daily counters: name -> columns whose codes make up a value
+WINDOW_DIMENSIONS = {
+    "total": (),
+    "sentiment": ("overall_sentiment",),
+    "detail": ("overall_sentiment_detail",),
+    "sentiment_category": ("overall_sentiment", "category"),
+}
+
+# Days the counters reach past the newest review (or today), so ingested reviews fit
+WINDOW_HEADROOM_DAYS = 366
+
+MISSING_TIME = -(2 ** 63)
+MISSING_DAY = day_of(MISSING_TIME)
+LATEST_TIME = 2 ** 63 - 1
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# (company code, platform code, dimension, value codes); None stands for any company / platform
+SeriesKey = Tuple[Optional[int], Optional[int], str, Tuple[int, ...]]
+
+# (company, platform, category, sentiment) codes of a summary cluster sketch; None stands for any
+SummaryKey = Tuple[Optional[int], Optional[int], Optional[int], int]
+
+
+def parse_timestamp(value: Any) -> Any:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return value
+
+
+def to_micros(moment: datetime) -> int:
+    """Microseconds since the epoch; naive datetimes are taken as UTC"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    delta = moment - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def from_micros(micros: int) -> datetime:
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def read_demo_data(path: str = 'demo_data.json') -> dict:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    # Convert date strings to datetime
+    for review in data.get('sentimental_analysis', []):
+        review['time_period'] = parse_timestamp(review.get('time_period'))
+    for report in data.get('sentimental_monthly_reports', []):
+        report['time_period'] = parse_timestamp(report.get('time_period'))
+
+    return data
+
+
+def smallest_typecode(size: int) -> str:
+    for typecode in ('B', 'H', 'I'):
+        if size <= 2 ** (8 * array(typecode).itemsize):
+            return typecode
+    return 'Q'
+
+
+def series_keys(company: int, platform: int, dimension: str, values: Tuple[int, ...]) -> List[SeriesKey]:
+    """Every counter a review with these codes adds to"""
+    return [
+        (company, platform, dimension, values),
+        (company, None, dimension, values),
+        (None, platform, dimension, values),
+        (None, None, dimension, values),
+    ]
+
+
+def summary_keys(company: int, platform: int, category: int, sentiment: int) -> List[SummaryKey]:
+    """Every summary cluster sketch a review with these codes adds to"""
+    keys = [
+        (company, platform, None, sentiment),
+        (company, None, None, sentiment),
+        (None, platform, None, sentiment),
+        (None, None, None, sentiment),
+    ]
+    if category:
+        keys += [(company, None, category, sentiment), (None, None, category, sentiment)]
+    return keys
+
+
+def series_order(key: SeriesKey) -> tuple:
+    company, platform, dimension, values = key
+    return (company is None, company or 0, platform is None, platform or 0, dimension, values)
+
+
+def build_window_index(columns: Dict[str, Sequence[int]], times: Sequence[int]) -> Tuple[dict, array, array, array]:
+    """
+    Daily counters and time order for the review columns: metadata, the Fenwick trees
+    concatenated (days + 1 entries each), row numbers sorted by time and those times
+    """
+    days = array('q', map(day_of, times))
+    dated = [day for day in set(days) if day != MISSING_DAY]
+    today = day_of(int(time.time() * 1_000_000))
+    first_day = min(dated, default=today)
+    size = max(max(dated, default=today), today) - first_day + 1 + WINDOW_HEADROOM_DAYS
+
+    slot_counts: Dict[SeriesKey, Counter] = defaultdict(Counter)
+    undated: Dict[SeriesKey, int] = Counter()
+    for name, dimension in WINDOW_DIMENSIONS.items():
+        grouped = Counter(zip(days, columns["company"], columns["platform"], *(columns[c] for c in dimension)))
+        for (day, company, platform, *values), count in grouped.items():
+            for key in series_keys(company, platform, name, tuple(values)):
+                if day == MISSING_DAY:
+                    undated[key] += count
+                else:
+                    slot_counts[key][day - first_day] += count
+
+    keys = sorted(slot_counts, key=series_order)
+    fenwick = array('I')
+    for key in keys:
+        counts = [0] * size
+        for slot, count in slot_counts[key].items():
+            counts[slot] = count
+        fenwick.extend(FenwickTree.build(counts))
+
+    order = sorted((row for row in range(len(times)) if times[row] != MISSING_TIME), key=times.__getitem__)
+    meta = {
+        "first_day": first_day,
+        "days": size,
+        "series": [[c, p, name, list(values)] for c, p, name, values in keys],
+        "undated": [[c, p, name, list(values), count] for (c, p, name, values), count in undated.items()],
+        "order_typecode": smallest_typecode(len(times)),
+    }
+    return meta, fenwick, array(meta["order_typecode"], order), array('q', map(times.__getitem__, order))
+
+
+def write_review_data(writer: SnapshotWriter, demo_data: dict) -> None:
+    """Add the review table and the rest of demo_data.json to a snapshot"""
+    columns = REVIEW_COLUMNS + (MONTH_COLUMN,)
+    labels: Dict[str, Dict[Any, int]] = {column: {} for column in columns}
+    codes = {column: array('I') for column in columns + (SUMMARY_CLUSTER_COLUMN,)}
+    times = array('q')
+    clusters = SummaryClusters()
+    sketches: Dict[SummaryKey, SpaceSaving] = defaultdict(SpaceSaving)
+
+    def code(column: str, value: Any) -> int:
+        if not value:
+            return 0
+        known = labels[column]
+        if value not in known:
+            known[value] = len(known) + 1
+        return known[value]
+
+    def encode(review: dict) -> bytes:
+        for column in REVIEW_COLUMNS:
+            codes[column].append(code(column, review.get(column)))
+        moment = review.get('time_period')
+        if isinstance(moment, datetime):
+            times.append(to_micros(moment))
+            codes[MONTH_COLUMN].append(code(MONTH_COLUMN, moment.strftime("%Y-%m")))
+        else:
+            times.append(MISSING_TIME)
+            codes[MONTH_COLUMN].append(0)
+        cluster = clusters.assign(review.get('overall_summary'), codes["overall_sentiment"][-1])
+        codes[SUMMARY_CLUSTER_COLUMN].append(cluster)
+        if cluster:
+            row_codes = (codes[column][-1] for column in ("company", "platform", "category", "overall_sentiment"))
+            for key in summary_keys(*row_codes):
+                sketches[key].add(cluster)
+        return encode_json(review)
+
+    rows = writer.add_records("reviews", demo_data.get('sentimental_analysis', []), encode)
+    label_lists = {column: list(known) for column, known in labels.items()}
+    label_lists[SUMMARY_CLUSTER_COLUMN] = clusters.labels[1:]
+    typecodes = {}
+    for column, values in label_lists.items():
+        typecodes[column] = smallest_typecode(len(values) + 1)
+        writer.add(f"reviews:{column}", array(typecodes[column], codes[column]))
+    writer.add("reviews:time", times)
+    writer.add_document("review_summary_sketches", [[*key, sketch.state()] for key, sketch in sketches.items()])
+
+    window, fenwick, time_order, sorted_times = build_window_index(codes, times)
+    writer.add("reviews:fenwick", fenwick)
+    writer.add("reviews:time_order", time_order)
+    writer.add("reviews:sorted_time", sorted_times)
+    writer.meta["reviews"] = {
+        "rows": rows,
+        "labels": label_lists,
+        "typecodes": typecodes,
+        "window": window,
+        # Sentiment code of each summary cluster, which SummaryClusters needs to carry on assigning
+        "summary_cluster_sentiments": clusters.groups[1:],
+    }
+    writer.add_document("demo_data", {k: v for k, v in demo_data.items() if k != 'sentimental_analysis'})
+
+
+def decode_review(review: dict) -> dict:
+    review['time_period'] = parse_timestamp(review.get('time_period'))
+    return review
+
+
+def take(column: Sequence[int], rows: Sequence[int]) -> Sequence[int]:
+    """Values of a column at the given rows"""
+    if isinstance(rows, range) and len(rows) == len(column):
+        return column
+    if len(rows) == 1:
+        return (column[rows[0]],)
+    if not rows:
+        return ()
+    return itemgetter(*rows)(column)
+
+
+class ReviewTable:
+    """
+    Column view of the reviews in one snapshot. In single-process mode reviews can be
+    appended; the columns are then copied out of the snapshot once.
+    """
+
+    def __init__(self, snapshot: SharedSnapshot):
+        meta = snapshot.meta["reviews"]
+        self.size: int = meta["rows"]
+        self.labels: Dict[str, List[Any]] = {column: [None] + values for column, values in meta["labels"].items()}
+        self._codes = {column: {value: code for code, value in enumerate(values) if code} for column, values in self.labels.items()}
+        self.columns = {column: snapshot.array(f"reviews:{column}", typecode) for column, typecode in meta["typecodes"].items()}
+        self.times = snapshot.array("reviews:time", 'q')
+        self.records = snapshot.records("reviews", decode_review)
+        self._extra_records: List[bytes] = []
+        self._clusters: Optional[SummaryClusters] = None
+        self._cluster_sentiments: List[Optional[int]] = [None] + meta["summary_cluster_sentiments"]
+        self._sketches: Dict[SummaryKey, SpaceSaving] = {
+            tuple(key): SpaceSaving.restore(state)
+            for *key, state in snapshot.document("review_summary_sketches")
+        }
+        self._writable = False
+
+        window = meta["window"]
+        self._load_window(
+            window,
+            snapshot.array("reviews:fenwick", 'I'),
+            snapshot.array("reviews:time_order", window["order_typecode"]),
+            snapshot.array("reviews:sorted_time", 'q'),
+        )
+
+    def _load_window(self, window: dict, fenwick: Sequence[int], time_order: Sequence[int], sorted_times: Sequence[int]):
+        self._first_day: int = window["first_day"]
+        self._days: int = window["days"]
+        self._series: Dict[SeriesKey, FenwickTree] = {}
+        self._by_filter: Dict[tuple, List[Tuple[Tuple[int, ...], FenwickTree]]] = defaultdict(list)
+        stride = self._days + 1
+        for i, (company, platform, dimension, values) in enumerate(window["series"]):
+            self._add_series((company, platform, dimension, tuple(values)), fenwick[i * stride:(i + 1) * stride])
+        self._undated: Dict[tuple, Counter] = defaultdict(Counter)
+        for company, platform, dimension, values, count in window["undated"]:
+            self._undated[(company, platform, dimension)][tuple(values)] += count
+        self._time_order = time_order
+        self._sorted_times = sorted_times
+        # Rows appended since the time order was built
+        self._appended: List[int] = []
+
+    def _add_series(self, key: SeriesKey, tree: Sequence[int]) -> FenwickTree:
+        series = self._series[key] = FenwickTree(tree)
+        self._by_filter[key[:3]].append((key[3], series))
+        return series
+
+    def __len__(self) -> int:
+        return self.size
+
+    def code(self, column: str, value: Any) -> Optional[int]:
+        return self._codes[column].get(value)
+
+    def select(self, platform: Optional[str] = None, company: Optional[str] = None, sentiment: Optional[str] = None,
+               start: Optional[datetime] = None, end: Optional[datetime] = None, category: Optional[str] = None) -> Sequence[int]:
+        """Rows matching every given filter, in file order"""
+        rows: Sequence[int] = range(self.size)
+        filters = (("platform", platform), ("company", company), ("overall_sentiment", sentiment), ("category", category))
+        for column, value in filters:
+            if not value:
+                continue
+            code = self.code(column, value)
+            if code is None:
+                return []
+            rows = list(compress(rows, map(code.__eq__, take(self.columns[column], rows))))
+        if start is not None or end is not None:
+            low, high = self._bounds(start, end)
+            rows = list(compress(rows, map(low.__le__, take(self.times, rows))))
+            rows = list(compress(rows, map(high.__ge__, take(self.times, rows))))
+        return rows
+
+    def count(self, rows: Sequence[int], *columns: str) -> Counter:
+        """Occurrences of each combination of codes over the rows"""
+        if len(columns) == 1:
+            return Counter(take(self.columns[columns[0]], rows))
+        return Counter(zip(*(take(self.columns[column], rows) for column in columns)))
+
+    def window_counts(self, dimension: str, platform: Optional[str] = None, company: Optional[str] = None,
+                      start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict[Tuple[int, ...], int]:
+        """
+        Reviews per value (tuple of codes) of a WINDOW_DIMENSIONS entry, for reviews matching
+        company / platform with start <= time_period <= end. Undated reviews count only when
+        neither bound is given.
+        """
+        codes = self._filter_codes(platform, company)
+        if codes is None:
+            return {}
+        series = self._by_filter.get((*codes, dimension), [])
+
+        if start is None and end is None:
+            counts = Counter({values: tree.prefix(tree.size) for values, tree in series})
+            counts.update(self._undated.get((*codes, dimension), {}))
+        else:
+            low, high = self._bounds(start, end)
+            # Whole days strictly inside the range from the counters, the two edge days row by row
+            first = day_of(low) + 1 - self._first_day
+            stop = day_of(high) - self._first_day
+            counts = Counter({values: tree.range_sum(first, stop) for values, tree in series})
+            columns = [self.columns[column] for column in WINDOW_DIMENSIONS[dimension]]
+            counts.update(
+                tuple(column[row] for column in columns)
+                for row in self._edge_rows(low, high, *codes)
+            )
+        return {values: count for values, count in counts.items() if count}
+
+    def latest(self, platform: Optional[str] = None, company: Optional[str] = None,
+               start: Optional[datetime] = None, end: Optional[datetime] = None) -> Optional[datetime]:
+        """Newest time_period among the matching reviews in the range"""
+        codes = self._filter_codes(platform, company)
+        if codes is None:
+            return None
+        low, high = self._bounds(start, end)
+        low_day, high_day = day_of(low), day_of(high)
+
+        # The partial last day, then whole days newest first as the total counter finds them
+        newest = self._newest_between(max(low, high_day * DAY_MICROS), high, *codes)
+        totals = self._series.get((*codes, "total", ()))
+        stop = high_day - self._first_day
+        while newest is None and totals is not None:
+            slot = totals.last_nonempty(stop)
+            day = self._first_day + slot
+            if slot < 0 or day < low_day:
+                break
+            newest = self._newest_between(max(low, day * DAY_MICROS), (day + 1) * DAY_MICROS - 1, *codes)
+            stop = slot
+        return from_micros(newest) if newest is not None else None
+
+    def top_summaries(self, sentiment: str, platform: Optional[str] = None, company: Optional[str] = None,
+                      category: Optional[str] = None, start: Optional[datetime] = None,
+                      end: Optional[datetime] = None) -> SpaceSaving:
+        """
+        Most frequent summary clusters among the matching reviews. Without a date range this is
+        a sketch kept since load; a range (or platform with category) is counted from the
+        cluster column and folded into a sketch of the same size.
+        """
+        codes = self._filter_codes(platform, company)
+        sentiment_code = self.code("overall_sentiment", sentiment)
+        category_code = self.code("category", category) if category else None
+        if codes is None or sentiment_code is None or (category and category_code is None):
+            return SpaceSaving()
+        company_code, platform_code = codes
+
+        if start is None and end is None and not (platform_code and category_code):
+            key = (company_code, None if category_code else platform_code, category_code, sentiment_code)
+            return self._sketches.get(key) or SpaceSaving()
+
+        rows = self.select(platform, company, sentiment, start, end, category)
+        summary = SpaceSaving()
+        # Largest first, so the clusters that make the top of the list stay exact
+        for cluster, count in self.count(rows, SUMMARY_CLUSTER_COLUMN).most_common():
+            if cluster:
+                summary.add(cluster, count)
+        return summary
+
+    def append(self, review: dict) -> int:
+        """Add a review (single-process mode) and count it in O(log D) per counter; returns its row"""
+        if not self._writable:
+            self._make_writable()
+        row = self.size
+        for column in REVIEW_COLUMNS:
+            self.columns[column].append(self._intern(column, review.get(column)))
+        moment = review.get('time_period')
+        if isinstance(moment, datetime):
+            micros = to_micros(moment)
+            self.columns[MONTH_COLUMN].append(self._intern(MONTH_COLUMN, moment.strftime("%Y-%m")))
+        else:
+            micros = MISSING_TIME
+            self.columns[MONTH_COLUMN].append(0)
+        self.times.append(micros)
+        self._extra_records.append(encode_json(review))
+        self.size += 1
+
+        if self._clusters is None:
+            self._clusters = SummaryClusters(self.labels[SUMMARY_CLUSTER_COLUMN], self._cluster_sentiments)
+        cluster = self._clusters.assign(review.get('overall_summary'), self.columns["overall_sentiment"][row])
+        self.columns[SUMMARY_CLUSTER_COLUMN].append(cluster)
+        if cluster:
+            row_codes = (self.columns[column][row] for column in ("company", "platform", "category", "overall_sentiment"))
+            for key in summary_keys(*row_codes):
+                sketch = self._sketches.get(key)
+                if sketch is None:
+                    sketch = self._sketches[key] = SpaceSaving()
+                sketch.add(cluster)
+
+        slot = day_of(micros) - self._first_day
+        if micros != MISSING_TIME and not 0 <= slot < self._days:
+            # Outside the counters' days: rebuild them, this review included
+            self._load_window(*build_window_index(self.columns, self.times))
+            return row
+
+        company, platform = self.columns["company"][row], self.columns["platform"][row]
+        for name, dimension in WINDOW_DIMENSIONS.items():
+            values = tuple(self.columns[column][row] for column in dimension)
+            for key in series_keys(company, platform, name, values):
+                if micros == MISSING_TIME:
+                    self._undated[key[:3]][values] += 1
+                    continue
+                series = self._series.get(key) or self._add_series(key, array('I', bytes(4 * (self._days + 1))))
+                series.add(slot)
+        if micros != MISSING_TIME:
+            self._appended.append(row)
+        return row
+
+    def record(self, row: int) -> dict:
+        if row < len(self.records):
+            return self.records[row]
+        return decode_review(orjson.loads(self._extra_records[row - len(self.records)]))
+
+    def fragment(self, rows: Sequence[int]) -> orjson.Fragment:
+        """JSON array of the given reviews, as stored"""
+        base = len(self.records)
+        raw = self.records.raw
+        extra = self._extra_records
+        return orjson.Fragment(b"[" + b",".join(raw(row) if row < base else extra[row - base] for row in rows) + b"]")
+
+    def _make_writable(self):
+        self.columns = {column: array('I', values) for column, values in self.columns.items()}
+        self.times = array('q', self.times)
+        for series in self._series.values():
+            series.tree = array('I', series.tree)
+        self._writable = True
+
+    def _intern(self, column: str, value: Any) -> int:
+        if not value:
+            return 0
+        code = self._codes[column].get(value)
+        if code is None:
+            code = self._codes[column][value] = len(self.labels[column])
+            self.labels[column].append(value)
+        return code
+
+    def _filter_codes(self, platform: Optional[str], company: Optional[str]) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        """(company, platform) codes, None for no filter; None overall when a value is unknown"""
+        codes = []
+        for column, value in (("company", company), ("platform", platform)):
+            code = self.code(column, value) if value else None
+            if value and code is None:
+                return None
+            codes.append(code)
+        return codes[0], codes[1]
+
+    @staticmethod
+    def _bounds(start: Optional[datetime], end: Optional[datetime]) -> Tuple[int, int]:
+        low = to_micros(start) if start is not None else MISSING_TIME + 1
+        high = to_micros(end) if end is not None else LATEST_TIME
+        return low, high
+
+    def _rows_between(self, low: int, high: int, company: Optional[int], platform: Optional[int]) -> Iterator[int]:
+        """Rows with low <= time <= high matching the company / platform codes"""
+        start = bisect_left(self._sorted_times, low)
+        stop = bisect_right(self._sorted_times, high)
+        times = self.times
+        rows = chain(
+            self._time_order[start:stop],
+            (row for row in self._appended if low <= times[row] <= high),
+        )
+        companies, platforms = self.columns["company"], self.columns["platform"]
+        for row in rows:
+            if (company is None or companies[row] == company) and (platform is None or platforms[row] == platform):
+                yield row
+
+    def _edge_rows(self, low: int, high: int, company: Optional[int], platform: Optional[int]) -> Iterator[int]:
+        low_day, high_day = day_of(low), day_of(high)
+        if low_day == high_day:
+            yield from self._rows_between(low, high, company, platform)
+            return
+        yield from self._rows_between(low, (low_day + 1) * DAY_MICROS - 1, company, platform)
+        yield from self._rows_between(high_day * DAY_MICROS, high, company, platform)
+
+    def _newest_between(self, low: int, high: int, company: Optional[int], platform: Optional[int]) -> Optional[int]:
+        return max((self.times[row] for row in self._rows_between(low, high, company, platform)), default=None)
+
+
+@dataclass(frozen=True)
+class ReviewData:
+    """Reviews plus the monthly reports and Shopify insights from one snapshot generation"""
+    version: int
+    reviews: ReviewTable
+    monthly_reports: List[dict]
+    shopify_insights: Optional[dict]
+
+    @classmethod
+    def from_snapshot(cls, snapshot: SharedSnapshot) -> "ReviewData":
+        document = snapshot.document("demo_data")
+        reports = document.get('sentimental_monthly_reports', [])
+        for report in reports:
+            report['time_period'] = parse_timestamp(report.get('time_period'))
+        return cls(
+            version=snapshot.generation,
+            reviews=ReviewTable(snapshot),
+            monthly_reports=reports,
+            shopify_insights=document.get('shopify_insights_lifetime'),
+        )
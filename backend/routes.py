@@ -1,33 +1,44 @@
+import asyncio
 import json
 import logging
+import threading
+import time
 from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import List, Dict, Any, Literal, Optional
+from datetime import datetime, timedelta, timezone
 from collections import defaultdict
+from backend.email_store import EmailStore
+from backend.email_ingestion import ReplyPipeline, classify_emails, train_email_classifier
+from backend.bot_routes import bot_config
+from backend.http_cache import LONG_LIVED, REVALIDATE, http_cache
+from backend.json_response import FastJSONRoute, trusted_response
+from backend.metrics import span
+from backend.review_data import MONTH_COLUMN, SUMMARY_CLUSTER_COLUMN, ReviewData, ReviewTable, parse_timestamp, read_demo_data, write_review_data
+from backend.shared_snapshot import SharedSnapshot, shared_snapshots
+from backend.text_classifier import CLASSIFIER_TRAINING_ROWS, LinearTextClassifier
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-sentiment_router = APIRouter()
+sentiment_router = APIRouter(route_class=FastJSONRoute)
 
-# Load JSON data
-def load_demo_data():
-    with open('demo_data.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    # Convert date strings to datetime
-    for review in data.get('sentimental_analysis', []):
-        if isinstance(review.get('time_period'), str):
-            review['time_period'] = datetime.fromisoformat(review['time_period'].replace('Z', '+00:00'))
+# Review data: a private snapshot in single-process mode, the launcher's shared one in workers
+local_review_data = None if shared_snapshots else ReviewData.from_snapshot(
+    SharedSnapshot.in_memory(lambda writer: write_review_data(writer, read_demo_data()))
+)
 
-    for report in data.get('sentimental_monthly_reports', []):
-        if isinstance(report.get('time_period'), str):
-            report['time_period'] = datetime.fromisoformat(report['time_period'].replace('Z', '+00:00'))
+def review_data() -> ReviewData:
+    if shared_snapshots:
+        return shared_snapshots.current().derive("review_data", ReviewData.from_snapshot)
+    return local_review_data
 
-    return data
+# Bumped whenever review data changes; part of the report endpoints' ETags
+data_versions = {"reviews": 1}
 
-DEMO_DATA = load_demo_data()
+def review_data_version() -> tuple:
+    """Snapshot generation and review data version plus the current hour, so day windows move forward"""
+    return review_data().version, data_versions["reviews"], int(time.time() // 3600)
 
 # Load email data
 def load_email_data():
@@ -42,26 +53,123 @@ def load_email_data():
     return data
 
 EMAIL_DATA = load_email_data()
+email_store = EmailStore(EMAIL_DATA.get('emails', []))
 
-# Helper functions
-def filter_reviews(platform=None, company=None, start_date=None, end_date=None, sentiment=None):
-    reviews = DEMO_DATA['sentimental_analysis']
-    filtered = []
+def email_reply_system_message() -> str:
+    return f"""{bot_config['bot_instructions']}
 
-    for review in reviews:
-        if platform and review.get('platform') != platform:
-            continue
-        if company and review.get('company') != company:
-            continue
-        if sentiment and review.get('overall_sentiment') != sentiment:
-            continue
-        if start_date and review.get('time_period') < datetime.fromisoformat(start_date):
-            continue
-        if end_date and review.get('time_period') > datetime.fromisoformat(end_date):
-            continue
-        filtered.append(review)
+Knowledge base:
+{bot_config['knowledge_base']}
+
+Write a reply to the customer email below."""
+
+email_classifier = train_email_classifier(EMAIL_DATA.get('emails', []))
+
+def classify_email_batch(emails: List[dict]) -> List[str]:
+    with span("classify"):
+        return classify_emails(emails, email_classifier)
+
+reply_pipeline = ReplyPipeline(email_store, email_reply_system_message, classify_email_batch)
 
-    return filtered
+# Review classifiers: model name -> the review field it predicts
+REVIEW_CLASSIFIER_LABELS = {"review_sentiment": "overall_sentiment", "review_category": "overall_sentimental_category"}
+local_review_classifiers: Dict[str, LinearTextClassifier] = {}
+# Training takes seconds; concurrent first callers wait for one training run
+_review_classifier_lock = threading.Lock()
+
+def review_classifier_text(review: dict) -> str:
+    return f"{review.get('overall_summary') or ''}\n{review.get('review_text') or ''}"
+
+def train_review_classifiers(data: ReviewData) -> Dict[str, LinearTextClassifier]:
+    """Models trained on an even sample of the labelled reviews"""
+    records = data.reviews.records
+    sample = records[::max(1, len(records) // CLASSIFIER_TRAINING_ROWS)]
+    texts = [review_classifier_text(review) for review in sample]
+    classifiers = {
+        name: LinearTextClassifier.train(texts, [review.get(field) for review in sample])
+        for name, field in REVIEW_CLASSIFIER_LABELS.items()
+    }
+    logger.info(f"Trained review classifiers on {len(sample)} reviews")
+    return classifiers
+
+def review_classifiers() -> Dict[str, LinearTextClassifier]:
+    """Trained on first use, once per snapshot generation; blocks, so call it off the event loop"""
+    with _review_classifier_lock:
+        if shared_snapshots:
+            return shared_snapshots.current().derive(
+                "review_classifiers",
+                lambda snapshot: train_review_classifiers(snapshot.derive("review_data", ReviewData.from_snapshot))
+            )
+        if not local_review_classifiers:
+            local_review_classifiers.update(train_review_classifiers(local_review_data))
+        return local_review_classifiers
+
+async def load_review_classifiers() -> Dict[str, LinearTextClassifier]:
+    """review_classifiers() in a worker thread, so training never stalls other requests"""
+    return await asyncio.to_thread(review_classifiers)
+
+def classify_reviews(reviews: List[dict], classifiers: Dict[str, LinearTextClassifier]) -> int:
+    """Fill in missing sentiment / category labels in place; returns how many reviews got one"""
+    classified = set()
+    with span("classify"):
+        for name, field in REVIEW_CLASSIFIER_LABELS.items():
+            missing = [review for review in reviews if not review.get(field)]
+            if not missing:
+                continue
+            for review, label in zip(missing, classifiers[name].predict(map(review_classifier_text, missing))):
+                review[field] = label
+                classified.add(id(review))
+    return len(classified)
+
+def email_data_version() -> tuple:
+    """Store version plus the current hour, since the windowed statistics move with time"""
+    return email_store.version, int(time.time() // 3600)
+
+def get_email_statistics() -> dict:
+    """Live inbox statistics; metrics not derivable from the emails keep their email-demo.json values"""
+    stats = dict(EMAIL_DATA.get('email_statistics', {}))
+    stats.update(email_store.statistics.snapshot())
+    return stats
+
+# Helper functions
+@span("aggregation")
+def filter_reviews(reviews: ReviewTable, platform=None, company=None, start_date=None, end_date=None, sentiment=None, category=None):
+    """Rows of the matching reviews; naive dates are taken as UTC"""
+    return reviews.select(
+        platform, company, sentiment,
+        start=parse_timestamp(start_date) if start_date else None,
+        end=parse_timestamp(end_date) if end_date else None,
+        category=category,
+    )
+
+@span("aggregation")
+def window_counts(reviews: ReviewTable, dimension: str, platform=None, company=None, start_date=None, end_date=None):
+    """Review counts per dimension value from the daily counters; naive dates are taken as UTC"""
+    return reviews.window_counts(
+        dimension, platform, company,
+        start=parse_timestamp(start_date) if start_date else None,
+        end=parse_timestamp(end_date) if end_date else None,
+    )
+
+@span("aggregation")
+def top_summaries(reviews: ReviewTable, sentiment: str, limit: int, platform=None, company=None, category=None,
+                  start_date=None, end_date=None):
+    """({summary: count}, {summary: error}) for the most frequent summary clusters, named by their first summary"""
+    summary = reviews.top_summaries(
+        sentiment, platform, company, category,
+        start=parse_timestamp(start_date) if start_date else None,
+        end=parse_timestamp(end_date) if end_date else None,
+    )
+    top = summary.top(limit)
+    labels = reviews.labels[SUMMARY_CLUSTER_COLUMN]
+    return {labels[code]: count for code, count, _ in top}, {labels[code]: error for code, _, error in top}
+
+def days_window(days: Optional[int]):
+    """(start, end) of the last `days` days up to now, or (None, None)"""
+    if not days:
+        return None, None
+    end_date = datetime.now(timezone.utc)
+    return end_date - timedelta(days=days), end_date
 
 def humanize_snake_case(value: str) -> str:
     return value.replace("_", " ").title()
@@ -70,19 +178,73 @@ def humanize_snake_case(value: str) -> str:
 class OverallReport(BaseModel):
     overall_sentiment: dict
     total_reviews: int
-    last_updated: datetime
+    # None when no matching review has a date
+    last_updated: Optional[datetime]
     sentiment_counts: Dict[str, int] = {}
 
 class TrendReport(BaseModel):
     trends: list
 
+class TopProsConsReport(BaseModel):
+    top_pros: dict
+    top_cons: dict
+    # Per summary: how much its count may overstate the true count
+    error_bounds: Dict[str, Dict[str, int]] = {}
+
+class ReviewIn(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    platform: str
+    company: str
+    time_period: Optional[datetime] = None
+    overall_sentiment: Optional[str] = None
+    overall_sentiment_detail: Optional[str] = None
+    overall_sentimental_category: Optional[str] = None
+    overall_summary: Optional[str] = None
+    category: Optional[str] = None
+    review_text: Optional[str] = None
+
+class ReviewIngestBatch(BaseModel):
+    reviews: List[ReviewIn]
+
+class ClassifyRequest(BaseModel):
+    texts: List[str] = Field(..., max_length=10000)
+    model: Literal["review_sentiment", "review_category", "email_sentiment"] = "review_sentiment"
+
+class EmailReadUpdate(BaseModel):
+    read: bool = True
+
+class EmailReplyUpdate(BaseModel):
+    ai_reply: Optional[str] = None
+
+class RawEmail(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: Optional[str] = None
+    sender: str = Field(alias="from")
+    from_name: str = ""
+    subject: str = ""
+    body: str = ""
+    timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Pre-labelled sentiment; must be a REPLY_PRIORITY label or "spam"
+    sentiment: Optional[Literal["angry", "urgent", "handover", "normal", "spam"]] = None
+
+    @field_validator("timestamp")
+    @classmethod
+    def utc_timestamp(cls, value: datetime) -> datetime:
+        """Naive timestamps are taken as UTC; the store and statistics compare aware datetimes"""
+        if value.tzinfo is None:
+            return value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc)
+
+class EmailIngestBatch(BaseModel):
+    emails: List[RawEmail]
+
 # Routes
 @sentiment_router.get("/companies")
+@http_cache(review_data_version, LONG_LIVED)
 async def get_available_companies():
-    companies = set()
-    for review in DEMO_DATA['sentimental_analysis']:
-        if review.get('company'):
-            companies.add(review['company'])
+    companies = review_data().reviews.labels["company"][1:]
 
     excluded = ["cook_and_pan"]
     valid_companies = [
@@ -94,70 +256,63 @@ async def get_available_companies():
     return {"companies": valid_companies}
 
 @sentiment_router.get("/report/overall_by_platform", response_model=OverallReport)
+@http_cache(review_data_version, LONG_LIVED)
+@trusted_response
 async def overall_by_platform(
     platform: str = Query(None),
     days: Optional[int] = Query(None),
     company: str = Query(None)
 ):
-    start_date = None
-    end_date = None
-    if days:
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
-        start_date = start_date.isoformat()
-        end_date = end_date.isoformat()
+    start_date, end_date = days_window(days)
 
-    reviews = filter_reviews(platform, company, start_date, end_date)
+    reviews = review_data().reviews
+    counts = window_counts(reviews, "sentiment", platform, company, start_date, end_date)
 
-    if not reviews:
+    if not counts:
         raise HTTPException(status_code=404, detail="No review data found")
 
-    total = len(reviews)
-    sentiment_counts = defaultdict(int)
-
-    for review in reviews:
-        sentiment = review.get('overall_sentiment')
-        if sentiment:
-            sentiment_counts[sentiment] += 1
+    total = sum(counts.values())
+    labels = reviews.labels["overall_sentiment"]
+    sentiment_counts = {
+        labels[code]: count
+        for (code,), count in counts.items() if code
+    }
 
     overall_sentiment = {
         sentiment: round((count / total) * 100, 2)
         for sentiment, count in sentiment_counts.items()
     }
 
-    last_updated = max(r['time_period'] for r in reviews if r.get('time_period'))
+    last_updated = reviews.latest(platform, company, start_date, end_date)
 
     return {
         "overall_sentiment": overall_sentiment,
         "total_reviews": total,
         "last_updated": last_updated,
-        "sentiment_counts": dict(sentiment_counts)
+        "sentiment_counts": sentiment_counts
     }
 
 @sentiment_router.get("/report/trends", response_model=TrendReport)
+@http_cache(review_data_version, LONG_LIVED)
+@trusted_response
 async def report_trends(
     platform: str = Query(None),
     days: Optional[int] = Query(None),
     company: str = Query(None)
 ):
-    start_date = None
-    end_date = None
-    if days:
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
-        start_date = start_date.isoformat()
-        end_date = end_date.isoformat()
+    start_date, end_date = days_window(days)
 
-    reviews = filter_reviews(platform, company, start_date, end_date)
+    reviews = review_data().reviews
+    rows = filter_reviews(reviews, platform, company, start_date, end_date)
+    months = reviews.labels[MONTH_COLUMN]
+    sentiments = reviews.labels["overall_sentiment"]
 
     monthly_data = defaultdict(lambda: {"positive": 0, "negative": 0, "neutral": 0})
 
-    for review in reviews:
-        if review.get('time_period') and review.get('overall_sentiment'):
-            month = review['time_period'].strftime("%Y-%m")
-            sentiment = review['overall_sentiment']
-            if sentiment in ['positive', 'negative', 'neutral']:
-                monthly_data[month][sentiment] += 1
+    for (month, sentiment), count in reviews.count(rows, MONTH_COLUMN, "overall_sentiment").items():
+        sentiment = sentiments[sentiment]
+        if month and sentiment in ['positive', 'negative', 'neutral']:
+            monthly_data[months[month]][sentiment] += count
 
     trends = [
         {"month": month, **counts}
@@ -167,53 +322,42 @@ async def report_trends(
     return {"trends": trends}
 
 @sentiment_router.get("/report/monthly_feedback")
+@http_cache(review_data_version, LONG_LIVED)
 async def monthly_feedback(
     platform: Optional[str] = None,
     days: Optional[int] = None,
-    company: Optional[str] = None
+    company: Optional[str] = None,
+    group_by: str = Query("category", pattern="^(category|summary)$", description="Rank sentimental categories or summary clusters")
 ):
-    start_date = None
-    end_date = None
-    if days:
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
-        start_date = start_date.isoformat()
-        end_date = end_date.isoformat()
-
-    reviews = filter_reviews(platform, company, start_date, end_date)
-
-    monthly_data = defaultdict(lambda: {"positive": [], "negative": []})
-
-    for review in reviews:
-        if not review.get('time_period'):
-            continue
-
-        month = review['time_period'].strftime("%Y-%m")
-        sentiment = review.get('overall_sentiment')
-        category = review.get('overall_sentimental_category', '')
-
-        if sentiment in ['positive', 'negative'] and category:
-            monthly_data[month][sentiment].append({
-                "category": humanize_snake_case(category),
-                "count": 1
-            })
+    start_date, end_date = days_window(days)
+
+    reviews = review_data().reviews
+    rows = filter_reviews(reviews, platform, company, start_date, end_date)
+    months = reviews.labels[MONTH_COLUMN]
+    sentiments = reviews.labels["overall_sentiment"]
+    if group_by == "summary":
+        column, name = SUMMARY_CLUSTER_COLUMN, reviews.labels[SUMMARY_CLUSTER_COLUMN].__getitem__
+    else:
+        labels = reviews.labels["overall_sentimental_category"]
+        column, name = "overall_sentimental_category", lambda code: humanize_snake_case(labels[code])
+
+    monthly_data = defaultdict(lambda: {"positive": defaultdict(int), "negative": defaultdict(int)})
+
+    counts = reviews.count(rows, MONTH_COLUMN, "overall_sentiment", column)
+    for (month, sentiment, group), count in counts.items():
+        sentiment = sentiments[sentiment]
+        if month and sentiment in ['positive', 'negative'] and group:
+            monthly_data[months[month]][sentiment][name(group)] += count
 
     output = []
     for month in sorted(monthly_data.keys()):
-        data = monthly_data[month]
-
-        pos_counts = defaultdict(int)
-        neg_counts = defaultdict(int)
-
-        for item in data['positive']:
-            pos_counts[item['category']] += 1
-        for item in data['negative']:
-            neg_counts[item['category']] += 1
+        pos_counts = monthly_data[month]['positive']
+        neg_counts = monthly_data[month]['negative']
 
-        top_pos = sorted([{"category": k, "count": v, "sentiment": "positive"}
+        top_pos = sorted([{group_by: k, "count": v, "sentiment": "positive"}
                          for k, v in pos_counts.items()],
                         key=lambda x: x['count'], reverse=True)[:3]
-        top_neg = sorted([{"category": k, "count": v, "sentiment": "negative"}
+        top_neg = sorted([{group_by: k, "count": v, "sentiment": "negative"}
                          for k, v in neg_counts.items()],
                         key=lambda x: x['count'], reverse=True)[:3]
 
@@ -226,6 +370,7 @@ async def monthly_feedback(
     return {"data": output}
 
 @sentiment_router.get("/reviews")
+@http_cache(review_data_version, LONG_LIVED)
 async def get_reviews(
     sentiment: str = Query(None),
     platform: str = Query(None),
@@ -233,19 +378,41 @@ async def get_reviews(
     limit: int = Query(20),
     company: str = Query(None)
 ):
-    reviews = filter_reviews(platform, company, sentiment=sentiment)
-
-    paginated = reviews[skip:skip+limit]
-
-    for review in paginated:
-        if isinstance(review.get('time_period'), datetime):
-            review['time_period'] = review['time_period'].isoformat()
-
-    return {"reviews": paginated}
+    reviews = review_data().reviews
+    rows = filter_reviews(reviews, platform, company, sentiment=sentiment)
+
+    return {"reviews": reviews.fragment(rows[skip:skip+limit])}
+
+@sentiment_router.post("/reviews/ingest")
+async def ingest_reviews(batch: ReviewIngestBatch):
+    """Add reviews, labelling any without a sentiment or category; the report endpoints count them straight away"""
+    if shared_snapshots:
+        raise HTTPException(status_code=409, detail="Review data is a shared snapshot here; add reviews to demo_data.json and reload the launcher")
+
+    reviews = review_data().reviews
+    payloads = [review.model_dump(exclude_none=True) for review in batch.reviews]
+    classified = classify_reviews(payloads, await load_review_classifiers())
+    for payload in payloads:
+        reviews.append(payload)
+    data_versions["reviews"] += 1
+
+    return {"ingested": len(payloads), "classified": classified, "total_reviews": len(reviews)}
+
+@sentiment_router.post("/classify")
+async def classify_texts(request: ClassifyRequest):
+    """Label texts with the local model trained on the labelled reviews or emails"""
+    if request.model == "email_sentiment":
+        labels = classify_email_batch([{"body": text} for text in request.texts])
+    else:
+        model = (await load_review_classifiers())[request.model]
+        with span("classify"):
+            labels = await asyncio.to_thread(model.predict, request.texts)
+    return {"model": request.model, "labels": labels}
 
 @sentiment_router.get("/report/available_months")
+@http_cache(review_data_version, LONG_LIVED)
 async def get_available_months(company: str = Query(...)):
-    reports = [r for r in DEMO_DATA['sentimental_monthly_reports']
+    reports = [r for r in review_data().monthly_reports
                if r.get('company') == company]
 
     available_months = []
@@ -265,27 +432,26 @@ async def get_available_months(company: str = Query(...)):
     return {"available_months": available_months[:12]}
 
 @sentiment_router.get("/report/monthly_analysis")
+@http_cache(review_data_version, LONG_LIVED)
 async def get_monthly_analysis(
     company: str = Query(...),
     year: int = Query(...),
     month: int = Query(...)
 ):
-    for report in DEMO_DATA['sentimental_monthly_reports']:
+    for report in review_data().monthly_reports:
         if (report.get('company') == company and
             isinstance(report['time_period'], datetime) and
             report['time_period'].year == year and
             report['time_period'].month == month):
 
-            result = dict(report)
-            if isinstance(result.get('time_period'), datetime):
-                result['time_period'] = result['time_period'].isoformat()
-            return result
+            return report
 
     raise HTTPException(status_code=404, detail=f"No data found for {company} in {year}-{month:02d}")
 
 @sentiment_router.get("/shopify_insights")
+@http_cache(review_data_version, LONG_LIVED)
 async def get_shopify_insights():
-    data = DEMO_DATA.get('shopify_insights_lifetime')
+    data = review_data().shopify_insights
     if not data:
         raise HTTPException(status_code=404, detail="Data not found")
 
@@ -298,6 +464,7 @@ async def get_shopify_insights():
     }
 
 @sentiment_router.get("/report/category_table")
+@http_cache(review_data_version, LONG_LIVED)
 async def category_table_pros_cons(
     platform: str = Query(None),
     sentiment: str = Query(None),
@@ -306,53 +473,115 @@ async def category_table_pros_cons(
     end_date: str = Query(None),
     company: str = Query(None)
 ):
-    reviews = filter_reviews(platform, company, start_date, end_date, sentiment)
+    reviews = review_data().reviews
+    sentiment_code = reviews.code("overall_sentiment", sentiment) if sentiment else None
+    if sentiment and sentiment_code is None:
+        return {"table": []}
 
     category_counts = defaultdict(int)
-    for review in reviews:
-        category = review.get('category')
-        if category:
-            category_counts[category] += 1
+    for (code, category), count in window_counts(reviews, "sentiment_category", platform, company, start_date, end_date).items():
+        if category and (sentiment_code is None or code == sentiment_code):
+            category_counts[category] += count
 
-    table = sorted([{"category": k, "count": v} for k, v in category_counts.items()],
-                   key=lambda x: x['count'], reverse=True)[:limit]
+    labels = reviews.labels["category"]
+    table = [{"category": labels[code], "count": count}
+             for code, count in sorted(category_counts.items(), key=lambda x: (-x[1], x[0]))[:limit]]
 
     return {"table": table}
 
+@sentiment_router.get("/report/top_pros_cons", response_model=TopProsConsReport)
+@http_cache(review_data_version, LONG_LIVED)
+@trusted_response
+async def top_pros_cons(
+    platform: str = Query(None),
+    start_date: str = Query(None),
+    end_date: str = Query(None),
+    company: str = Query(None)
+):
+    reviews = review_data().reviews
+    top_pros, pros_errors = top_summaries(reviews, "positive", 5, platform, company, None, start_date, end_date)
+    top_cons, cons_errors = top_summaries(reviews, "negative", 5, platform, company, None, start_date, end_date)
+
+    return {
+        "top_pros": top_pros,
+        "top_cons": top_cons,
+        "error_bounds": {"pros": pros_errors, "cons": cons_errors}
+    }
+
+@sentiment_router.get("/report/category_analysis")
+@http_cache(review_data_version, LONG_LIVED)
+async def get_category_analysis(category: str, company: str = Query(None)):
+    reviews = review_data().reviews
+    rows = filter_reviews(reviews, company=company, category=category)
+
+    if not rows:
+        return {
+            "category": category,
+            "sentiment_counts": {"positive": 0, "negative": 0, "neutral": 0},
+            "detail_counts": {},
+            "pros": [],
+            "cons": [],
+            "sentimental_categories": [],
+            "error_bounds": {"pros": {}, "cons": {}}
+        }
+
+    total = len(rows)
+    sentiments = reviews.labels["overall_sentiment"]
+    sentiment_counts = {"positive": 0, "negative": 0, "neutral": 0}
+    for code, count in reviews.count(rows, "overall_sentiment").items():
+        if sentiments[code] in sentiment_counts:
+            sentiment_counts[sentiments[code]] = round((count / total) * 100, 2)
+
+    details = reviews.labels["overall_sentiment_detail"]
+    detail_counts = {
+        details[code]: count
+        for code, count in sorted(reviews.count(rows, "overall_sentiment_detail").items()) if code
+    }
+
+    pros, pros_errors = top_summaries(reviews, "positive", 10, company=company, category=category)
+    cons, cons_errors = top_summaries(reviews, "negative", 10, company=company, category=category)
+
+    sentimental_categories = reviews.labels["overall_sentimental_category"]
+    return {
+        "category": category,
+        "sentiment_counts": sentiment_counts,
+        "detail_counts": detail_counts,
+        "pros": list(pros),
+        "cons": list(cons),
+        "sentimental_categories": [
+            sentimental_categories[code] for code in sorted(reviews.count(rows, "overall_sentimental_category")) if code
+        ],
+        "error_bounds": {"pros": pros_errors, "cons": cons_errors}
+    }
+
 @sentiment_router.get("/report/overall_detail")
+@http_cache(review_data_version, LONG_LIVED)
 async def overall_detail(
     platform: str = Query(None),
     days: Optional[int] = Query(None),
     company: str = Query(None)
 ):
-    start_date = None
-    end_date = None
-    if days:
-        end_date = datetime.utcnow()
-        start_date = end_date - timedelta(days=days)
-        start_date = start_date.isoformat()
-        end_date = end_date.isoformat()
+    start_date, end_date = days_window(days)
 
-    reviews = filter_reviews(platform, company, start_date, end_date)
+    reviews = review_data().reviews
+    counts = window_counts(reviews, "detail", platform, company, start_date, end_date)
 
-    if not reviews:
+    if not counts:
         raise HTTPException(status_code=404, detail="No review data found for sentiment detail")
 
-    total = len(reviews)
-    detail_counts = defaultdict(int)
-
-    for review in reviews:
-        detail = review.get('overall_sentiment_detail')
-        if detail:
-            detail_counts[detail] += 1
+    total = sum(counts.values())
+    labels = reviews.labels["overall_sentiment_detail"]
 
     detail_distribution = {}
-    for detail_name, count in detail_counts.items():
+    for (code,), count in sorted(counts.items()):
+        if not code:
+            continue
+        detail_name = labels[code]
         percentage = round((count / total) * 100, 2)
         if percentage >= 1.0:
             detail_distribution[detail_name] = {"count": count, "percentage": percentage}
 
-    last_updated = max(r['time_period'] for r in reviews if r.get('time_period'))
+    last_updated = reviews.latest(platform, company, start_date, end_date)
 
     return {
         "overall_sentiment_detail": detail_distribution,
@@ -361,19 +590,61 @@ async def overall_detail(
     }
 
 @sentiment_router.get("/emails")
-async def get_emails():
-    """Get all emails with AI replies"""
-    emails = EMAIL_DATA.get('emails', [])
-
-    # Convert datetime back to ISO string for JSON response
-    emails_response = []
-    for email in emails:
-        email_copy = dict(email)
-        if isinstance(email_copy.get('timestamp'), datetime):
-            email_copy['timestamp'] = email_copy['timestamp'].isoformat()
-        emails_response.append(email_copy)
+@http_cache(email_data_version, REVALIDATE)
+async def get_emails(
+    sentiment: Optional[str] = Query(None),
+    read: Optional[bool] = Query(None),
+    q: Optional[str] = Query(None, description="Search words in subject and body"),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """Get a page of emails with AI replies, newest first"""
+    try:
+        page = email_store.query(sentiment=sentiment, read=read, search=q, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     return {
-        "emails": emails_response,
-        "email_statistics": EMAIL_DATA.get('email_statistics', {})
+        "emails": page["emails"],
+        "total": page["total"],
+        "next_cursor": page["next_cursor"],
+        "email_statistics": get_email_statistics()
     }
+
+@sentiment_router.post("/emails/ingest")
+async def ingest_emails(batch: EmailIngestBatch):
+    """Store a batch of raw emails, classify them and queue AI replies (urgent/angry first)"""
+    return await reply_pipeline.ingest(
+        email.model_dump(by_alias=True, exclude_none=True) for email in batch.emails
+    )
+
+@sentiment_router.get("/emails/ingest/metrics")
+async def get_ingest_metrics():
+    """Queue depth per priority lane and per-stage throughput of the ingestion pipeline"""
+    return reply_pipeline.metrics()
+
+@sentiment_router.get("/emails/statistics")
+@http_cache(email_data_version, REVALIDATE)
+async def get_emails_statistics():
+    """Inbox statistics with last_24h and last_7d windows"""
+    return {"email_statistics": get_email_statistics()}
+
+@sentiment_router.post("/emails/{email_id}/read")
+async def mark_email_read(email_id: str, data: EmailReadUpdate = EmailReadUpdate()):
+    if not email_store.get(email_id):
+        raise HTTPException(status_code=404, detail=f"Email {email_id} not found")
+    email_store.update(email_id, read=data.read)
+    return {"success": True, "email_statistics": get_email_statistics()}
+
+@sentiment_router.post("/emails/{email_id}/reply")
+async def mark_email_replied(email_id: str, data: EmailReplyUpdate = EmailReplyUpdate()):
+    email = email_store.get(email_id)
+    if not email:
+        raise HTTPException(status_code=404, detail=f"Email {email_id} not found")
+    email_store.update(
+        email_id,
+        replied=True,
+        replied_at=datetime.now(timezone.utc),
+        ai_reply=data.ai_reply if data.ai_reply is not None else email.get('ai_reply')
+    )
+    return {"success": True, "email_statistics": get_email_statistics()}
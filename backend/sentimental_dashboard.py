@@ -1,6 +1,12 @@
 import os
+import abc
+import asyncio
 import datetime
 import logging
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
 from fastapi import FastAPI, HTTPException, Query, Body
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
@@ -8,8 +14,13 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import PyMongoError
 from dotenv import load_dotenv
 from bson.objectid import ObjectId
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta
+from backend.daily_counts import DAY_MICROS, FenwickTree
+from backend.heavy_hitters import SpaceSaving
+from backend.json_response import FastJSONResponse, FastJSONRoute, trusted_response
+from backend.review_data import series_keys, summary_keys, to_micros
+from backend.summary_clusters import SummaryClusters
 
 # Authentication imports - COMMENTED OUT FOR DIRECT ACCESS
 # from fastapi import FastAPI, HTTPException, status, Depends
@@ -30,10 +41,24 @@ MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 DB_NAME = os.getenv("DB_NAME", "ecommerce_sentiment")
 # For OpenAI, etc.
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "your_openai_api_key")
+# The in-process review indexes (pros/cons summaries, daily counters) are rebuilt from scratch
+# this often, to pick up edited or deleted reviews
+REVIEW_INDEX_REBUILD_SECONDS = float(os.getenv("REVIEW_INDEX_REBUILD_SECONDS", "3600"))
+
+# Dimensions with daily counters: name -> review fields whose values make up a value
+DAY_COUNTER_DIMENSIONS = {
+    "total": (),
+    "sentiment": ("overall_sentiment",),
+    "detail": ("overall_sentiment_detail",),
+    "category_sentiment": ("category", "overall_sentiment", "overall_sentimental_category"),
+    "detail_category": ("overall_sentiment_detail", "category", "overall_sentimental_category"),
+}
 # (Assuming you use OpenAI API key somewhere in your code)
 # openai.api_key = OPENAI_API_KEY
 
-app = FastAPI(title="Customer Feedback Dashboard Backend")
+app = FastAPI(title="Customer Feedback Dashboard Backend", default_response_class=FastJSONResponse)
+# Report responses are built in-process, so routes marked trusted_response skip re-validation
+app.router.route_class = FastJSONRoute
 
 # Enable CORS so frontend can access
 app.add_middleware(
@@ -57,7 +82,7 @@ users_collection = db["sentimental_dashboard_users"]
 class OverallReport(BaseModel):
     overall_sentiment: dict       # e.g. { "positive": 80.4, ... }
     total_reviews: int
-    last_updated: datetime
+    last_updated: Optional[datetime]  # None when the latest review has no time_period
     sentiment_counts: Dict[str, int] = {}
 
 class DetailedReport(BaseModel):
@@ -65,7 +90,7 @@ class DetailedReport(BaseModel):
     overall_sentiment_detail: dict
     overall_sentimental_category: dict
     total_reviews: int
-    last_updated: datetime
+    last_updated: Optional[datetime]  # None when the latest review has no time_period
 
 class TrendReport(BaseModel):
     trends: list  # List of dicts: { "month": "YYYY-MM", "positive": X, "negative": Y, "neutral": Z }
@@ -86,6 +111,8 @@ class ProsConsReport(BaseModel):
 class TopProsConsReport(BaseModel):
     top_pros: dict  # e.g., { "feature1": count, ... }
     top_cons: dict
+    # Per summary: how much its count may overstate the true count
+    error_bounds: Dict[str, Dict[str, int]] = {}
 
 class ChatMessage(BaseModel):
     session_id: str
@@ -136,6 +163,245 @@ def convert_object_ids(obj):
     else:
         return obj
 
+def days_window(days: Optional[int]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """(start, end) of the last `days` days up to now, naive UTC as stored, or (None, None)"""
+    if days is None:
+        return None, None
+    now = datetime.utcnow()
+    return now - timedelta(days=days), now
+
+class ReviewIndex(abc.ABC):
+    """A per-process index over reviews_collection, folded in _id order up to last_id"""
+
+    FIELDS: Dict[str, int] = {}
+
+    def __init__(self):
+        self.last_id = None
+
+    @abc.abstractmethod
+    def add(self, review: dict):
+        """Count one review"""
+
+    async def fold(self):
+        """Add the reviews inserted since last_id"""
+        query = {"_id": {"$gt": self.last_id}} if self.last_id is not None else {}
+        async for review in reviews_collection.find(query, self.FIELDS).sort("_id", 1):
+            self.add(review)
+            self.last_id = review["_id"]
+
+class FoldedReviews:
+    """
+    Keeps a ReviewIndex current without $group scans: each request first folds in the reviews
+    inserted since the last one. Edits and deletes show up once a rebuild, started in the
+    background every REVIEW_INDEX_REBUILD_SECONDS, catches up and is swapped in, so no request
+    waits for a full scan after the first.
+    """
+
+    def __init__(self, index_class):
+        self.index_class = index_class
+        self.index: ReviewIndex = index_class()
+        self.built_at = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._rebuild: Optional[asyncio.Task] = None
+
+    async def current(self) -> ReviewIndex:
+        """Current index with every inserted review folded in"""
+        if time.monotonic() - self.built_at > REVIEW_INDEX_REBUILD_SECONDS and self._rebuild is None:
+            self._rebuild = asyncio.create_task(self.rebuild())
+        async with self._lock:
+            await self.index.fold()
+            return self.index
+
+    async def rebuild(self):
+        try:
+            index = self.index_class()
+            await index.fold()
+            async with self._lock:
+                # Catch up on reviews inserted during the scan, then swap
+                await index.fold()
+                self.index = index
+                self.built_at = time.monotonic()
+        except PyMongoError as e:
+            logger.error(f"Rebuilding {self.index_class.__name__} failed: {e}")
+        finally:
+            self._rebuild = None
+
+class SummarySketches(ReviewIndex):
+    """
+    Space-Saving summaries of the most frequent overall_summary clusters per (company, platform,
+    category, sentiment), None standing for any, as the in-process report endpoints keep them
+    """
+
+    FIELDS = {"company": 1, "platform": 1, "category": 1, "overall_sentiment": 1, "overall_summary": 1}
+
+    def __init__(self):
+        super().__init__()
+        self.clusters = SummaryClusters()
+        self.sketches: Dict[tuple, SpaceSaving] = defaultdict(SpaceSaving)
+        # SummaryClusters groups clusters by sentiment code
+        self.sentiments: Dict[str, int] = {}
+
+    def cluster(self, review: dict) -> int:
+        sentiment = review.get("overall_sentiment")
+        group = self.sentiments.setdefault(sentiment, len(self.sentiments) + 1) if sentiment else 0
+        return self.clusters.assign(review.get("overall_summary"), group)
+
+    def add(self, review: dict):
+        cluster = self.cluster(review)
+        sentiment = review.get("overall_sentiment")
+        if cluster and sentiment:
+            # Missing company / platform / category are "" so they never read as "any"
+            codes = (review.get("company") or "", review.get("platform") or "", review.get("category") or "")
+            for key in summary_keys(*codes, sentiment):
+                self.sketches[key].add(cluster)
+
+summary_sketches = FoldedReviews(SummarySketches)
+
+async def top_summaries(sentiment: str, limit: int, platform: str = None, company: str = None,
+                        category: str = None, start_date: str = None, end_date: str = None) -> Tuple[dict, dict]:
+    """({summary: count}, {summary: error}) for the most frequent clusters, named by their first summary"""
+    # One index throughout: a rebuild swapped in meanwhile has its own cluster codes
+    index = await summary_sketches.current()
+    time_filter = build_time_filter(start_date, end_date)
+    if time_filter is None and not (platform and category):
+        summary = index.sketches.get((company, None if category else platform, category, sentiment)) or SpaceSaving()
+    else:
+        # Stream the matching reviews through a fresh summary of the same size
+        match = {**common_match(platform, start_date, end_date, company), "overall_sentiment": sentiment}
+        if category:
+            match["category"] = category
+        summary = SpaceSaving()
+        async for review in reviews_collection.find(match, index.FIELDS):
+            cluster = index.cluster(review)
+            if cluster:
+                summary.add(cluster)
+    top = summary.top(limit)
+    labels = index.clusters.labels
+    return {labels[code]: count for code, count, _ in top}, {labels[code]: error for code, _, error in top}
+
+def review_day(value: Any) -> Optional[int]:
+    """Days since the epoch of a stored time_period; None unless it is a date, as range queries see it"""
+    return to_micros(value) // DAY_MICROS if isinstance(value, datetime) else None
+
+def day_start(day: int) -> datetime:
+    return datetime(1970, 1, 1) + timedelta(days=day)
+
+class DayCounters(ReviewIndex):
+    """
+    Reviews per day for each (company, platform, DAY_COUNTER_DIMENSIONS value), with company and
+    platform also summed over (None), as Fenwick trees over one span of days that doubles when a
+    review falls outside it. A date range costs O(log D) per value whatever its length; only the
+    partial days at its two ends are counted from the collection.
+    """
+
+    FIELDS = {
+        "company": 1, "platform": 1, "time_period": 1, "overall_summary": 1,
+        **{field: 1 for fields in DAY_COUNTER_DIMENSIONS.values() for field in fields},
+    }
+
+    def __init__(self):
+        super().__init__()
+        self.first_day = 0
+        self.days = 0
+        self.series: Dict[tuple, FenwickTree] = {}
+        self.by_filter: Dict[tuple, List[Tuple[tuple, FenwickTree]]] = defaultdict(list)
+        self.undated: Dict[tuple, Counter] = defaultdict(Counter)
+        # (company, platform, "summary", (detail,)) -> (sorted days, first summary with that detail on each)
+        self.samples: Dict[tuple, Tuple[List[int], List[str]]] = {}
+
+    def _add_series(self, key: tuple, tree: array) -> FenwickTree:
+        series = self.series[key] = FenwickTree(tree)
+        self.by_filter[key[:3]].append((key[3], series))
+        return series
+
+    def _grow(self, day: int):
+        """Widen the span to take in day, at least doubling it"""
+        if not self.days:
+            first, days = day, 1
+        else:
+            first, end = min(self.first_day, day), max(self.first_day + self.days, day + 1)
+            days = max(end - first, 2 * self.days)
+            if day < self.first_day:
+                first = end - days
+        offset = self.first_day - first
+        old = self.series
+        self.series, self.by_filter = {}, defaultdict(list)
+        for key, tree in old.items():
+            counts = [0] * days
+            for slot in range(tree.size):
+                counts[offset + slot] = tree.range_sum(slot, slot + 1)
+            self._add_series(key, FenwickTree.build(counts))
+        self.first_day, self.days = first, days
+
+    def add(self, review: dict):
+        day = review_day(review.get("time_period"))
+        if day is not None and not 0 <= day - self.first_day < self.days:
+            self._grow(day)
+        # Missing company / platform are "" so they never read as "any"
+        company, platform = review.get("company") or "", review.get("platform") or ""
+        for name, fields in DAY_COUNTER_DIMENSIONS.items():
+            values = tuple(review.get(field) for field in fields)
+            for key in series_keys(company, platform, name, values):
+                if day is None:
+                    self.undated[key[:3]][values] += 1
+                    continue
+                series = self.series.get(key) or self._add_series(key, array('I', bytes(4 * (self.days + 1))))
+                series.add(day - self.first_day)
+
+        detail, summary = review.get("overall_sentiment_detail"), review.get("overall_summary")
+        if day is not None and detail and summary:
+            for key in series_keys(company, platform, "summary", (detail,)):
+                days, summaries = self.samples.setdefault(key, ([], []))
+                i = bisect_left(days, day)
+                if i == len(days) or days[i] != day:
+                    days.insert(i, day)
+                    summaries.insert(i, summary)
+
+    async def window_counts(self, dimensions: List[str], platform: str = None, company: str = None,
+                            start: Optional[datetime] = None, end: Optional[datetime] = None) -> Dict[str, Counter]:
+        """
+        Reviews per value of each dimension, matching company / platform with start <= time_period
+        <= end (naive UTC). Undated reviews count only when neither bound is given.
+        """
+        key = (company or None, platform or None)
+        counts = {name: Counter() for name in dimensions}
+        if start is None and end is None:
+            for name in dimensions:
+                for values, tree in self.by_filter.get((*key, name), []):
+                    counts[name][values] += tree.prefix(tree.size)
+                counts[name].update(self.undated.get((*key, name), {}))
+            return counts
+
+        start = start or day_start(self.first_day)
+        end = end or day_start(self.first_day + self.days)
+        start_day, end_day = review_day(start), review_day(end)
+        # Whole days strictly inside the range from the counters, the two edge days from the collection
+        for name in dimensions:
+            for values, tree in self.by_filter.get((*key, name), []):
+                counts[name][values] += tree.range_sum(start_day + 1 - self.first_day, end_day - self.first_day)
+        if start_day == end_day:
+            edges = [{"$gte": start, "$lte": end}]
+        else:
+            edges = [{"$gte": start, "$lt": day_start(start_day + 1)}, {"$gte": day_start(end_day), "$lte": end}]
+        match = {**common_match(platform, None, None, company), "$or": [{"time_period": edge} for edge in edges]}
+        async for review in reviews_collection.find(match, self.FIELDS):
+            for name in dimensions:
+                counts[name][tuple(review.get(field) for field in DAY_COUNTER_DIMENSIONS[name])] += 1
+        for name in dimensions:
+            counts[name] = +counts[name]
+        return counts
+
+    def sample_summary(self, detail: str, platform: str = None, company: str = None,
+                       start: Optional[datetime] = None, end: Optional[datetime] = None) -> str:
+        """A summary of a review with this detail, from the first day of the range that has one"""
+        days, summaries = self.samples.get((company or None, platform or None, "summary", (detail,)), ([], []))
+        i = bisect_left(days, review_day(start)) if start is not None else 0
+        if i < len(days) and (end is None or days[i] <= review_day(end)):
+            return summaries[i]
+        return ""
+
+day_counters = FoldedReviews(DayCounters)
+
 ############################################
 # Get Available Companies Endpoint
 ############################################
@@ -171,37 +437,28 @@ async def get_available_companies():
 # 1) Overall Sentiment Distribution Endpoint
 ############################################
 @app.get("/report/overall_by_platform", response_model=OverallReport)
+@trusted_response
 async def overall_by_platform(
     platform: str = Query(None),
     days: Optional[int] = Query(None),
     company: str = Query(None)
 ):
-    if days is not None:
-        now = datetime.utcnow()
-        start = now - timedelta(days=days)
-        start_str, end_str = start.isoformat(), now.isoformat()
-    else:
-        start_str, end_str = None, None
+    start, end = days_window(days)
+    base_match = common_match(platform, start and start.isoformat(), end and end.isoformat(), company)
 
-    base_match = common_match(platform, start_str, end_str, company)
-    
-    total = await reviews_collection.count_documents(base_match)
+    counters = await day_counters.current()
+    counts = await counters.window_counts(["total", "sentiment"], platform, company, start, end)
+    total = sum(counts["total"].values())
     if total == 0:
         raise HTTPException(status_code=404, detail="No review data found")
-    
-    pipeline = [
-        {"$match": {**base_match, "overall_sentiment": {"$ne": ""}}},
-        {"$group": {"_id": "$overall_sentiment", "count": {"$sum": 1}}}
-    ]
-    results = await reviews_collection.aggregate(pipeline).to_list(length=None)
-    
-    overall_sentiment = {
-        doc["_id"]: round((doc["count"] / total) * 100, 2)
-        for doc in results
-    }
+
     sentiment_counts = {
-        doc["_id"]: doc["count"]
-        for doc in results
+        sentiment: count
+        for (sentiment,), count in counts["sentiment"].items() if sentiment != ""
+    }
+    overall_sentiment = {
+        sentiment: round((count / total) * 100, 2)
+        for sentiment, count in sentiment_counts.items()
     }
     latest_doc = await reviews_collection.find_one(base_match, sort=[("time_period", -1)])
     last_updated = latest_doc.get("time_period", datetime.utcnow()) if latest_doc else datetime.utcnow()
@@ -217,13 +474,14 @@ async def overall_by_platform(
 # 2) Sentiment Trends Endpoint
 ############################################
 @app.get("/report/trends", response_model=TrendReport)
+@trusted_response
 async def report_trends(
     platform: str = Query(None),
     days: Optional[int] = Query(None),
     company: str = Query(None)
 ):
     try:
-        logger.info(f"Trends request for company: {company}, platform: {platform}")
+        logger.debug(f"Trends request for company: {company}, platform: {platform}")
         
         if days is not None:
             now = datetime.utcnow()
@@ -236,7 +494,7 @@ async def report_trends(
         match["overall_sentiment"] = {"$in": ["positive", "negative", "neutral"]}
         match["time_period"] = {"$ne": None, "$exists": True}
         
-        logger.info(f"MongoDB match query: {match}")
+        logger.debug(f"MongoDB match query: {match}")
         
         # Use actual time_period field for all companies (marielle_stokkelaar has valid dates!)
         projection = {
@@ -259,7 +517,7 @@ async def report_trends(
         ]
         
         results = await reviews_collection.aggregate(pipeline).to_list(length=None)
-        logger.info(f"Trends aggregation results count: {len(results)}")
+        logger.debug(f"Trends aggregation results count: {len(results)}")
         
         trends = []
         for doc in results:
@@ -269,8 +527,8 @@ async def report_trends(
                 data[item["sentiment"]] = item["count"]
             trends.append(data)
         
-        logger.info(f"Final trends data for {company}: {trends}")
-        return TrendReport(trends=trends)
+        logger.debug(f"Final trends data for {company}: {trends}")
+        return TrendReport.model_construct(trends=trends)
     except PyMongoError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -286,6 +544,7 @@ class MonthlyFeedbackResponse(BaseModel):
     data: List[MonthlyFeedbackItem]
 
 @app.get("/report/monthly_feedback", response_model=MonthlyFeedbackResponse)
+@trusted_response
 async def monthly_feedback(
     platform: Optional[str] = None,
     days: Optional[int] = None,
@@ -355,6 +614,7 @@ async def monthly_feedback(
 # 3) Negative Trends Endpoint
 ############################################
 @app.get("/report/negative_trends", response_model=NegativeTrendReport)
+@trusted_response
 async def negative_trends(
     platform: str = Query(None),
     start_date: str = Query(None),
@@ -372,7 +632,7 @@ async def negative_trends(
         ]
         results = await reviews_collection.aggregate(pipeline).to_list(length=None)
         trends = [{"month": doc["_id"], "negative": doc["negative_count"]} for doc in results]
-        return NegativeTrendReport(trends=trends)
+        return NegativeTrendReport.model_construct(trends=trends)
     except PyMongoError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -481,6 +741,7 @@ async def issue_details(
 # 6) Detailed Report Endpoint
 ############################################
 @app.get("/report/detailed", response_model=DetailedReport)
+@trusted_response
 async def detailed_report(
     platform: str = Query(None),
     start_date: str = Query(None),
@@ -519,7 +780,7 @@ async def detailed_report(
         category = {doc["_id"]: doc["count"] for doc in category_results}
         latest_doc = await reviews_collection.find_one(base_match, sort=[("time_period", -1)])
         last_updated = latest_doc.get("time_period", datetime.utcnow()) if latest_doc else datetime.utcnow()
-        return DetailedReport(
+        return DetailedReport.model_construct(
             overall_sentiment=overall,
             overall_sentiment_detail=detail,
             overall_sentimental_category=category,
@@ -533,6 +794,7 @@ async def detailed_report(
 # 7) Top Pros/Cons Endpoint
 ############################################
 @app.get("/report/top_pros_cons", response_model=TopProsConsReport)
+@trusted_response
 async def top_pros_cons(
     platform: str = Query(None),
     start_date: str = Query(None),
@@ -540,24 +802,13 @@ async def top_pros_cons(
     company: str = Query(None)
 ):
     try:
-        match = common_match(platform, start_date, end_date, company)
-        pos_pipeline = [
-            {"$match": {**match, "overall_sentiment": "positive", "overall_summary": {"$ne": ""}}},
-            {"$group": {"_id": "$overall_summary", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}},
-            {"$limit": 5}
-        ]
-        neg_pipeline = [
-            {"$match": {**match, "overall_sentiment": "negative", "overall_summary": {"$ne": ""}}},
-            {"$group": {"_id": "$overall_summary", "count": {"$sum": 1}}},
-            {"$sort": {"count": -1}},
-            {"$limit": 5}
-        ]
-        pos_results = await reviews_collection.aggregate(pos_pipeline).to_list(length=None)
-        neg_results = await reviews_collection.aggregate(neg_pipeline).to_list(length=None)
-        top_pros = {doc["_id"]: doc["count"] for doc in pos_results}
-        top_cons = {doc["_id"]: doc["count"] for doc in neg_results}
-        return TopProsConsReport(top_pros=top_pros, top_cons=top_cons)
+        top_pros, pros_errors = await top_summaries("positive", 5, platform, company, None, start_date, end_date)
+        top_cons, cons_errors = await top_summaries("negative", 5, platform, company, None, start_date, end_date)
+        return TopProsConsReport.model_construct(
+            top_pros=top_pros,
+            top_cons=top_cons,
+            error_bounds={"pros": pros_errors, "cons": cons_errors}
+        )
     except PyMongoError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -594,37 +845,29 @@ async def get_reviews(
 class OverallDetailReportModel(BaseModel):
     overall_sentiment_detail: Dict[str, Dict[str, float]]
     total_reviews: int
-    last_updated: datetime
+    last_updated: Optional[datetime]  # None when the latest review has no time_period
 
 @app.get("/report/overall_detail", response_model=OverallDetailReportModel)
+@trusted_response
 async def overall_detail(
     platform: str = Query(None),
     days: Optional[int] = Query(None),
     company: str = Query(None)
 ):
     now = datetime.utcnow()
-    if days is not None:
-        start = now - timedelta(days=days)
-        start_str, end_str = start.isoformat(), now.isoformat()
-    else:
-        start_str, end_str = None, None
+    start, end = days_window(days)
+    match = common_match(platform, start and start.isoformat(), end and end.isoformat(), company)
 
-    match = common_match(platform, start_str, end_str, company)
-    total = await reviews_collection.count_documents(match)
+    counters = await day_counters.current()
+    counts = await counters.window_counts(["total", "detail"], platform, company, start, end)
+    total = sum(counts["total"].values())
     if total == 0:
         raise HTTPException(status_code=404, detail="No review data found for sentiment detail")
 
-    pipeline = [
-        {"$match": match},
-        {"$group": {"_id": "$overall_sentiment_detail", "count": {"$sum": 1}}}
-    ]
-    results = await reviews_collection.aggregate(pipeline).to_list(length=None)
     detail_distribution = {}
-    for doc in results:
-        detail_name = doc["_id"]
+    for (detail_name,), count in counts["detail"].items():
         if not detail_name or (isinstance(detail_name, str) and detail_name.strip() == ""):
             continue
-        count = doc["count"]
         percentage = round((count / total) * 100, 2)
         if count == 0 or percentage < 1.0:
             continue
@@ -633,7 +876,7 @@ async def overall_detail(
     latest_doc = await reviews_collection.find_one(match, sort=[("time_period", -1)])
     last_updated = latest_doc.get("time_period", now) if latest_doc else now
 
-    return OverallDetailReportModel(
+    return OverallDetailReportModel.model_construct(
         overall_sentiment_detail=detail_distribution,
         total_reviews=total,
         last_updated=last_updated
@@ -648,31 +891,16 @@ async def category_sentiment_details(
     days: int = Query(60),
     company: str = Query(None)
 ):
-    now = datetime.utcnow()
-    start = now - timedelta(days=days)
-    
-    match_query = common_match(platform, start.isoformat(), now.isoformat(), company)
-    match_query["category"] = {"$ne": ""}
-    
-    pipeline = [
-        {"$match": match_query},
-        {"$group": {
-            "_id": {"category": "$category", "sentiment": "$overall_sentiment", "subcat": "$overall_sentimental_category"},
-            "count": {"$sum": 1}
-        }},
-        {"$sort": {"_id.category": 1}}
-    ]
-    
-    results = await reviews_collection.aggregate(pipeline).to_list(length=None)
-    
+    start, end = days_window(days)
+    counters = await day_counters.current()
+    counts = (await counters.window_counts(["category_sentiment"], platform, company, start, end))["category_sentiment"]
+
     data_map = {}
-    
-    for doc in results:
-        cat = doc["_id"]["category"]
-        sentiment = doc["_id"]["sentiment"]
-        subcat = doc["_id"]["subcat"]
-        count = doc["count"]
-        
+
+    # Categories in order, missing (None) first as MongoDB sorts it
+    for (cat, sentiment, subcat), count in sorted(counts.items(), key=lambda item: (item[0][0] is not None, str(item[0][0]))):
+        if cat == "":
+            continue
         if cat not in data_map:
             data_map[cat] = {
                 "category": cat,
@@ -708,13 +936,14 @@ class DetailCategoryReportModel(BaseModel):
     details: List[DetailCategoryItem]
 
 @app.get("/report/detail_categories", response_model=DetailCategoryReportModel)
+@trusted_response
 async def detail_categories(
     platform: str = Query(None),
     days: int = Query(30),
     company: str = Query(None)
 ):
     try:
-        logger.info(f"detail_categories called with platform={platform}, days={days}, company={company}")
+        logger.debug(f"detail_categories called with platform={platform}, days={days}, company={company}")
         
         now = datetime.utcnow()
         start = now - timedelta(days=days)
@@ -728,14 +957,14 @@ async def detail_categories(
         if company:
             match["company"] = company
         
-        logger.info(f"Querying pre-saved collection with match: {match}")
+        logger.debug(f"Querying pre-saved collection with match: {match}")
         
         # Try to access the pre-saved collection first
         pre_saved_collection = db["sentimental_emotion_analysis_detail"]
         
         try:
             results = await pre_saved_collection.find(match).to_list(length=None)
-            logger.info(f"Pre-saved collection returned {len(results)} results")
+            logger.debug(f"Pre-saved collection returned {len(results)} results")
         except Exception as collection_error:
             # If the collection doesn't exist or query fails, fall back to main collection
             logger.warning(f"Pre-saved collection error: {collection_error}")
@@ -745,46 +974,29 @@ async def detail_categories(
         if not results:
             logger.info("No results from pre-saved collection, trying fallback to main collection")
             # Fallback to main reviews collection
-            fallback_match = {
-                "time_period": {"$gte": start, "$lte": now},
-                "overall_sentiment_detail": {"$ne": "", "$exists": True}
-            }
-            if platform:
-                fallback_match["platform"] = platform
-            if company:
-                fallback_match["company"] = company
-            
-            logger.info(f"Fallback query match: {fallback_match}")
-            
-            # Get unique sentiment details from main collection
-            pipeline = [
-                {"$match": fallback_match},
-                {"$group": {
-                    "_id": "$overall_sentiment_detail",
-                    "categories": {"$addToSet": "$category"},
-                    "overall_sentimental_categories": {"$addToSet": "$overall_sentimental_category"},
-                    "sample_summary": {"$first": "$overall_summary"}
-                }},
-                {"$project": {
-                    "overall_sentiment_detail": "$_id",
-                    "categories": {"$filter": {"input": "$categories", "cond": {"$ne": ["$$this", ""]}}},
-                    "overall_sentimental_categories": {"$filter": {"input": "$overall_sentimental_categories", "cond": {"$ne": ["$$this", ""]}}},
-                    "summary": {"$ifNull": ["$sample_summary", ""]}
-                }}
-            ]
-            
+            # Sentiment details with the categories seen alongside them, from the daily counters
             try:
-                fallback_results = await reviews_collection.aggregate(pipeline).to_list(length=None)
-                logger.info(f"Fallback query returned {len(fallback_results)} results")
-                # Convert to expected format
-                results = []
-                for doc in fallback_results:
-                    results.append({
-                        "overall_sentiment_detail": doc["overall_sentiment_detail"],
-                        "categories": doc.get("categories", []),
-                        "overall_sentimental_categories": doc.get("overall_sentimental_categories", []),
-                        "summary": doc.get("summary", "")
-                    })
+                counters = await day_counters.current()
+                counts = (await counters.window_counts(["detail_category"], platform, company, start, now))["detail_category"]
+                grouped: Dict[str, Tuple[set, set]] = {}
+                for (detail, category, sentimental_category), count in counts.items():
+                    if not detail:
+                        continue
+                    categories, sentimental_categories = grouped.setdefault(detail, (set(), set()))
+                    if category:
+                        categories.add(category)
+                    if sentimental_category:
+                        sentimental_categories.add(sentimental_category)
+                logger.debug(f"Fallback counters returned {len(grouped)} results")
+                results = [
+                    {
+                        "overall_sentiment_detail": detail,
+                        "categories": sorted(categories),
+                        "overall_sentimental_categories": sorted(sentimental_categories),
+                        "summary": counters.sample_summary(detail, platform, company, start, now)
+                    }
+                    for detail, (categories, sentimental_categories) in grouped.items()
+                ]
             except Exception as fallback_error:
                 logger.error(f"Fallback query error: {fallback_error}")
                 results = []
@@ -803,13 +1015,13 @@ async def detail_categories(
         details = list(details_dict.values())
         details.sort(key=lambda x: x["overall_sentiment_detail"])
         
-        logger.info(f"Returning {len(details)} detail categories")
-        return DetailCategoryReportModel(details=details)
+        logger.debug(f"Returning {len(details)} detail categories")
+        return DetailCategoryReportModel.model_construct(details=details)
     
     except Exception as e:
         logger.error(f"Error in detail_categories endpoint: {str(e)}", exc_info=True)
         # Return empty response instead of 500 error
-        return DetailCategoryReportModel(details=[])
+        return DetailCategoryReportModel.model_construct(details=[])
 
 ############################################
 # 13) Category Analysis Endpoint
@@ -828,7 +1040,8 @@ async def get_category_analysis(category: str, company: str = Query(None)):
             "detail_counts": {},
             "pros": [],
             "cons": [],
-            "sentimental_categories": []
+            "sentimental_categories": [],
+            "error_bounds": {"pros": {}, "cons": {}}
         }
     
     pipeline_sentiment = [
@@ -851,27 +1064,8 @@ async def get_category_analysis(category: str, company: str = Query(None)):
         if doc["_id"]:
             detail_counts[doc["_id"]] = doc["count"]
     
-    pipeline_pros = [
-        {"$match": {**match_query, "overall_sentiment": "positive", "overall_summary": {"$ne": ""}}},
-        {"$group": {"_id": "$overall_summary", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}},
-        {"$limit": 10}
-    ]
-    pros_cursor = reviews_collection.aggregate(pipeline_pros)
-    pros = []
-    async for doc in pros_cursor:
-        pros.append(doc["_id"])
-    
-    pipeline_cons = [
-        {"$match": {**match_query, "overall_sentiment": "negative", "overall_summary": {"$ne": ""}}},
-        {"$group": {"_id": "$overall_summary", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}},
-        {"$limit": 10}
-    ]
-    cons_cursor = reviews_collection.aggregate(pipeline_cons)
-    cons = []
-    async for doc in cons_cursor:
-        cons.append(doc["_id"])
+    pros, pros_errors = await top_summaries("positive", 10, company=company, category=category)
+    cons, cons_errors = await top_summaries("negative", 10, company=company, category=category)
     
     pipeline_sentcats = [
         {"$match": match_query},
@@ -887,9 +1081,10 @@ async def get_category_analysis(category: str, company: str = Query(None)):
         "category": category,
         "sentiment_counts": sentiment_counts,
         "detail_counts": detail_counts,
-        "pros": pros,
-        "cons": cons,
-        "sentimental_categories": sentimental_categories
+        "pros": list(pros),
+        "cons": list(cons),
+        "sentimental_categories": sentimental_categories,
+        "error_bounds": {"pros": pros_errors, "cons": cons_errors}
     }
 
 ############################################
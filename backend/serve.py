@@ -0,0 +1,98 @@
+"""
+Production launcher: builds one shared, read-only snapshot of the review and connector data,
+then runs N uvicorn workers that map it instead of each loading its own copy. Run from the
+repository root:
+
+    python -m backend.serve --workers 4
+
+Send SIGUSR1 to the launcher to rebuild the snapshot from the data files; the new generation
+is renamed over the old one and workers switch to it within SNAPSHOT_CHECK_SECONDS. The email
+inbox is written to at runtime, so it is not part of the snapshot and each worker keeps its own.
+"""
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+from backend.data_sources import write_connector_sources
+from backend.review_data import read_demo_data, write_review_data
+from backend.shared_snapshot import SnapshotWriter, publish_snapshot
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# /dev/shm keeps the snapshot in memory on Linux even where /tmp is disk-backed
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR") or ("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir())
+
+
+def write_snapshot(writer: SnapshotWriter) -> None:
+    write_review_data(writer, read_demo_data())
+    write_connector_sources(writer)
+
+
+class SnapshotPublisher:
+    """Publishes numbered snapshot generations at one path"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    def publish(self) -> int:
+        with self._lock:
+            started = time.perf_counter()
+            publish_snapshot(self.path, write_snapshot, self.generation + 1)
+            self.generation += 1
+            size_mb = os.path.getsize(self.path) / 1e6
+            logger.info(f"Published data snapshot generation {self.generation} ({size_mb:.1f} MB, {time.perf_counter() - started:.1f}s)")
+            return self.generation
+
+    def reload(self):
+        """Rebuild in the background so the supervisor keeps watching its workers"""
+
+        def rebuild():
+            try:
+                self.publish()
+            except Exception as e:
+                logger.error(f"Snapshot rebuild failed, workers keep generation {self.generation}: {e}")
+
+        threading.Thread(target=rebuild, name="snapshot-reload", daemon=True).start()
+
+
+def main(args):
+    import uvicorn
+    from uvicorn.supervisors import Multiprocess
+
+    class SnapshotSupervisor(Multiprocess):
+        """uvicorn's worker supervisor; SIGUSR1 (which it already traps) republishes the snapshot"""
+
+        def handle_usr1(self):
+            publisher.reload()
+
+    path = os.path.join(args.snapshot_dir, f"saturnin-snapshot-{os.getpid()}.bin")
+    publisher = SnapshotPublisher(path)
+    publisher.publish()
+
+    # Inherited by the worker processes
+    os.environ["SHARED_SNAPSHOT_PATH"] = path
+    os.environ["HTTP_CACHE_BOOT_ID"] = uuid.uuid4().hex
+
+    config = uvicorn.Config("main:app", host=args.host, port=args.port, workers=args.workers)
+    server = uvicorn.Server(config)
+    logger.info(f"Starting {args.workers} workers; reload data with: kill -USR1 {os.getpid()}")
+    try:
+        SnapshotSupervisor(config, target=server.run, sockets=[config.bind_socket()]).run()
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the API with N workers sharing one data snapshot")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    parser.add_argument("--snapshot-dir", default=SNAPSHOT_DIR)
+    main(parser.parse_args())
@@ -0,0 +1,230 @@
+"""
+Read-only snapshot file shared by the worker processes of the production launcher (backend/serve.py).
+
+Layout: MAGIC, the offset of a JSON header (uint64), then 8-byte aligned sections. The header holds
+the generation, per-section offsets and any metadata the writers add. Sections are JSON documents,
+record tables (a JSON array plus an offsets array) and typed arrays in native byte order. Workers
+map the file read-only and decode through memoryviews, so its pages sit in the page cache once
+however many workers are running. A new generation is written next to the file and renamed over
+it; workers keep reading their mapping until they notice the new file.
+"""
+import io
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import time
+from array import array
+from collections.abc import Sequence
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import orjson
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAGIC = b"SATSNAP1"
+SECTION_ALIGNMENT = 8
+
+# Set by the production launcher for its workers; unset in single-process mode
+SHARED_SNAPSHOT_PATH = os.getenv("SHARED_SNAPSHOT_PATH")
+
+# How often a worker checks whether the snapshot file was replaced
+SNAPSHOT_CHECK_SECONDS = float(os.getenv("SNAPSHOT_CHECK_SECONDS", "1"))
+
+
+def encode_json(value: Any) -> bytes:
+    """Encoding used for stored JSON; matches FastJSONResponse so records can be sent as they are"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+
+class SnapshotWriter:
+    """Streams sections into a seekable binary file; finish() writes the header"""
+
+    def __init__(self, f, generation: int):
+        self._f = f
+        self._sections: Dict[str, Tuple[int, int]] = {}
+        self.meta: Dict[str, Any] = {"generation": generation, "created_at": time.time()}
+        f.write(MAGIC + bytes(8))
+
+    def _align(self):
+        padding = -self._f.tell() % SECTION_ALIGNMENT
+        if padding:
+            self._f.write(bytes(padding))
+
+    def add(self, name: str, data) -> None:
+        """Raw bytes or an array"""
+        self._align()
+        offset = self._f.tell()
+        self._f.write(data)
+        self._sections[name] = (offset, self._f.tell() - offset)
+
+    def add_document(self, name: str, value: Any) -> None:
+        self.add(f"document:{name}", encode_json(value))
+
+    def add_records(self, name: str, records: Iterable[Any], encode: Callable[[Any], bytes] = encode_json) -> int:
+        """Write records as one JSON array and the start offset of each; returns the record count"""
+        self._align()
+        start = self._f.tell()
+        offsets = array('Q')
+        self._f.write(b"[")
+        for record in records:
+            if offsets:
+                self._f.write(b",")
+            offsets.append(self._f.tell() - start)
+            self._f.write(encode(record))
+        self._f.write(b"]")
+        offsets.append(self._f.tell() - start)
+        self._sections[f"records:{name}"] = (start, offsets[-1])
+        self.add(f"offsets:{name}", offsets)
+        return len(offsets) - 1
+
+    def finish(self) -> None:
+        self._align()
+        header_offset = self._f.tell()
+        self._f.write(orjson.dumps({**self.meta, "sections": self._sections}))
+        self._f.seek(len(MAGIC))
+        self._f.write(struct.pack("<Q", header_offset))
+        self._f.seek(0, io.SEEK_END)
+        self._f.flush()
+
+
+class SharedRecords(Sequence):
+    """Read-only sequence over a record table; each access decodes one record"""
+
+    def __init__(self, blob: memoryview, offsets: memoryview, decode: Optional[Callable[[Any], Any]] = None):
+        self._blob = blob
+        self._offsets = offsets
+        self._decode = decode
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def raw(self, index: int) -> memoryview:
+        """Encoded bytes of one record"""
+        return self._blob[self._offsets[index]:self._offsets[index + 1] - 1]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self[i] for i in range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        value = orjson.loads(self.raw(index))
+        return self._decode(value) if self._decode else value
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __add__(self, other):
+        return tuple(self) + tuple(other)
+
+    def __radd__(self, other):
+        return tuple(other) + tuple(self)
+
+    def fragment(self, indices: Optional[Iterable[int]] = None) -> orjson.Fragment:
+        """JSON array of the given records (all by default) without decoding them"""
+        if indices is None:
+            return orjson.Fragment(bytes(self._blob))
+        return orjson.Fragment(b"[" + b",".join(self.raw(i) for i in indices) + b"]")
+
+
+class SharedSnapshot:
+    """One snapshot generation, over a mapped file or an in-memory buffer"""
+
+    def __init__(self, buffer, identity: Optional[tuple] = None):
+        view = memoryview(buffer)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError("Not a data snapshot")
+        (header_offset,) = struct.unpack_from("<Q", view, len(MAGIC))
+        self.meta: Dict[str, Any] = orjson.loads(view[header_offset:])
+        self.generation: int = self.meta["generation"]
+        self.identity = identity
+        self._view = view
+        self._sections = self.meta["sections"]
+        self._derived: Dict[str, Any] = {}
+
+    @classmethod
+    def open(cls, path: str) -> "SharedSnapshot":
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapped, identity=(stat.st_dev, stat.st_ino))
+
+    @classmethod
+    def in_memory(cls, write: Callable[[SnapshotWriter], None], generation: int = 1) -> "SharedSnapshot":
+        """Build a private snapshot (single-process mode)"""
+        buffer = io.BytesIO()
+        writer = SnapshotWriter(buffer, generation)
+        write(writer)
+        writer.finish()
+        return cls(buffer.getbuffer())
+
+    def has(self, name: str) -> bool:
+        return name in self._sections
+
+    def section(self, name: str) -> memoryview:
+        offset, length = self._sections[name]
+        return self._view[offset:offset + length]
+
+    def array(self, name: str, typecode: str) -> memoryview:
+        return self.section(name).cast(typecode)
+
+    def document(self, name: str) -> Any:
+        return orjson.loads(self.section(f"document:{name}"))
+
+    def records(self, name: str, decode: Optional[Callable[[Any], Any]] = None) -> SharedRecords:
+        return SharedRecords(self.section(f"records:{name}"), self.array(f"offsets:{name}", 'Q'), decode)
+
+    def derive(self, key: str, builder: Callable[["SharedSnapshot"], Any]) -> Any:
+        """Build a per-process value from this generation once"""
+        if key not in self._derived:
+            self._derived[key] = builder(self)
+        return self._derived[key]
+
+
+class SharedSnapshotFile:
+    """Follows the snapshot at a path, switching to a new generation once it is renamed over it"""
+
+    def __init__(self, path: str, check_interval: float = SNAPSHOT_CHECK_SECONDS):
+        self.path = path
+        self.check_interval = check_interval
+        self._current: Optional[SharedSnapshot] = None
+        self._checked = 0.0
+
+    def current(self) -> SharedSnapshot:
+        now = time.monotonic()
+        if self._current is not None and now - self._checked < self.check_interval:
+            return self._current
+        self._checked = now
+        try:
+            stat = os.stat(self.path)
+            if self._current is None or self._current.identity != (stat.st_dev, stat.st_ino):
+                self._current = SharedSnapshot.open(self.path)
+                logger.info(f"Using data snapshot generation {self._current.generation}")
+        except (OSError, ValueError) as e:
+            if self._current is None:
+                raise
+            logger.error(f"Keeping snapshot generation {self._current.generation}: {e}")
+        return self._current
+
+
+def publish_snapshot(path: str, write: Callable[[SnapshotWriter], None], generation: int) -> None:
+    """Write a snapshot next to path and rename it over path, so readers see old or new, never partial"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temporary = tempfile.mkstemp(prefix=".snapshot-", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            writer = SnapshotWriter(f, generation)
+            write(writer)
+            writer.finish()
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+shared_snapshots = SharedSnapshotFile(SHARED_SNAPSHOT_PATH) if SHARED_SNAPSHOT_PATH else None
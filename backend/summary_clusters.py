@@ -0,0 +1,126 @@
+import hashlib
+import os
+import random
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+# MinHash signature length, split into LSH bands of SUMMARY_LSH_ROWS hashes
+SUMMARY_MINHASH_SIZE = 64
+SUMMARY_LSH_ROWS = 4
+
+# Jaccard similarity of word sets at which a summary joins a cluster; LSH finds the candidates,
+# the exact similarity of their word sets decides
+SUMMARY_CLUSTER_THRESHOLD = float(os.getenv("SUMMARY_CLUSTER_THRESHOLD", "0.6"))
+
+MERSENNE_PRIME = (1 << 61) - 1
+
+STOP_WORDS = frozenset(
+    "a an the and or but so of to in on at for with from by as is are was were be been it its this that "
+    "my our your i we you they he she very really too just".split()
+)
+
+# Negations are kept as one token, NEGATION, and a negated summary never joins a plain one:
+# "Not worth the price" and "Worth the price" overlap in every other word
+NEGATION = "not"
+NEGATORS = frozenset("no not never nor cannot".split())
+
+# Fixed seed: workers and snapshot generations must agree on every signature
+_rng = random.Random(20240601)
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(MERSENNE_PRIME)) for _ in range(SUMMARY_MINHASH_SIZE)]
+
+
+def stem(word: str) -> str:
+    """Crude suffix stripping so shipping / shipped and delay / delays share a token"""
+    for suffix in ("ing", "ed", "ly", "es", "s"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def summary_word(word: str) -> str:
+    """NEGATION for negators and n't contractions; other contractions lose their suffix (it's -> it)"""
+    if word in NEGATORS or word.endswith("n't"):
+        return NEGATION
+    return word.split("'", 1)[0]
+
+
+def summary_tokens(text: str) -> FrozenSet[str]:
+    words = [summary_word(word) for word in re.findall(r"[a-z0-9]+(?:'[a-z]+)?", text.lower().replace("\u2019", "'"))]
+    tokens = frozenset(stem(word) for word in words if word not in STOP_WORDS)
+    return tokens or frozenset(words) or frozenset([text])
+
+
+@lru_cache(maxsize=65536)
+def token_hash(token: str) -> int:
+    return int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), 'little')
+
+
+def minhash(tokens: FrozenSet[str]) -> Tuple[int, ...]:
+    hashes = [token_hash(token) for token in tokens]
+    return tuple(min((a * h + b) % MERSENNE_PRIME for h in hashes) for a, b in PERMUTATIONS)
+
+
+def jaccard(left: FrozenSet[str], right: FrozenSet[str]) -> float:
+    return len(left & right) / len(left | right)
+
+
+class SummaryClusters:
+    """
+    Assigns near-duplicate summaries ("Fast shipping", "Shipping was fast") one cluster code
+    using MinHash signatures and LSH buckets. Clusters belong to a group (the review sentiment)
+    and only summaries of the same group, negated or not alike, share one. A cluster is labelled
+    and matched by its first summary, so rebuilding from the labels and groups reproduces every
+    later assignment.
+    """
+
+    def __init__(self, labels: Optional[List[Optional[str]]] = None, groups: Optional[List[Optional[int]]] = None,
+                 threshold: float = SUMMARY_CLUSTER_THRESHOLD):
+        # Code -> first summary and its group; code 0 is "no summary"
+        self.labels: List[Optional[str]] = labels if labels is not None else [None]
+        self.groups: List[Optional[int]] = groups if groups is not None else [None]
+        self.threshold = threshold
+        self._tokens: List[FrozenSet[str]] = [frozenset()]
+        self._buckets: Dict[tuple, List[int]] = {}
+        self._assigned: Dict[Tuple[int, str], int] = {}
+        for code in range(1, len(self.labels)):
+            self._index(code, summary_tokens(self.labels[code]))
+
+    def __len__(self) -> int:
+        return len(self.labels) - 1
+
+    def _bands(self, group: int, tokens: FrozenSet[str]):
+        """LSH buckets of a summary; the group and negation are part of the key"""
+        signature = minhash(tokens)
+        for start in range(0, len(signature), SUMMARY_LSH_ROWS):
+            yield (group, NEGATION in tokens, start, signature[start:start + SUMMARY_LSH_ROWS])
+
+    def _index(self, code: int, tokens: FrozenSet[str]):
+        self._tokens.append(tokens)
+        self._assigned[(self.groups[code], self.labels[code])] = code
+        for band in self._bands(self.groups[code], tokens):
+            self._buckets.setdefault(band, []).append(code)
+
+    def assign(self, text: Optional[str], group: int = 0) -> int:
+        """Cluster code for a summary in a group, opening a new cluster if none is similar enough"""
+        if not text:
+            return 0
+        code = self._assigned.get((group, text))
+        if code is not None:
+            return code
+
+        tokens = summary_tokens(text)
+        best, best_similarity = 0, self.threshold
+        candidates = {code for band in self._bands(group, tokens) for code in self._buckets.get(band, ())}
+        for candidate in sorted(candidates):
+            score = jaccard(tokens, self._tokens[candidate])
+            if score >= best_similarity and (not best or score > best_similarity):
+                best, best_similarity = candidate, score
+        if best:
+            self._assigned[(group, text)] = best
+            return best
+
+        self.labels.append(text)
+        self.groups.append(group)
+        self._index(len(self.labels) - 1, tokens)
+        return len(self.labels) - 1
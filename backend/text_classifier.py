@@ -0,0 +1,115 @@
+import os
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+CLASSIFIER_EPOCHS = int(os.getenv("CLASSIFIER_EPOCHS", "5"))
+# Labelled examples sampled (evenly) to train a model
+CLASSIFIER_TRAINING_ROWS = int(os.getenv("CLASSIFIER_TRAINING_ROWS", "20000"))
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9_']+")
+
+# Feature every text has, which acts as the per-label bias
+BIAS_FEATURE = -1
+
+
+class HashedNgrams:
+    """
+    Text -> hashed word unigrams (CRC-32, stable across processes) and bigrams (hash of the
+    pair of word hashes), with a bounded cache of word hashes
+    """
+
+    def __init__(self, cache_size: int = 1 << 18):
+        self.cache_size = cache_size
+        self._words: Dict[str, int] = {}
+
+    def word_hash(self, word: str) -> int:
+        words = self._words
+        value = words.get(word)
+        if value is None:
+            if len(words) >= self.cache_size:
+                words.clear()
+            value = words[word] = zlib.crc32(word.encode())
+        return value
+
+    def __call__(self, text: str) -> List[int]:
+        words = TOKEN_PATTERN.findall(text.lower())
+        hashes = list(map(self._words.get, words))
+        if None in hashes:
+            hashes = [h if h is not None else self.word_hash(word) for h, word in zip(hashes, words)]
+        features = [BIAS_FEATURE]
+        features += hashes
+        features += map(hash, zip(hashes, hashes[1:]))
+        return features
+
+
+class LinearTextClassifier:
+    """
+    Multi-class linear model over hashed n-grams, trained as an averaged perceptron. Only buckets
+    seen in training hold weights, so memory follows the training vocabulary, not the hash space.
+    """
+
+    def __init__(self, labels: Sequence[str], weights: Dict[int, Tuple[float, ...]], features: Optional[HashedNgrams] = None):
+        self.labels = list(labels)
+        self.weights = weights
+        self.features = features or HashedNgrams()
+        self._zero = (0.0,) * len(self.labels)
+
+    @classmethod
+    def train(cls, texts: Iterable[str], labels: Iterable[str], epochs: int = CLASSIFIER_EPOCHS,
+              features: Optional[HashedNgrams] = None) -> "LinearTextClassifier":
+        features = features or HashedNgrams()
+        examples = [(features(text), label) for text, label in zip(texts, labels) if label]
+        names = sorted({label for _, label in examples})
+        index = {label: i for i, label in enumerate(names)}
+        examples = [(buckets, index[label]) for buckets, label in examples]
+
+        size = len(names)
+        weights: Dict[int, List[float]] = defaultdict(lambda: [0.0] * size)
+        # Running sum of step * update, so the average weight is weights - totals / steps
+        totals: Dict[int, List[float]] = defaultdict(lambda: [0.0] * size)
+        step = 1
+        for epoch in range(epochs):
+            # Deterministic interleaving instead of shuffling: every epoch visits in a different order
+            for position in range(len(examples)):
+                buckets, truth = examples[(position * 7919 + epoch * 104729) % len(examples)]
+                scores = [0.0] * size
+                for bucket in buckets:
+                    row = weights.get(bucket)
+                    if row is not None:
+                        for i in range(size):
+                            scores[i] += row[i]
+                guess = max(range(size), key=scores.__getitem__)
+                if guess != truth:
+                    for bucket in buckets:
+                        weights[bucket][truth] += 1.0
+                        weights[bucket][guess] -= 1.0
+                        totals[bucket][truth] += step
+                        totals[bucket][guess] -= step
+                step += 1
+
+        averaged = {
+            bucket: tuple(w - t / step for w, t in zip(row, totals[bucket]))
+            for bucket, row in weights.items()
+        }
+        return cls(names, {bucket: row for bucket, row in averaged.items() if any(row)}, features)
+
+    def scores(self, text: str) -> List[float]:
+        weights, zero = self.weights, self._zero
+        return [sum(column) for column in zip(*[weights.get(bucket, zero) for bucket in self.features(text)])]
+
+    def predict(self, texts: Iterable[str]) -> List[str]:
+        """Label per text (None from a model trained on nothing); the batch shares one feature cache"""
+        weights, labels, featurize = self.weights, self.labels, self.features
+        if not labels:
+            return [None for _ in texts]
+        if len(labels) == 1:
+            return [labels[0] for _ in texts]
+        get = weights.get
+        predictions = []
+        for text in texts:
+            rows = list(filter(None, map(get, featurize(text))))
+            scores = list(map(sum, zip(*rows))) if rows else self._zero
+            predictions.append(labels[scores.index(max(scores))])
+        return predictions
@@ -0,0 +1,144 @@
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from backend.customer_identity import ALL_CHANNELS
+from backend.daily_counts import DAY_MICROS
+from backend.data_sources import DataSnapshot
+from backend.order_store import ORDER_CHANNELS, OrderStore, get_order_store
+from backend.review_data import MISSING_TIME, to_micros
+
+# Most points a trend response carries; longer series are downsampled with LTTB
+TREND_MAX_POINTS = int(os.getenv("TREND_MAX_POINTS", "300"))
+
+HOUR_MICROS = 3600 * 1_000_000
+GRANULARITIES = ("hour", "day", "month")
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def bucket_of(micros: int, granularity: str) -> int:
+    """Hours, days or months since the epoch (UTC)"""
+    if granularity == "hour":
+        return micros // HOUR_MICROS
+    day = micros // DAY_MICROS
+    if granularity == "day":
+        return day
+    moment = date.fromordinal(EPOCH_ORDINAL + day)
+    return (moment.year - 1970) * 12 + moment.month - 1
+
+
+def bucket_label(bucket: int, granularity: str) -> str:
+    if granularity == "month":
+        return f"{1970 + bucket // 12:04d}-{bucket % 12 + 1:02d}"
+    if granularity == "day":
+        return date.fromordinal(EPOCH_ORDINAL + bucket).isoformat()
+    return (datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(hours=bucket)).isoformat()
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """
+    Largest-Triangle-Three-Buckets (Steinarsson, 2013): indexes of `threshold` points that keep
+    the visual shape of the series. The first and last points are always kept; every other
+    bucket keeps the point forming the largest triangle with the previously kept point and the
+    average of the next bucket.
+    """
+    size = len(xs)
+    if threshold >= size or threshold < 3:
+        return list(range(size))
+
+    every = (size - 2) / (threshold - 2)
+    selected = [0]
+    previous = 0
+    for bucket in range(threshold - 2):
+        start = int(bucket * every) + 1
+        end = int((bucket + 1) * every) + 1
+        next_end = min(int((bucket + 2) * every) + 1, size)
+        if next_end <= end:
+            avg_x, avg_y = xs[size - 1], ys[size - 1]
+        else:
+            avg_x = sum(xs[end:next_end]) / (next_end - end)
+            avg_y = sum(ys[end:next_end]) / (next_end - end)
+
+        px, py = xs[previous], ys[previous]
+        chosen, largest = start, -1.0
+        for index in range(start, end):
+            area = abs((px - avg_x) * (ys[index] - py) - (px - xs[index]) * (avg_y - py))
+            if area > largest:
+                chosen, largest = index, area
+        selected.append(chosen)
+        previous = chosen
+    selected.append(size - 1)
+    return selected
+
+
+class OrderTrends:
+    """
+    Revenue and order counts per hour, day and month for each channel and all channels together.
+    Buckets are filled one order at a time, so new orders can be added without a rebuild.
+    """
+
+    def __init__(self):
+        # (channel, granularity) -> bucket -> [revenue, orders]
+        self.buckets: Dict[Tuple[str, str], Dict[int, List[float]]] = {
+            (channel, granularity): {}
+            for channel in ORDER_CHANNELS + (ALL_CHANNELS,)
+            for granularity in GRANULARITIES
+        }
+
+    @classmethod
+    def from_store(cls, store: OrderStore) -> "OrderTrends":
+        trends = cls()
+        for channel, micros, total in zip(store.channels, store.times, store.totals):
+            if micros != MISSING_TIME:
+                trends.add(ORDER_CHANNELS[channel], micros, total)
+        return trends
+
+    def add(self, channel: str, micros: int, revenue: float) -> None:
+        buckets = {granularity: bucket_of(micros, granularity) for granularity in GRANULARITIES}
+        for name in (channel, ALL_CHANNELS):
+            for granularity, bucket in buckets.items():
+                series = self.buckets[(name, granularity)]
+                totals = series.get(bucket)
+                if totals is None:
+                    series[bucket] = [revenue, 1]
+                else:
+                    totals[0] += revenue
+                    totals[1] += 1
+
+    def series(self, granularity: str, channel: str = ALL_CHANNELS, start: Optional[datetime] = None,
+               end: Optional[datetime] = None) -> Tuple[List[int], List[float], List[int]]:
+        """Every bucket between start and end, clipped to the first and last order; empty ones as zeros"""
+        filled = self.buckets.get((channel, granularity), {})
+        if not filled:
+            return [], [], []
+        first, last = min(filled), max(filled)
+        if start is not None:
+            first = max(first, bucket_of(to_micros(start), granularity))
+        if end is not None:
+            last = min(last, bucket_of(to_micros(end), granularity))
+        periods = list(range(first, last + 1))
+        empty = (0.0, 0)
+        values = [filled.get(period, empty) for period in periods]
+        return periods, [value[0] for value in values], [value[1] for value in values]
+
+    def points(self, granularity: str, channel: str = ALL_CHANNELS, start: Optional[datetime] = None,
+               end: Optional[datetime] = None, max_points: int = TREND_MAX_POINTS, metric: str = "revenue") -> dict:
+        """Chart-ready series, downsampled with LTTB on `metric` when longer than max_points"""
+        periods, revenue, orders = self.series(granularity, channel, start, end)
+        selected = lttb(periods, revenue if metric == "revenue" else orders, max_points)
+        return {
+            "granularity": granularity,
+            "channel": channel,
+            "buckets": len(periods),
+            "downsampled": len(selected) < len(periods),
+            "points": [
+                {"period": bucket_label(periods[i], granularity), "revenue": round(revenue[i], 2), "orders": orders[i]}
+                for i in selected
+            ],
+        }
+
+
+def get_order_trends(snapshot: DataSnapshot) -> OrderTrends:
+    """Trends built once per snapshot version"""
+    return snapshot.derive("order_trends", lambda s: OrderTrends.from_store(get_order_store(s)))
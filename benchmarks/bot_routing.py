@@ -0,0 +1,208 @@
+"""
+Throughput of /bot/chat routing: the compiled engine against the previous
+implementation (keyword scans plus JSON file reloads inside each branch).
+Calls the handlers directly so HTTP overhead does not hide the difference.
+Run from the repository root:
+
+    python -m benchmarks.bot_routing --iterations 20000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+from backend.bot_routes import ChatMessage, bot_config, chat_with_bot
+from benchmarks.common import format_row, summarize_latencies
+
+logger = logging.getLogger(__name__)
+
+MESSAGES = [
+    "Hi, can you check order ORD-2024-002 for me?",
+    "Where is my package DHL-2024-TRK-001",
+    "Do you have any wireless headphones in stock?",
+    "What is the price of the office chair?",
+    "I want to track my delivery",
+    "Hello, what are your business hours?",
+]
+
+
+# Previous implementation, kept verbatim for comparison
+def load_products():
+    with open('product.json', 'r') as f:
+        return json.load(f)
+
+def load_shopify_orders():
+    with open('shopify_demo.json', 'r') as f:
+        return json.load(f)
+
+def load_dhl_tracking():
+    with open('dhl_demo.json', 'r') as f:
+        return json.load(f)
+
+async def legacy_chat_with_bot(chat: ChatMessage):
+    message = chat.message.lower()
+
+    try:
+        # Simple AI logic to route queries (in production, use actual AI/LLM)
+
+        # Check for order number pattern
+        if "ord-" in message or "order" in message:
+            # Extract order number
+            words = chat.message.split()
+            order_num = next((w for w in words if w.upper().startswith("ORD-")), None)
+
+            if order_num:
+                try:
+                    orders_data = load_shopify_orders()
+                    order = next((o for o in orders_data["orders"] if o["order_number"].upper() == order_num.upper()), None)
+
+                    if order:
+                        items_str = ", ".join([f"{item['product_name']} (x{item['quantity']})" for item in order['items']])
+                        response = f"""Hello! I found your order {order['order_number']} 📦
+
+**Status:** {order['status'].replace('_', ' ').title()}
+**Order Date:** {order['order_date'][:10]}
+**Items:** {items_str}
+**Total:** ${order['total']} {order['currency']}
+
+"""
+                        if order['tracking_number']:
+                            response += f"**Tracking:** {order['tracking_number']}\n"
+                            # Get tracking info
+                            tracking_data = load_dhl_tracking()
+                            shipment = next((s for s in tracking_data["shipments"] if s["tracking_number"] == order['tracking_number']), None)
+                            if shipment:
+                                response += f"**Shipping Status:** {shipment['status'].replace('_', ' ').title()}\n"
+                                if shipment['estimated_delivery']:
+                                    response += f"**Estimated Delivery:** {shipment['estimated_delivery'][:10]}\n"
+
+                        response += "\nIs there anything else I can help you with?"
+                        return {
+                            "response": response,
+                            "data_source": "shopify_connector",
+                            "order_number": order_num
+                        }
+                except Exception as e:
+                    logger.error(f"Error fetching order: {e}")
+
+        # Check for tracking number
+        if "dhl-" in message or "track" in message:
+            words = chat.message.split()
+            tracking_num = next((w for w in words if w.upper().startswith("DHL-")), None)
+
+            if tracking_num:
+                try:
+                    tracking_data = load_dhl_tracking()
+                    shipment = next((s for s in tracking_data["shipments"] if s["tracking_number"].upper() == tracking_num.upper()), None)
+
+                    if shipment:
+                        response = f"""📦 Tracking Information for {tracking_num}
+
+**Status:** {shipment['status'].replace('_', ' ').title()}
+**Service:** {shipment['service_type']}
+**From:** {shipment['origin']['city']}, {shipment['origin']['state']}
+**To:** {shipment['destination']['city']}, {shipment['destination']['state']}
+**Shipped:** {shipment['shipped_date'][:10]}
+**Estimated Delivery:** {shipment['estimated_delivery'][:10] if shipment['estimated_delivery'] else 'N/A'}
+
+**Latest Update:**
+"""
+                        if shipment['events']:
+                            latest = shipment['events'][-1]
+                            response += f"{latest['timestamp'][:10]} - {latest['description']} ({latest['location']})\n"
+
+                        response += "\nWould you like more details about this shipment?"
+                        return {
+                            "response": response,
+                            "data_source": "dhl_connector",
+                            "tracking_number": tracking_num
+                        }
+                except Exception as e:
+                    logger.error(f"Error fetching tracking: {e}")
+
+        # Check for product queries
+        if any(word in message for word in ["product", "headphone", "watch", "chair", "webcam", "tea", "charger", "price", "buy"]):
+            try:
+                products_data = load_products()
+
+                # Simple keyword matching
+                search_terms = message.split()
+                matching_products = []
+
+                for product in products_data["products"]:
+                    product_text = f"{product['name']} {product['description']} {product['category']}".lower()
+                    if any(term in product_text for term in search_terms if len(term) > 3):
+                        matching_products.append(product)
+
+                if matching_products:
+                    response = "I found these products that might interest you:\n\n"
+                    for p in matching_products[:3]:  # Show top 3
+                        response += f"**{p['name']}** - ${p['price']}\n"
+                        response += f"{p['description'][:100]}...\n"
+                        response += f"Stock: {p['stock']} units | Rating: {p['rating']}⭐\n\n"
+
+                    response += "Would you like more information about any of these products?"
+                    return {
+                        "response": response,
+                        "data_source": "product_connector",
+                        "products_found": len(matching_products)
+                    }
+            except Exception as e:
+                logger.error(f"Error searching products: {e}")
+
+        # Default response using knowledge base
+        response = f"""Thank you for contacting Saturnin! 👋
+
+{bot_config['knowledge_base']}
+
+To help you better, you can:
+- Check order status by providing your order number (e.g., ORD-2024-001)
+- Track your shipment with tracking number (e.g., DHL-2024-TRK-001)
+- Ask about product information
+
+How can I assist you today?"""
+
+        return {
+            "response": response,
+            "data_source": "knowledge_base"
+        }
+
+    except Exception as e:
+        logger.error(f"Chat error: {e}")
+        return {
+            "response": "I apologize, but I'm having trouble processing your request. Please try again or contact our support team at support@saturnin.com",
+            "error": str(e)
+        }
+
+
+async def measure(handler, iterations: int):
+    latencies = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        chat = ChatMessage(message=MESSAGES[i % len(MESSAGES)])
+        call_started = time.perf_counter()
+        await handler(chat)
+        latencies.append((time.perf_counter() - call_started) * 1000)
+    return summarize_latencies(latencies, time.perf_counter() - started)
+
+
+async def main(args):
+    # Both implementations must route every message the same way
+    for message in MESSAGES:
+        legacy = await legacy_chat_with_bot(ChatMessage(message=message))
+        current = await chat_with_bot(ChatMessage(message=message))
+        if legacy.get("data_source") != current.get("data_source"):
+            print(f"Routing differs for {message!r}: {legacy.get('data_source')} vs {current.get('data_source')}")
+
+    legacy_stats = await measure(legacy_chat_with_bot, args.iterations)
+    current_stats = await measure(chat_with_bot, args.iterations)
+    print(format_row("legacy keyword scans + file reloads", legacy_stats))
+    print(format_row("compiled routing engine", current_stats))
+    print(f"speedup: {current_stats['throughput_rps'] / legacy_stats['throughput_rps']:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare /bot/chat routing implementations")
+    parser.add_argument("--iterations", type=int, default=5000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,113 @@
+"""
+Load test for the chat endpoints at fixed concurrency.
+
+Runs in-process against main.app with the fake LLM provider by default, or
+against a running server with --base-url. Run from the repository root:
+
+    python -m benchmarks.chat_load --concurrency 32 --requests 2000
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.common import format_row, summarize_latencies
+
+ENDPOINTS = {
+    "ecom": "/api/ecom-agent/chat",
+    "bot": "/api/bot/chat",
+}
+
+DEFAULT_MESSAGES = [
+    "What is the status of ORD-2024-003?",
+    "Meta ROAS",
+    "How much stock of PROD-002 is left?",
+    "Where is DHL-2024-TRK-002?",
+    "How should we improve our Google Ads campaigns?",
+    "Which products and orders should we focus on this month?",
+    "Summarize marketing strategy performance and revenue",
+    "Do you have any headphones?",
+]
+
+
+async def run_endpoint(client: httpx.AsyncClient, path: str, messages: List[str], total: int, concurrency: int) -> Dict:
+    latencies: List[float] = []
+    context_sizes: List[int] = []
+    errors = 0
+    message_cycle = itertools.cycle(messages)
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            message = next(message_cycle)
+            started = time.perf_counter()
+            response = await client.post(path, json={"message": message, "conversation_history": []})
+            latencies.append((time.perf_counter() - started) * 1000)
+            body = response.json()
+            if response.status_code != 200 or body.get("error"):
+                errors += 1
+            if "data_context_size" in body:
+                context_sizes.append(body["data_context_size"])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    stats = summarize_latencies(latencies, time.perf_counter() - started)
+    stats["errors"] = errors
+    stats["avg_context_chars"] = round(sum(context_sizes) / len(context_sizes), 1) if context_sizes else 0
+    stats["max_context_chars"] = max(context_sizes) if context_sizes else 0
+    return stats
+
+
+async def main(args):
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    messages = DEFAULT_MESSAGES
+    if args.messages:
+        with open(args.messages, 'r', encoding='utf-8') as f:
+            messages = [line.strip() for line in f if line.strip()]
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        from backend.llm_provider import FakeLLMProvider, set_llm_provider
+        from main import app
+
+        set_llm_provider(FakeLLMProvider(
+            latency_ms=args.latency_ms,
+            tokens_per_second=args.tokens_per_second,
+            reply_tokens=args.reply_tokens,
+        ))
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=60)
+
+    results = {}
+    async with client:
+        targets = list(ENDPOINTS) if args.endpoint == "all" else [args.endpoint]
+        for name in targets:
+            # Warm up caches and lazily loaded data before measuring
+            await run_endpoint(client, ENDPOINTS[name], messages, min(len(messages), args.requests), 1)
+            results[name] = await run_endpoint(client, ENDPOINTS[name], messages, args.requests, args.concurrency)
+            stats = results[name]
+            print(format_row(f"{ENDPOINTS[name]} (c={args.concurrency})", stats))
+            print(f"{'':<40} errors {stats['errors']}  context avg {stats['avg_context_chars']} chars, max {stats['max_context_chars']} chars")
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the chat endpoints")
+    parser.add_argument("--endpoint", choices=["ecom", "bot", "all"], default="all")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--messages", help="File with one chat message per line")
+    parser.add_argument("--base-url", help="Drive a running server instead of the in-process app")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fake LLM time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="Fake LLM generation rate")
+    parser.add_argument("--reply-tokens", type=int, default=60, help="Fake LLM reply length")
+    parser.add_argument("--json", action="store_true", help="Also print results as JSON")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,126 @@
+"""
+Throughput and held-out accuracy of the local text classifiers on synthetic
+reviews and emails, on one core. Run from the repository root:
+
+    python -m benchmarks.classifier --train 20000 --texts 200000
+
+The template texts alone are separable by a handful of words, so by default
+each text is padded with words drawn from a Zipf-distributed vocabulary
+(--vocabulary, 0 for template text only). Each label also has topic words,
+which appear alongside its template sentence or in place of it, and a share
+of the labels is flipped (--label-noise). Real traffic has the same long tail
+of rare words and ambiguous texts, so the cache misses and the accuracy is
+no longer perfect.
+"""
+import argparse
+import bisect
+import itertools
+import random
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from backend.email_ingestion import classify_emails, email_text, train_email_classifier
+from backend.text_classifier import LinearTextClassifier
+from benchmarks.synthetic import generate_emails, generate_reviews
+
+TARGET_TEXTS_PER_SECOND = 50_000
+
+
+SYLLABLES = ["ba", "ce", "di", "fo", "gu", "ha", "ke", "li", "mo", "nu", "pa", "re", "si", "to", "vu", "wa", "xe", "yo", "za", "en", "ar", "os", "il"]
+
+
+class Vocabulary:
+    """Pseudo-words with Zipf frequencies (exponent 1.1), plus topic words per label"""
+
+    def __init__(self, size: int, rng: random.Random, topic_size: int = 200):
+        words = (''.join(parts) for length in (2, 3, 4) for parts in itertools.product(SYLLABLES, repeat=length))
+        self.words = list(itertools.islice(words, size))
+        self.cumulative = list(itertools.accumulate(1 / rank ** 1.1 for rank in range(1, len(self.words) + 1)))
+        self.rng = rng
+        self.topic_size = topic_size
+        self.topics: Dict[str, List[str]] = {}
+
+    def sample(self, count: int) -> List[str]:
+        total = self.cumulative[-1]
+        return [self.words[bisect.bisect(self.cumulative, self.rng.random() * total)] for _ in range(count)]
+
+    def text(self, label: str, sentence: str) -> str:
+        """Background words, a few of the label's topic words and, half the time, its template sentence"""
+        topic = self.topics.get(label)
+        if topic is None:
+            topic = self.topics[label] = self.rng.sample(self.words[100:10000], self.topic_size)
+        words = self.sample(self.rng.randint(15, 60)) + self.rng.choices(topic, k=self.rng.randint(1, 5))
+        self.rng.shuffle(words)
+        if self.rng.random() < 0.5:
+            words.insert(self.rng.randrange(len(words) + 1), sentence)
+        return ' '.join(words)
+
+
+def review_text(review: dict, rng: random.Random, vocabulary: Optional[Vocabulary] = None) -> str:
+    if vocabulary is not None:
+        return vocabulary.text(review['overall_sentimental_category'], f"{review['overall_summary']}. {review['review_text']}")
+    return f"{review['overall_summary']}\n{review['review_text']} Order {rng.randrange(10 ** 6)}."
+
+
+def add_noise(items: List[dict], field: str, noise: float, rng: random.Random):
+    """Flip a share of the labels to another label"""
+    labels = sorted({item[field] for item in items})
+    for item in items:
+        if rng.random() < noise:
+            item[field] = rng.choice([label for label in labels if label != item[field]])
+
+
+def texts_per_second(classify: Callable[[Sequence], List], items: Sequence, batch_size: int) -> float:
+    started = time.perf_counter()
+    for start in range(0, len(items), batch_size):
+        classify(items[start:start + batch_size])
+    return len(items) / (time.perf_counter() - started)
+
+
+def report(name: str, rate: float, accuracy: float):
+    verdict = "ok" if rate >= TARGET_TEXTS_PER_SECOND else f"below {TARGET_TEXTS_PER_SECOND:,}"
+    print(f"{name:<18} {rate:>12,.0f} texts/s  accuracy {accuracy:6.1%}  {verdict}")
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    vocabulary = Vocabulary(args.vocabulary, rng) if args.vocabulary else None
+    reviews = list(generate_reviews(args.train + args.texts, rng))
+    texts = [review_text(review, rng, vocabulary) for review in reviews]
+    for field in ("overall_sentiment", "overall_sentimental_category"):
+        add_noise(reviews, field, args.label_noise, rng)
+    train, held_out = slice(0, args.train), slice(args.train, None)
+
+    for name, field in (("review_sentiment", "overall_sentiment"), ("review_category", "overall_sentimental_category")):
+        labels = [review[field] for review in reviews]
+        started = time.perf_counter()
+        model = LinearTextClassifier.train(texts[train], labels[train])
+        print(f"{name}: trained on {args.train} reviews in {time.perf_counter() - started:.1f}s, {len(model.weights)} weights")
+        rate = texts_per_second(model.predict, texts[held_out], args.batch_size)
+        predicted = model.predict(texts[held_out])
+        report(name, rate, sum(p == t for p, t in zip(predicted, labels[held_out])) / len(predicted))
+
+    emails = list(generate_emails(args.train + args.texts, rng))
+    if vocabulary is not None:
+        for email in emails:
+            email['body'] = vocabulary.text(email['sentiment'], email['body'])
+    add_noise(emails, 'sentiment', args.label_noise, rng)
+    model = train_email_classifier(emails[train])
+    held = emails[held_out]
+    truth = [email.pop('sentiment') for email in held]
+    if model is not None:
+        rate = texts_per_second(lambda batch: model.predict(map(email_text, batch)), held, args.batch_size)
+        report("email_model", rate, sum(p == t for p, t in zip(model.predict(map(email_text, held)), truth)) / len(held))
+    rate = texts_per_second(lambda batch: classify_emails(batch, model), held, args.batch_size)
+    report("email_stage", rate, sum(p == t for p, t in zip(classify_emails(held, model), truth)) / len(held))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local classifier throughput and accuracy on synthetic data")
+    parser.add_argument("--train", type=int, default=20000, help="Labelled texts to train on")
+    parser.add_argument("--texts", type=int, default=200000, help="Held-out texts to classify")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--vocabulary", type=int, default=30000, help="Zipf vocabulary size; 0 for template text only")
+    parser.add_argument("--label-noise", type=float, default=0.05, help="Share of labels flipped to another label")
+    parser.add_argument("--seed", type=int, default=42)
+    main(parser.parse_args())
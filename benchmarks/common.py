@@ -0,0 +1,30 @@
+import math
+from typing import Dict, List
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[rank]
+
+
+def summarize_latencies(latencies_ms: List[float], elapsed_seconds: float) -> Dict[str, float]:
+    """p50/p95/p99 latency and throughput for one benchmark run"""
+    ordered = sorted(latencies_ms)
+    return {
+        "requests": len(ordered),
+        "throughput_rps": round(len(ordered) / elapsed_seconds, 2) if elapsed_seconds > 0 else 0.0,
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+        "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+    }
+
+
+def format_row(name: str, stats: Dict[str, float]) -> str:
+    return (
+        f"{name:<40} {stats['requests']:>8} req  {stats['throughput_rps']:>10.2f} req/s  "
+        f"p50 {stats['p50_ms']:>9.3f} ms  p95 {stats['p95_ms']:>9.3f} ms  p99 {stats['p99_ms']:>9.3f} ms"
+    )
@@ -0,0 +1,180 @@
+"""
+Throughput and latency of every /api endpoint against a synthetic dataset.
+
+Generates data at --scale (or reuses --data-dir), starts main.app in-process
+from that directory with the fake LLM provider, and runs each scenario at fixed
+concurrency. With --check the run fails when a scenario regresses past
+--tolerance against benchmarks/baseline.json; --update-baseline records the
+current numbers instead. Baselines are machine specific, so refresh them on the
+machine that runs the check. Run from the repository root:
+
+    python -m benchmarks.endpoints --scale 100000 --check
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.common import format_row, summarize_latencies
+from benchmarks.synthetic import write_dataset
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# (name, method, path, JSON body)
+Scenario = Tuple[str, str, str, Optional[dict]]
+
+SCENARIOS: List[Scenario] = [
+    ("companies", "GET", "/api/companies", None),
+    ("overall_by_platform", "GET", "/api/report/overall_by_platform?company=marielle_stokkelaar", None),
+    ("trends", "GET", "/api/report/trends?company=marielle_stokkelaar", None),
+    ("monthly_feedback", "GET", "/api/report/monthly_feedback?company=marielle_stokkelaar", None),
+    ("category_table", "GET", "/api/report/category_table?sentiment=negative", None),
+    ("overall_detail", "GET", "/api/report/overall_detail?platform=amazon", None),
+    ("top_pros_cons", "GET", "/api/report/top_pros_cons?company=marielle_stokkelaar", None),
+    ("category_analysis", "GET", "/api/report/category_analysis?category=Product+Quality", None),
+    ("available_months", "GET", "/api/report/available_months?company=marielle_stokkelaar", None),
+    ("monthly_analysis", "GET", "/api/report/monthly_analysis?company=marielle_stokkelaar&year=2025&month=1", None),
+    ("shopify_insights", "GET", "/api/shopify_insights", None),
+    ("emails", "GET", "/api/emails?limit=50", None),
+    ("emails_filtered", "GET", "/api/emails?sentiment=urgent&read=false&limit=50", None),
+    ("emails_search", "GET", "/api/emails?q=missing+items&limit=50", None),
+    ("email_statistics", "GET", "/api/emails/statistics", None),
+    ("email_mark_read", "POST", "/api/emails/email_000001/read", {"read": True}),
+    ("bot_products", "GET", "/api/bot/connectors/products", None),
+    ("bot_order", "GET", "/api/bot/connectors/shopify/order/ORD-2024-001", None),
+    ("bot_tracking", "GET", "/api/bot/connectors/dhl/tracking/DHL-2024-TRK-001", None),
+    ("bot_orders_batch", "POST", "/api/bot/connectors/shopify/orders/batch", {"order_numbers": ["ORD-2024-001", "ORD-2024-002", "ORD-2024-003", "ORD-2024-004"]}),
+    ("bot_status", "GET", "/api/bot/connectors/status", None),
+    ("bot_chat", "POST", "/api/bot/chat", {"message": "Where is my order ORD-2024-002?"}),
+    ("ecom_connectors", "GET", "/api/ecom-agent/connectors", None),
+    ("ecom_analytics", "GET", "/api/ecom-agent/analytics", None),
+    ("ecom_chat_fast_path", "POST", "/api/ecom-agent/chat", {"message": "What is the status of ORD-2024-003?"}),
+    ("ecom_chat_llm", "POST", "/api/ecom-agent/chat", {"message": "Which products and orders should we focus on?"}),
+    ("qualitative_connectors", "GET", "/api/qualitative/connectors", None),
+    ("qualitative_dashboard", "GET", "/api/qualitative/dashboard", None),
+    ("qualitative_trends", "GET", "/api/qualitative/trends?granularity=hour", None),
+    ("reviews", "GET", "/api/reviews?limit=20", None),
+]
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, total: int, concurrency: int) -> Dict:
+    _, method, path, body = scenario
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    stats = summarize_latencies(latencies, time.perf_counter() - started)
+    stats["errors"] = errors
+    return stats
+
+
+def compare_to_baseline(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Scenarios whose p95 latency, throughput or error count got worse than the baseline allows"""
+    regressions = []
+    for name, stats in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        if stats["p95_ms"] > reference["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {stats['p95_ms']} ms vs baseline {reference['p95_ms']} ms")
+        if stats["throughput_rps"] < reference["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{name}: {stats['throughput_rps']} req/s vs baseline {reference['throughput_rps']} req/s")
+        if stats["errors"] > reference.get("errors", 0):
+            regressions.append(f"{name}: {stats['errors']} errors vs baseline {reference.get('errors', 0)}")
+    return regressions
+
+
+def load_baseline(path: str) -> Dict[str, Dict]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+async def main(args) -> int:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="saturnin-bench-")
+    if not args.data_dir or not os.path.exists(os.path.join(data_dir, "demo_data.json")):
+        started = time.perf_counter()
+        sizes = write_dataset(data_dir, args.scale, args.seed)
+        print(f"Generated {sizes} in {data_dir} ({time.perf_counter() - started:.1f}s)")
+
+    # The routers read their fixtures relative to the working directory at import time
+    sys.path.insert(0, os.getcwd())
+    os.chdir(data_dir)
+    os.environ.setdefault("DATA_SOURCE_POLL_SECONDS", "0")
+    started = time.perf_counter()
+    from backend.llm_provider import FakeLLMProvider, set_llm_provider
+    from main import app
+    print(f"Loaded app in {time.perf_counter() - started:.1f}s")
+
+    set_llm_provider(FakeLLMProvider(latency_ms=0, tokens_per_second=0, reply_tokens=args.reply_tokens))
+
+    scenarios = [s for s in SCENARIOS if not args.only or s[0] in args.only]
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=300) as client:
+        for scenario in scenarios:
+            # Warm up lazily built snapshots and indexes before measuring
+            await run_scenario(client, scenario, min(args.requests, 3), 1)
+            results[scenario[0]] = await run_scenario(client, scenario, args.requests, args.concurrency)
+            stats = results[scenario[0]]
+            print(format_row(scenario[0], stats) + (f"  errors {stats['errors']}" if stats["errors"] else ""))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+    baselines = load_baseline(args.baseline)
+    key = str(args.scale)
+    if args.update_baseline:
+        baselines[key] = results
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline for scale {key} written to {args.baseline}")
+    elif args.check:
+        if key not in baselines:
+            print(f"No baseline recorded for scale {key}")
+            return 1
+        regressions = compare_to_baseline(results, baselines[key], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions against the scale {key} baseline (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every /api endpoint on synthetic data")
+    parser.add_argument("--scale", type=int, default=10_000, help="Rows per generated collection (1e3-1e7)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", help="Reuse (or create) a dataset directory instead of a temporary one")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--only", nargs="+", help="Scenario names to run")
+    parser.add_argument("--reply-tokens", type=int, default=60, help="Fake LLM reply length")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--check", action="store_true", help="Exit non-zero when a scenario regresses against the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before --check fails")
+    parser.add_argument("--update-baseline", action="store_true", help="Record this run as the baseline for --scale")
+    parser.add_argument("--json", action="store_true", help="Also print results as JSON")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,129 @@
+"""
+Per-response cost of the report models: FastAPI's response_model path
+(validate, serialize, jsonable_encoder, json.dumps) against the trusted path
+(model_construct, orjson). Run from the repository root:
+
+    python -m benchmarks.report_models --months 36 --iterations 2000
+
+The sentimental_dashboard models are included when its MongoDB dependencies
+are installed.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from backend.json_response import ModelJSONResponse
+from backend.routes import OverallReport, TrendReport
+
+SENTIMENTS = ["positive", "negative", "neutral"]
+DETAILS = ["highly_satisfied", "very_satisfied", "satisfied", "neutral", "disappointed", "frustrated", "dissatisfied", "very_disappointed"]
+CATEGORIES = ["product_quality", "fast_shipping", "value_for_money", "customer_support", "shipping_delay", "return_process", "product_defect"]
+
+# (name, model, payload as the endpoint builds it)
+Case = Tuple[str, Any, Dict[str, Any]]
+
+
+def month_labels(months: int) -> List[str]:
+    start = datetime(2023, 1, 1)
+    return [(start + timedelta(days=31 * i)).strftime("%Y-%m") for i in range(months)]
+
+
+def report_cases(months: int, rng: random.Random) -> List[Case]:
+    last_updated = datetime(2025, 6, 25, 13, 20, tzinfo=timezone.utc)
+    counts = {sentiment: rng.randrange(100, 5000) for sentiment in SENTIMENTS}
+    total = sum(counts.values())
+    cases: List[Case] = [
+        ("OverallReport", OverallReport, {
+            "overall_sentiment": {s: round(c / total * 100, 2) for s, c in counts.items()},
+            "total_reviews": total,
+            "last_updated": last_updated,
+            "sentiment_counts": counts,
+        }),
+        ("TrendReport", TrendReport, {
+            "trends": [{"month": month, **{s: rng.randrange(500) for s in SENTIMENTS}} for month in month_labels(months)],
+        }),
+    ]
+
+    try:
+        from backend import sentimental_dashboard as dashboard
+    except ImportError as e:
+        print(f"Skipping sentimental_dashboard models ({e})")
+        return cases
+
+    cases += [
+        ("DetailedReport", dashboard.DetailedReport, {
+            "overall_sentiment": {s: round(c / total * 100, 2) for s, c in counts.items()},
+            "overall_sentiment_detail": {d: round(rng.uniform(1, 30), 2) for d in DETAILS},
+            "overall_sentimental_category": {c: rng.randrange(1000) for c in CATEGORIES},
+            "total_reviews": total,
+            "last_updated": last_updated,
+        }),
+        ("OverallDetailReportModel", dashboard.OverallDetailReportModel, {
+            "overall_sentiment_detail": {d: {"count": rng.randrange(1000), "percentage": round(rng.uniform(1, 30), 2)} for d in DETAILS},
+            "total_reviews": total,
+            "last_updated": last_updated,
+        }),
+        ("DetailCategoryReportModel", dashboard.DetailCategoryReportModel, {
+            "details": [
+                {"overall_sentiment_detail": d, "categories": ["Product Quality", "Pricing"],
+                 "overall_sentimental_categories": rng.sample(CATEGORIES, 3), "summary": "Synthetic summary"}
+                for d in DETAILS
+            ],
+        }),
+        ("MonthlyFeedbackResponse", dashboard.MonthlyFeedbackResponse, {
+            "data": [
+                {"month": month,
+                 "top_positive": [{"category": c, "sentiment": "positive", "count": rng.randrange(100)} for c in CATEGORIES[:3]],
+                 "top_negative": [{"category": c, "sentiment": "negative", "count": rng.randrange(100)} for c in CATEGORIES[4:]]}
+                for month in month_labels(months)
+            ],
+        }),
+    ]
+    return cases
+
+
+def time_per_call(call: Callable[[], bytes], iterations: int) -> float:
+    """Mean microseconds per call"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call()
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    loop = asyncio.new_event_loop()
+    print(f"{'model':<28} {'response_model':>16} {'trusted':>12} {'speedup':>9}")
+    for name, model, payload in report_cases(args.months, rng):
+        field = create_model_field(name=f"Response_{name}", type_=model, mode="serialization")
+
+        def validated() -> bytes:
+            # What FastAPI does for a response_model route handed a hand-built model
+            content = loop.run_until_complete(serialize_response(field=field, response_content=model(**payload), is_coroutine=True))
+            return JSONResponse(content).body
+
+        def trusted() -> bytes:
+            return ModelJSONResponse(model.model_construct(**payload)).body
+
+        if json.loads(validated()) != json.loads(trusted()):
+            raise SystemExit(f"{name}: trusted response differs from the validated one")
+        before = time_per_call(validated, args.iterations)
+        after = time_per_call(trusted, args.iterations)
+        print(f"{name:<28} {before:>13.1f} us {after:>9.1f} us {before / after:>8.1f}x")
+    loop.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-response overhead of report models, validated vs trusted")
+    parser.add_argument("--months", type=int, default=24, help="Months in trend and monthly feedback payloads")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=42)
+    main(parser.parse_args())
@@ -0,0 +1,306 @@
+"""
+Synthetic datasets at configurable scale, written with the same schemas as the
+repository fixtures (demo_data.json, shopify_demo.json, dhl_demo.json,
+email-demo.json, meta_ads.json, google_ads.json, product.json).
+
+Fixtures that are not generated are copied unchanged, so the output directory
+can be used as the working directory of the API. Run from the repository root:
+
+    python -m benchmarks.synthetic --scale 100000 --out /tmp/saturnin-data
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Files copied from the repository as they are
+STATIC_FIXTURES = ["strategies.json", "pinterest_ads.json", "google_analytics.json", "woocommerce.json"]
+
+PLATFORMS = ["shopify", "amazon", "google", "trustpilot"]
+COMPANIES = ["marielle_stokkelaar", "northwind_goods", "saturn_outfitters"]
+
+# (sentiment, detail, sentimental category, category, summary)
+REVIEW_TEMPLATES = [
+    ("positive", "highly_satisfied", "product_quality", "Product Quality", "Excellent quality and fast shipping"),
+    ("positive", "very_satisfied", "fast_shipping", "Shipping & Delivery", "Arrived earlier than expected"),
+    ("positive", "satisfied", "value_for_money", "Pricing", "Good value for the price"),
+    ("positive", "satisfied", "customer_support", "Customer Service", "Support resolved my issue quickly"),
+    ("positive", "very_satisfied", "website_experience", "Website & App", "Checkout was smooth and simple"),
+    ("positive", "highly_satisfied", "eco_friendly", "Packaging", "Loved the recyclable packaging"),
+    ("neutral", "neutral", "product_size", "Product Quality", "Fits as expected, nothing special"),
+    ("neutral", "neutral", "product_variety", "Product Quality", "Decent range but limited colors"),
+    ("negative", "disappointed", "shipping_delay", "Shipping & Delivery", "Delivery took two weeks longer than promised"),
+    ("negative", "frustrated", "return_process", "Returns & Refunds", "Return process was confusing"),
+    ("negative", "dissatisfied", "product_defect", "Product Quality", "Item stopped working after a week"),
+    ("negative", "very_disappointed", "missing_items", "Shipping & Delivery", "Package was missing items"),
+    ("negative", "frustrated", "payment_issues", "Payment & Checkout", "Card was charged twice"),
+    ("negative", "dissatisfied", "customer_service", "Customer Service", "Nobody answered my emails"),
+]
+
+# (sentiment, subject, body)
+EMAIL_TEMPLATES = [
+    ("normal", "Question about sizing", "Hi, does the jacket run true to size? I usually wear a medium."),
+    ("normal", "Thank you!", "Just wanted to say the order arrived and everything looks great."),
+    ("urgent", "Order #{n} - Missing Items", "I received my order but 2 items are missing. Please help ASAP."),
+    ("urgent", "Payment failed", "My payment failed but the money left my account. Order {n}."),
+    ("angry", "This is unacceptable!!!", "Third time my order is late. Terrible service, I want a refund now."),
+    ("spam", "Congratulations, you won!", "Click here to claim your prize. Limited time offer."),
+    ("handover", "Wholesale partnership", "We are a distributor interested in a bulk order of 500 units."),
+]
+
+FIRST_NAMES = ["John", "Sarah", "Michael", "Emma", "David", "Olivia", "Liam", "Sophia", "Noah", "Mia"]
+LAST_NAMES = ["Smith", "Johnson", "Brown", "Garcia", "Miller", "Davis", "Wilson", "Anderson", "Taylor", "Thomas"]
+CITIES = [("New York", "NY"), ("Los Angeles", "CA"), ("Chicago", "IL"), ("Houston", "TX"), ("Seattle", "WA"), ("Miami", "FL")]
+PRODUCT_CATEGORIES = ["Electronics", "Wearables", "Furniture", "Accessories", "Beverages", "Apparel"]
+PRODUCT_NOUNS = ["Headphones", "Fitness Watch", "Office Chair", "Webcam", "Green Tea", "Phone Charger", "T-Shirt", "Backpack"]
+ORDER_STATUSES = ["delivered", "in_transit", "processing", "shipped", "cancelled"]
+SHIPMENT_STATUSES = ["delivered", "in_transit", "out_for_delivery", "picked_up"]
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def isoformat(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def random_moment(rng: random.Random, days: int = 730) -> datetime:
+    return EPOCH + timedelta(seconds=rng.randrange(days * 86400))
+
+
+def generate_products(count: int, rng: random.Random) -> List[dict]:
+    products = []
+    for i in range(1, count + 1):
+        noun = PRODUCT_NOUNS[i % len(PRODUCT_NOUNS)]
+        products.append({
+            "id": f"PROD-{i:03d}",
+            "name": f"{rng.choice(['Premium', 'Eco', 'Smart', 'Classic', 'Pro'])} {noun} {i}",
+            "category": rng.choice(PRODUCT_CATEGORIES),
+            "price": round(rng.uniform(5, 400), 2),
+            "currency": "USD",
+            "stock": rng.randrange(0, 500),
+            "description": f"Synthetic {noun.lower()} used for benchmarking.",
+            "features": ["Durable", "Lightweight"],
+            "warranty": "1 year",
+            "rating": round(rng.uniform(3, 5), 1),
+            "reviews_count": rng.randrange(0, 5000),
+        })
+    return products
+
+
+def generate_reviews(count: int, rng: random.Random) -> Iterator[dict]:
+    for _ in range(count):
+        sentiment, detail, sentimental_category, category, summary = rng.choice(REVIEW_TEMPLATES)
+        yield {
+            "platform": rng.choice(PLATFORMS),
+            "company": rng.choice(COMPANIES),
+            "time_period": isoformat(random_moment(rng)),
+            "overall_sentiment": sentiment,
+            "overall_sentiment_detail": detail,
+            "overall_sentimental_category": sentimental_category,
+            "overall_summary": summary,
+            "category": category,
+            "review_text": f"{summary}. Would {'not ' if sentiment == 'negative' else ''}order again.",
+        }
+
+
+def order_number(i: int) -> str:
+    return f"ORD-2024-{i:03d}"
+
+
+def tracking_number(i: int) -> str:
+    return f"DHL-2024-TRK-{i:03d}"
+
+
+def generate_orders(count: int, products: List[dict], rng: random.Random) -> Iterator[dict]:
+    for i in range(1, count + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        items = []
+        for product in rng.sample(products, rng.randint(1, min(3, len(products)))):
+            items.append({
+                "product_id": product["id"],
+                "product_name": product["name"],
+                "quantity": rng.randint(1, 3),
+                "price": product["price"],
+            })
+        subtotal = round(sum(item["quantity"] * item["price"] for item in items), 2)
+        tax = round(subtotal * 0.085, 2)
+        city, state = rng.choice(CITIES)
+        yield {
+            "order_number": order_number(i),
+            "order_id": str(5_000_000_000 + i),
+            "customer": {
+                "name": f"{first} {last}",
+                # A bounded pool of customers so repeat buyers exist
+                "email": f"{first.lower()}.{last.lower()}{rng.randrange(max(count // 4, 1))}@example.com",
+                "phone": f"+1-555-{rng.randrange(10000):04d}",
+            },
+            "order_date": isoformat(random_moment(rng)),
+            "status": rng.choice(ORDER_STATUSES),
+            "items": items,
+            "subtotal": subtotal,
+            "shipping": 9.99,
+            "tax": tax,
+            "total": round(subtotal + 9.99 + tax, 2),
+            "currency": "USD",
+            "shipping_address": {"street": f"{rng.randrange(1, 999)} Main Street", "city": city, "state": state, "zip": "10001", "country": "USA"},
+            "tracking_number": tracking_number(i),
+            "carrier": "DHL",
+        }
+
+
+def generate_shipments(count: int, rng: random.Random) -> Iterator[dict]:
+    for i in range(1, count + 1):
+        shipped = random_moment(rng)
+        origin_city, origin_state = rng.choice(CITIES)
+        city, state = rng.choice(CITIES)
+        status = rng.choice(SHIPMENT_STATUSES)
+        yield {
+            "tracking_number": tracking_number(i),
+            "status": status,
+            "origin": {"city": origin_city, "state": origin_state, "country": "USA"},
+            "destination": {"city": city, "state": state, "country": "USA"},
+            "shipped_date": isoformat(shipped),
+            "estimated_delivery": isoformat(shipped + timedelta(days=3)),
+            "actual_delivery": isoformat(shipped + timedelta(days=rng.randint(2, 6))) if status == "delivered" else None,
+            "package_weight": f"{rng.uniform(0.2, 10):.1f} lbs",
+            "service_type": "DHL Express",
+            "events": [
+                {"timestamp": isoformat(shipped), "status": "picked_up", "location": f"{origin_city}, {origin_state}", "description": "Package picked up from sender"},
+                {"timestamp": isoformat(shipped + timedelta(hours=20)), "status": "in_transit", "location": "Memphis Hub", "description": "Arrived at sorting facility"},
+            ],
+        }
+
+
+def generate_emails(count: int, rng: random.Random) -> Iterator[dict]:
+    for i in range(1, count + 1):
+        sentiment, subject, body = rng.choice(EMAIL_TEMPLATES)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield {
+            "id": f"email_{i:06d}",
+            "from": f"{first.lower()}.{last.lower()}@example.com",
+            "from_name": f"{first} {last}",
+            "subject": subject.format(n=rng.randrange(10000, 99999)),
+            "body": body.format(n=rng.randrange(10000, 99999)),
+            "timestamp": isoformat(random_moment(rng, days=60)),
+            "sentiment": sentiment,
+            "read": rng.random() < 0.6,
+            "ai_reply": "" if sentiment == "spam" else f"Dear {first},\n\nThank you for reaching out.\n\nBest regards,\nCustomer Support Team",
+        }
+
+
+def generate_campaigns(count: int, prefix: str, rng: random.Random) -> Dict[str, Any]:
+    """Campaign list plus overall_performance, as in meta_ads.json / google_ads.json"""
+    campaigns = []
+    for i in range(1, count + 1):
+        impressions = rng.randrange(10_000, 500_000)
+        clicks = int(impressions * rng.uniform(0.01, 0.04))
+        conversions = int(clicks * rng.uniform(0.01, 0.05))
+        spent = rng.randrange(500, 20_000)
+        revenue = int(spent * rng.uniform(0.8, 5))
+        campaigns.append({
+            "campaign_id": f"{prefix}-2024-{i:03d}",
+            "campaign_name": f"{rng.choice(PRODUCT_NOUNS)} campaign {i}",
+            "status": rng.choice(["active", "paused", "completed"]),
+            "start_date": isoformat(random_moment(rng))[:10],
+            "budget": {"total": spent * 2, "daily": spent // 30, "spent": spent, "remaining": spent},
+            "performance": {
+                "impressions": impressions,
+                "clicks": clicks,
+                "ctr": f"{clicks / impressions * 100:.2f}%",
+                "conversions": conversions,
+                "revenue": revenue,
+                "roas": f"{revenue / spent:.1f}",
+            },
+        })
+    total_spend = sum(c["budget"]["spent"] for c in campaigns)
+    total_revenue = sum(c["performance"]["revenue"] for c in campaigns)
+    total_impressions = sum(c["performance"]["impressions"] for c in campaigns)
+    total_clicks = sum(c["performance"]["clicks"] for c in campaigns)
+    return {
+        "campaigns": campaigns,
+        "overall_performance": {
+            "total_spend": total_spend,
+            "total_revenue": total_revenue,
+            "overall_roas": f"{total_revenue / total_spend:.1f}" if total_spend else "0",
+            "total_conversions": sum(c["performance"]["conversions"] for c in campaigns),
+            "avg_conversion_rate": "2.50%",
+            "total_impressions": total_impressions,
+            "total_clicks": total_clicks,
+            "avg_ctr": f"{total_clicks / total_impressions * 100:.2f}%" if total_impressions else "0%",
+        },
+    }
+
+
+def write_json(path: str, fields: Dict[str, Any]):
+    """Write an object whose generator-valued fields are streamed as arrays, so 1e7 rows never sit in memory at once"""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("{")
+        for position, (name, value) in enumerate(fields.items()):
+            f.write(f"{', ' if position else ''}{json.dumps(name)}: ")
+            if isinstance(value, Iterator):
+                f.write("[")
+                for index, item in enumerate(value):
+                    f.write(("," if index else "") + "\n" + json.dumps(item))
+                f.write("\n]")
+            else:
+                json.dump(value, f)
+        f.write("}\n")
+
+
+def load_fixture(name: str) -> dict:
+    with open(os.path.join(REPO_ROOT, name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def dataset_sizes(scale: int) -> Dict[str, int]:
+    """Row counts per collection for a scale (reviews, orders, shipments and emails all equal scale)"""
+    return {
+        "reviews": scale,
+        "orders": scale,
+        "shipments": scale,
+        "emails": scale,
+        "products": max(min(scale // 100, 10_000), 6),
+        "campaigns": max(min(scale // 1000, 1_000), 3),
+    }
+
+
+def write_dataset(directory: str, scale: int, seed: int = 42) -> Dict[str, int]:
+    """Generate every dataset into directory and return the row counts"""
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    sizes = dataset_sizes(scale)
+
+    for name in STATIC_FIXTURES:
+        shutil.copy(os.path.join(REPO_ROOT, name), os.path.join(directory, name))
+
+    products = generate_products(sizes["products"], rng)
+    write_json(os.path.join(directory, "product.json"), {"products": products})
+
+    demo_data = load_fixture("demo_data.json")
+    demo_data["sentimental_analysis"] = generate_reviews(sizes["reviews"], rng)
+    write_json(os.path.join(directory, "demo_data.json"), demo_data)
+
+    write_json(os.path.join(directory, "shopify_demo.json"), {"orders": generate_orders(sizes["orders"], products, rng)})
+    write_json(os.path.join(directory, "dhl_demo.json"), {"shipments": generate_shipments(sizes["shipments"], rng)})
+
+    email_data = load_fixture("email-demo.json")
+    email_data["emails"] = generate_emails(sizes["emails"], rng)
+    write_json(os.path.join(directory, "email-demo.json"), email_data)
+
+    write_json(os.path.join(directory, "meta_ads.json"), generate_campaigns(sizes["campaigns"], "META", rng))
+    write_json(os.path.join(directory, "google_ads.json"), generate_campaigns(sizes["campaigns"], "GOOGLE", rng))
+    return sizes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic datasets matching the fixture schemas")
+    parser.add_argument("--scale", type=int, default=10_000, help="Reviews, orders, shipments and emails to generate (1e3-1e7)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", required=True, help="Output directory")
+    args = parser.parse_args()
+    print(json.dumps(write_dataset(args.out, args.scale, args.seed), indent=2))
@@ -59,6 +59,7 @@ const EmailDashboard: React.FC = () => {
   const [selectedEmail, setSelectedEmail] = useState<Email | null>(null);
   const [activeView, setActiveView] = useState<'emails' | 'train' | 'stats'>('emails');
   const [filterSentiment, setFilterSentiment] = useState<string>('all');
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   
   // Bot training states
   const [trainView, setTrainView] = useState<'knowledge' | 'instructions' | 'connectors'>('knowledge');
@@ -75,12 +76,19 @@ const EmailDashboard: React.FC = () => {
     if (activeView === 'train') {
       fetchBotConfig();
     }
-  }, [activeView]);
+  }, [activeView, filterSentiment]);
 
-  const fetchEmails = async () => {
+  // Filtering and pagination happen on the server; pass a cursor to load the next page
+  const fetchEmails = async (cursor?: string) => {
     try {
-      const response = await axios.get(`${API_BASE_URL}/emails`);
-      setEmails(response.data.emails);
+      const response = await axios.get(`${API_BASE_URL}/emails`, {
+        params: {
+          sentiment: filterSentiment === 'all' ? undefined : filterSentiment,
+          cursor
+        }
+      });
+      setEmails(cursor ? [...emails, ...response.data.emails] : response.data.emails);
+      setNextCursor(response.data.next_cursor);
       setStats(response.data.email_statistics);
     } catch (error) {
       console.error('Error fetching emails:', error);
@@ -181,10 +189,6 @@ const EmailDashboard: React.FC = () => {
     );
   };
 
-  const filteredEmails = filterSentiment === 'all'
-    ? emails
-    : emails.filter(e => e.sentiment === filterSentiment);
-
   const formatTime = (timestamp: string) => {
     const date = new Date(timestamp);
     const now = new Date();
@@ -296,7 +300,7 @@ const EmailDashboard: React.FC = () => {
 
                 {/* Email List Items */}
                 <div className="divide-y divide-gray-700/30">
-                  {filteredEmails.map(email => (
+                  {emails.map(email => (
                     <div
                       key={email.id}
                       onClick={() => setSelectedEmail(email)}
@@ -331,6 +335,14 @@ const EmailDashboard: React.FC = () => {
                     </div>
                   ))}
                 </div>
+                {nextCursor && (
+                  <button
+                    onClick={() => fetchEmails(nextCursor)}
+                    className="w-full p-3 text-sm text-blue-400 hover:bg-gray-700/30 transition-all"
+                  >
+                    Load more
+                  </button>
+                )}
               </div>
 
               {/* Email Detail */}
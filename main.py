@@ -1,11 +1,37 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from backend.routes import sentiment_router
+from backend.compression import CompressionMiddleware
+from backend.data_sources import connector_registry
+from backend.json_response import FastJSONResponse
+from backend.metrics import MetricsMiddleware, render_prometheus
+from backend.profiling import ProfilingMiddleware, profiling_router
+from backend.routes import load_review_classifiers, sentiment_router, reply_pipeline
 from backend.bot_routes import bot_router
 from backend.ecom_agent_routes import ecom_agent_router
 from backend.qualitative_routes import qualitative_router
 
-app = FastAPI(title="Saturnin AI Platform API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Preload connector data and train the review classifiers once; stop the file watcher and
+    # reply workers on shutdown
+    await connector_registry.snapshot()
+    await load_review_classifiers()
+    yield
+    await connector_registry.stop()
+    await reply_pipeline.stop()
+
+app = FastAPI(title="Saturnin AI Platform API", lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# brotli/gzip for larger JSON bodies; added first so the metrics below see wire sizes
+app.add_middleware(CompressionMiddleware)
+
+# Per-route latency and size histograms, exposed at /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Admin-gated per-request profiles and sampled profiles of slow requests
+app.add_middleware(ProfilingMiddleware)
 
 # CORS middleware
 app.add_middleware(
@@ -21,6 +47,7 @@ app.include_router(sentiment_router, prefix="/api")
 app.include_router(bot_router, prefix="/api")
 app.include_router(ecom_agent_router, prefix="/api")
 app.include_router(qualitative_router, prefix="/api")
+app.include_router(profiling_router, prefix="/api")
 
 @app.get("/")
 async def root():
@@ -52,6 +79,12 @@ async def api_root():
         }
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition of request and span metrics"""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
+    # Development server; for N workers sharing one data snapshot run: python -m backend.serve --workers N
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8001, reload=True)